@@ -0,0 +1,101 @@
+"""Minimal browser stand-in for the benchmarks: start the app headless and talk
+to it over the same websocket protocol the frontend uses."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """`streamlit run app.py` on `port`; returns once the health endpoint answers."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(600):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("streamlit server did not start")
+
+
+def open_session(port: int):
+    return connect(f"ws://127.0.0.1:{port}/_stcore/stream", max_size=None)
+
+
+def widget_state(widget_id: str, kind: str, value) -> WidgetState:
+    ws = WidgetState(id=widget_id)
+    if kind == "slider":
+        ws.double_array_value.data.extend(value)
+    elif kind == "checkbox":
+        ws.bool_value = value
+    else:
+        ws.string_value = value
+    return ws
+
+
+class Session:
+    """One browser-like websocket session."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pages = {}          # page name -> page_script_hash
+        self.widgets = {}        # (type, label) -> (widget id, fragment id)
+        self.tab_ids = []        # st.tabs widget ids of the last full run, in page order
+        self.first_delta = None  # perf_counter() of the first element of the last run
+
+    async def rerun(self, page_hash: str = "", states=(), fragment_id: str = "",
+                    page_name: str = "") -> tuple[float, int]:
+        """Send a rerun and wait for the script to finish; returns (seconds, bytes received)."""
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = page_hash
+        msg.rerun_script.page_name = page_name
+        msg.rerun_script.fragment_id = fragment_id
+        for ws in states:
+            msg.rerun_script.widget_states.widgets.append(ws)
+        t0 = time.perf_counter()
+        self.first_delta = None
+        if not fragment_id:
+            self.tab_ids = []
+        await self.conn.send(msg.SerializeToString())
+        received = 0
+        while True:
+            raw = await self.conn.recv()
+            received += len(raw)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind in ("new_session", "navigation"):
+                self.pages.update({p.page_name: p.page_script_hash for p in getattr(fwd, kind).app_pages})
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "add_block":
+                if fwd.delta.add_block.tab_container.id:
+                    self.tab_ids.append(fwd.delta.add_block.tab_container.id)
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                if self.first_delta is None:
+                    self.first_delta = time.perf_counter()
+                el = fwd.delta.new_element
+                widget = getattr(el, el.WhichOneof("type"))
+                if hasattr(widget, "id") and hasattr(widget, "label"):
+                    self.widgets[(el.WhichOneof("type"), widget.label)] = (widget.id, fwd.delta.fragment_id)
+            elif kind == "script_finished":
+                return time.perf_counter() - t0, received
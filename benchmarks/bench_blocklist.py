@@ -0,0 +1,83 @@
+"""Benchmark: blocklist lookups over a click log (lookups/sec) and hot reload.
+
+Builds synthetic lists (IPv4 CIDRs, IPv6 prefixes, device IDs), writes them to
+a temp directory and checks a click log of random addresses and devices.
+
+Run from the repo root:  python benchmarks/bench_blocklist.py [clicks] [entries]
+"""
+
+import ipaddress
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.blocklist import NOT_BLOCKED, BlocklistWatcher, encode_ips, hash_devices
+
+
+def write_lists(tmp: Path, entries: int, rng: np.random.Generator):
+    v4 = rng.integers(1 << 24, 224 << 24, entries, dtype=np.uint64)
+    prefix = rng.choice([16, 20, 24, 28, 32], entries, p=[.02, .08, .6, .2, .1])
+    cidrs = [f"{ipaddress.IPv4Address(int(a))}/{p}" for a, p in zip(v4, prefix)]
+    half = entries // 2
+    (tmp / "datacenter.netset").write_text("# datacenter ranges\n" + "\n".join(cidrs[:half]) + "\n")
+    v6 = [f"2001:db8:{h:x}::/48" for h in rng.integers(0, 1 << 16, entries // 20)]
+    (tmp / "click_farms.txt").write_text("\n".join(cidrs[half:] + v6) + "\n")
+    devices = [f"dev-{d:012x}" for d in rng.integers(0, 1 << 40, entries // 3)]
+    (tmp / "devices.txt").write_text("\n".join(devices) + "\n")
+    return devices
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 300_000
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        devices = write_lists(Path(tmp), entries, rng)
+        watcher = BlocklistWatcher(tmp)
+        t0 = time.perf_counter()
+        bl = watcher.current()
+        print(f"load {time.perf_counter() - t0:.2f}s: {bl.report.v4_ranges:,} IPv4 ranges, "
+              f"{bl.report.v6_ranges:,} IPv6 ranges, {bl.report.devices:,} devices")
+
+        # click log: mostly random IPv4, 5% IPv6, 1% known bad devices
+        n_v6 = clicks // 20
+        ips = np.array([str(ipaddress.IPv4Address(int(a))) for a in rng.integers(1 << 24, 224 << 24, 200_000)])
+        ips = np.concatenate([ips[rng.integers(0, len(ips), clicks - n_v6)],
+                              np.array([f"2001:db8:{h:x}::{h:x}" for h in rng.integers(0, 1 << 16, 5_000)])[
+                                  rng.integers(0, 5_000, n_v6)]])
+        dev = np.array([f"dev-{d:012x}" for d in rng.integers(0, 1 << 40, 100_000)] + devices[:1_000])
+        dev = dev[rng.integers(0, len(dev), clicks)]
+
+        def timed(label, fn):
+            t0 = time.perf_counter()
+            out = fn()
+            secs = time.perf_counter() - t0
+            print(f"{label:<34} {secs:>7.2f}s {clicks / secs:>14,.0f}/s")
+            return out
+
+        print(f"\n{clicks:,} clicks")
+        enc = timed("encode IPs (strings -> ints)", lambda: encode_ips(ips))
+        hit_ip = timed("IP lookups (encoded)", lambda: bl.lookup_ips(enc))
+        hashed = timed("hash device IDs", lambda: hash_devices(dev))
+        hit_dev = timed("device lookups (hashed)", lambda: bl.lookup_devices(hashed))
+        print(f"blocked: {(hit_ip != NOT_BLOCKED).mean():.1%} by IP, {(hit_dev != NOT_BLOCKED).mean():.1%} by device")
+
+        # hot reload: touch one list, the next current() rebuilds
+        path = Path(tmp) / "devices.txt"
+        path.write_text(path.read_text() + "dev-new\n")
+        t0 = time.perf_counter()
+        watcher.current()
+        reload_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        watcher.current()
+        print(f"\nreload after edit {reload_s:.2f}s; unchanged check {(time.perf_counter() - t0) * 1e3:.2f} ms "
+              f"({watcher.reloads} loads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark: page reruns with and without the compiled chart spec cache (gtm.chartdata.SPECS).
+
+Runs every page headless, then reruns it a few times twice over: once with
+the cache sized to zero (every chart is built by Altair and converted again)
+and once with the default size (unchanged charts are a hash check). Prints
+the median rerun time per page and the cache's hit / miss counters.
+
+Run from the repo root:  python benchmarks/bench_chartcache.py [reruns]
+"""
+
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from gtm.chartdata import SPEC_CACHE_SIZE, SPECS
+
+
+def median_rerun(page: str, reruns: int) -> float:
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(page, default_timeout=300)
+    at.run()
+    times = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    print(f"{'page':<32} {'uncached ms':>11} {'cached ms':>10} {'hits':>6} {'misses':>7}")
+    for page in sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+        SPECS.clear()
+        SPECS.maxsize = 0
+        uncached = median_rerun(page, reruns)
+        SPECS.clear()
+        SPECS.maxsize = SPEC_CACHE_SIZE
+        cached = median_rerun(page, reruns)
+        stats = SPECS.stats()
+        print(f"{os.path.basename(page):<32} {uncached:>11.0f} {cached:>10.0f} {stats['hits']:>6} {stats['misses']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: chart payloads before and after the row budget (gtm.chartdata).
+
+1. Runs every page headless and prints the payload logged per chart.
+2. Builds the same kinds of charts over large synthetic frames (a per-minute
+   series, daily bars, a long keyword list) and compares the Vega-Lite spec
+   size of the full frame with the reduced one, plus the time `fit` takes.
+
+Run from the repo root:  python benchmarks/bench_chartdata.py [rows]
+"""
+
+import glob
+import os
+import sys
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from gtm.chartdata import PAYLOADS, fit, payload_report
+
+
+def page_payloads():
+    from streamlit.testing.v1 import AppTest
+    for page in [os.path.join(ROOT, "app.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+        AppTest.from_file(page, default_timeout=300).run()
+    print(payload_report().to_string(index=False))
+
+
+def synthetic(n: int):
+    rng = np.random.default_rng(3)
+    minutes = pd.date_range("2025-01-01", periods=n // 2, freq="min")
+    series = pd.DataFrame({
+        "Time": np.tile(minutes, 2),
+        "Metric": np.repeat(["sessions", "clicks"], len(minutes)),
+        "Value": rng.poisson(20, 2 * len(minutes)).astype(float),
+    })
+    days = pd.date_range("2000-01-01", periods=n // 2, freq="D")
+    daily = pd.DataFrame({"Day": np.tile(days, 2), "Status": np.repeat(["clean", "filtered"], len(days)),
+                          "Sessions": rng.poisson(300, 2 * len(days))})
+    keywords = pd.DataFrame({"Keyword": [f"keyword {i}" for i in range(n)], "Searches": rng.pareto(1.2, n) * 100})
+    return {
+        "per-minute lines": (series, lambda d: alt.Chart(d).mark_line().encode(x="Time:T", y="Value:Q", color="Metric:N"),
+                             dict(x="Time", y="Value", by="Metric")),
+        "daily bars": (daily, lambda d: alt.Chart(d).mark_bar().encode(x="Day:T", y="Sessions:Q", color="Status:N"),
+                       dict(x="Day", y="Sessions", by="Status", bins=True)),
+        "keyword bars": (keywords, lambda d: alt.Chart(d).mark_bar().encode(x="Keyword:N", y="Searches:Q"),
+                         dict(category="Keyword", value="Searches")),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    page_payloads()
+    PAYLOADS.clear()
+
+    alt.data_transformers.disable_max_rows()     # the full-frame specs are the point of comparison
+    print(f"\n{'chart':<18} {'rows':>10} {'spec MB':>8} {'-> rows':>8} {'spec KB':>8} {'fit ms':>7}")
+    for label, (df, build, how) in synthetic(n).items():
+        full = len(build(df).to_json())
+        t0 = time.perf_counter()
+        small = fit(df, label, **how)
+        ms = (time.perf_counter() - t0) * 1000
+        reduced = len(build(small).to_json())
+        print(f"{label:<18} {len(df):>10,} {full / 2**20:>8.1f} {len(small):>8,} {reduced / 1024:>8.1f} {ms:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
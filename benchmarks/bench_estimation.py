@@ -0,0 +1,69 @@
+"""Benchmark: columnar impression/click estimator vs. the per-row loop.
+
+Columns: row loop, estimate_frame on raw range text, the one-off
+parse_range_columns pass, and the estimator on pre-parsed numeric columns
+(the per-rerun cost once a plan is loaded).
+
+Run from the repo root:  python benchmarks/bench_estimation.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.estimation import estimate_frame, estimate_impr_clicks, estimate_row_impr_clicks
+from gtm.ranges import parse_range_columns
+
+# The seven Part 2 benchmark rows, repeated to build ad-group-level plans
+SEED_ROWS = pd.DataFrame({
+    "Budget": [3000, 3000, 2000, 3000, 1000, 2000, 1000],
+    "CPC": ["€6–9", "€6–9", "—", "€3–7", "€3–6", "€5–8", "€3–6"],
+    "CPM": ["€40–60", "€45–65", "€10–15", "—", "—", "€30–50", "—"],
+    "CTR": ["0.6–1.0%", "0.8–1.2%", "0.4–0.7%", "3–5%", "4–6%", "1.0–1.8%", "5–8%"],
+})
+
+
+def make_plan(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    plan = SEED_ROWS.iloc[rng.integers(0, len(SEED_ROWS), n_rows)].reset_index(drop=True)
+    plan["Budget"] = rng.uniform(50, 5000, n_rows).round(2)
+    return plan
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    # Correctness: columnar result must match the row loop
+    sample = make_plan(2_000, seed=1)
+    ref = np.array([
+        estimate_row_impr_clicks(r.Budget, r.CPM, r.CPC, r.CTR) for r in sample.itertuples()
+    ])
+    got = estimate_frame(sample)[["Impressions_est", "Clicks_est"]].to_numpy()
+    assert np.allclose(ref, got), "columnar estimator diverges from estimate_row_impr_clicks"
+
+    print(f"{'rows':>10} {'loop (s)':>10} {'raw (s)':>10} {'parse (s)':>10} {'parsed (s)':>11} {'ns/row':>8}")
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        plan = make_plan(n)
+        loop = _time(lambda: [estimate_row_impr_clicks(r.Budget, r.CPM, r.CPC, r.CTR)
+                              for r in plan.itertuples()], repeat=1) if n <= 100_000 else float("nan")
+        raw = _time(lambda: estimate_frame(plan))
+        parse = _time(lambda: parse_range_columns(plan))
+        parsed = parse_range_columns(plan)
+        cols = [parsed[c].to_numpy() for c in ("Budget", "CPM_mid", "CPC_mid", "CTR_mid")]
+        arrays = _time(lambda: estimate_impr_clicks(*cols))
+        print(f"{n:>10,} {loop:>10.4f} {raw:>10.4f} {parse:>10.4f} {arrays:>11.4f} {arrays / n * 1e9:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: streaming ingest of ad-platform exports (rows/sec and peak memory).
+
+Writes synthetic Google Ads, LinkedIn and YouTube exports (title lines, thousands
+separators, "--" cells and a totals line, like the real downloads) to a temp
+directory and streams them through `gtm.exports.ingest_exports` at a few chunk sizes.
+Peak memory is the tracemalloc peak of a second, traced pass (numpy/pandas buffers):
+it follows the chunk size, not the file size.
+
+Run from the repo root:  python benchmarks/bench_exports.py [rows per file]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.exports import actuals_performance, ingest_exports
+
+CAMPAIGNS = {
+    "google": ["US | Search | Generic | L&D", "US | Search | RLSA | Visitors", "US | Brand | Exact",
+               "US | Competitor | Exact", "US | YouTube | Awareness", "Misc test"],
+    "linkedin": ["US - HR Leaders - Awareness", "US - Compliance - Awareness", "US - Website Visitors - Retargeting"],
+    "youtube": ["YT | In-stream | HR", "YT | In-feed | L&D"],
+}
+
+
+def write_export(path: Path, platform: str, n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    impr = rng.integers(0, 5000, n)
+    clicks = rng.binomial(impr, 0.01)
+    cost = np.round(clicks * rng.uniform(2, 9, n) + impr * 0.002, 2)
+    conv = rng.binomial(clicks, 0.01).astype(float)
+    campaign = np.array(CAMPAIGNS[platform])[rng.integers(0, len(CAMPAIGNS[platform]), n)]
+    days = pd.date_range("2025-01-01", periods=90)[np.sort(rng.integers(0, 90, n))]
+    if platform == "linkedin":
+        cols = {"Start Date (in UTC)": days.strftime("%m/%d/%Y"), "Campaign Name": campaign, "Total Spent": cost,
+                "Impressions": impr, "Clicks": clicks, "Conversions": conv}
+        title = "Campaign Performance Report (in EUR)\nReport Start: 01/01/2025\n"
+    else:
+        cols = {"Day": days.strftime("%Y-%m-%d"), "Campaign": campaign, "Keyword": "hr compliance training",
+                "Impr.": [f"{v:,}" for v in impr], "Clicks": clicks, "Cost": [f"{v:,.2f}" for v in cost],
+                "Conversions": conv}
+        if platform == "youtube":
+            cols["Views"] = rng.binomial(impr, 0.2)
+        title = "Keyword report\nJanuary 1, 2025 - January 31, 2025\n"
+    df = pd.DataFrame(cols)
+    df.loc[::97, "Conversions"] = np.nan   # "--" cells
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(title)
+        df.to_csv(f, index=False, na_rep="--")
+        if platform != "linkedin":
+            f.write("Total: Account,--,--," + ",".join("--" for _ in range(len(cols) - 3)) + "\n")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, platform in enumerate(CAMPAIGNS):
+            path = Path(tmp) / f"{platform}_export.csv"
+            write_export(path, platform, n, seed=i)
+            paths.append(path)
+        size_mb = sum(p.stat().st_size for p in paths) / 1e6
+        print(f"{len(paths)} exports, {len(paths) * n:,} rows, {size_mb:.0f} MB")
+
+        print(f"{'chunk rows':>11} {'seconds':>9} {'rows/s':>12} {'peak MB':>8}")
+        for chunk_rows in (50_000, 250_000, 1_000_000):
+            t0 = time.perf_counter()
+            store, reports = ingest_exports(paths, chunk_rows=chunk_rows)
+            secs = time.perf_counter() - t0
+            rows = sum(r.rows for r in reports)
+            tracemalloc.start()
+            ingest_exports(paths, chunk_rows=chunk_rows)
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            print(f"{chunk_rows:>11,} {secs:>9.2f} {rows / secs:>12,.0f} {peak:>8.0f}")
+
+        print(f"\nfact store: {len(store):,} day x channel x campaign rows, {store.nbytes / 1e6:.2f} MB")
+        print(actuals_performance(store)[["Channel", "Spend (€)", "Clicks", "Conversions"]].to_string(index=False))
+        for r in reports:
+            print(f"{Path(r.path).name}: {r.platform}, {r.skipped} summary row(s), "
+                  f"{r.unmapped_rows:,} unmapped rows (€{r.unmapped_spend:,.0f})")
+
+
+if __name__ == "__main__":
+    main()
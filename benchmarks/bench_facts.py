@@ -0,0 +1,72 @@
+"""Benchmark: fact store rollups vs. re-running the groupbys over the raw facts.
+
+Appends synthetic daily facts (day × channel × funnel × campaign) one day at a
+time, the way exports arrive, then times reading the funnel / parent / week
+rollups against `groupby` over the equivalent pandas frame.
+
+Run from the repo root:  python benchmarks/bench_facts.py [days] [campaigns]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.channels import parent_channel
+from gtm.facts import FactStore
+from gtm.simulation import BASE_BUDGETS, CHANNEL_FUNNEL
+
+
+def day_facts(day, campaigns: int, rng: np.random.Generator) -> pd.DataFrame:
+    channels = np.array(list(BASE_BUDGETS))[np.arange(campaigns) % len(BASE_BUDGETS)]
+    return pd.DataFrame({
+        "day": day,
+        "channel": channels,
+        "funnel": [CHANNEL_FUNNEL[c] for c in channels],
+        "campaign": [f"campaign {i}" for i in range(campaigns)],
+        "spend": rng.uniform(0, 500, campaigns),
+        "impressions": rng.integers(0, 50_000, campaigns),
+        "clicks": rng.integers(0, 500, campaigns),
+        "conversions": rng.integers(0, 5, campaigns),
+    })
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    campaigns = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = np.random.default_rng(0)
+    batches = [day_facts(d, campaigns, rng) for d in pd.date_range("2025-01-01", periods=days)]
+
+    store = FactStore()
+    t0 = time.perf_counter()
+    for batch in batches:
+        store.append(batch)
+    append_s = time.perf_counter() - t0
+    raw = pd.concat(batches, ignore_index=True)
+    print(f"{len(store):,} facts ({days} days x {campaigns:,} campaigns); append {append_s / days * 1000:.2f} ms/day; "
+          f"store {store.nbytes / 1e6:.1f} MB vs pandas {raw.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+
+    groupbys = {
+        "funnel": lambda: raw.groupby("funnel")[["spend", "clicks"]].sum(),
+        "parent": lambda: raw.assign(parent=raw["channel"].map(parent_channel)).groupby("parent")[["spend", "clicks"]].sum(),
+        "week": lambda: raw.groupby(raw["day"].dt.to_period("W"))[["spend", "clicks"]].sum(),
+    }
+    print(f"{'rollup':<8} {'groupby ms':>11} {'rollup ms':>10}")
+    for name, groupby in groupbys.items():
+        print(f"{name:<8} {_time(groupby) * 1000:>11.2f} {_time(lambda: store.rollup(name)) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
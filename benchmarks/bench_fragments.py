@@ -0,0 +1,80 @@
+"""Benchmark: per-interaction cost of a full-page rerun vs. a fragment rerun.
+
+Starts the app headless, drives it over the same websocket protocol the
+browser uses and, for each interactive widget, times the rerun (send ->
+script finished) and counts the bytes streamed back. The same widget change
+is sent twice: once as a full-script rerun (how every interaction behaved
+before the fragments) and once scoped to the widget's fragment.
+
+Run from the repo root:  python benchmarks/bench_fragments.py
+"""
+
+import asyncio
+import os
+import statistics
+
+from app_client import Session, free_port, open_session, start_server, widget_state
+
+REPEAT = 5
+
+# (page script, tab to open first, widget type, widget label, new value)
+INTERACTIONS = [
+    ("1_Research_&_Prep.py", "ICP Explorer", "selectbox", "Select Industry", "Healthcare"),
+    ("2_Paid_Strategy.py", None, "slider", "Monthly budget (€)", [30000.0]),
+    ("4_Results_&_New_Strategy.py", None, "checkbox", "🎲 Monte Carlo mode (P10 / P50 / P90)", True),
+    ("4_Results_&_New_Strategy.py", None, "radio", "Optimise for", "SQLs"),
+]
+
+
+def _page_hash(session: Session, script: str) -> str:
+    name = os.path.splitext(script)[0].split("_", 1)[1].replace("_", " ")
+    return session.pages[name]
+
+
+async def _measure(port: int):
+    async with open_session(port) as conn:
+        await _run(Session(conn))
+
+
+async def _run(session: Session):
+    await session.rerun("")                         # main page; fills the page list
+
+    print(f"{'interaction':<44} {'full ms':>8} {'frag ms':>8} {'full KB':>8} {'frag KB':>8}")
+    for script, tab, kind, label, value in INTERACTIONS:
+        page = _page_hash(session, script)
+        await session.rerun(page)                   # render once to learn widget / fragment ids
+        base = [widget_state(session.tab_ids[0], "tabs", tab)] if tab else []
+        if base:
+            await session.rerun(page, base)         # open the (lazy) tab holding the widget
+        widget_id, _ = session.widgets[(kind, label)]
+        changed = base + [widget_state(widget_id, kind, value)]
+        await session.rerun(page, changed)          # warm caches for the new value
+
+        full, frag = [], []
+        for _ in range(REPEAT):
+            await session.rerun(page, base)
+            full.append(await session.rerun(page, changed))
+            await session.rerun(page, base)
+            # like the browser, use the fragment id from the latest full run
+            fragment_id = session.widgets[(kind, label)][1]
+            frag.append(await session.rerun(page, changed, fragment_id))
+        f_ms = statistics.median(s for s, _ in full) * 1000
+        g_ms = statistics.median(s for s, _ in frag) * 1000
+        f_kb = statistics.median(b for _, b in full) / 1024
+        g_kb = statistics.median(b for _, b in frag) / 1024
+        name = f"{script.split('_')[0]}: {label[:36]}"
+        print(f"{name:<44} {f_ms:>8.1f} {g_ms:>8.1f} {f_kb:>8.1f} {g_kb:>8.1f}")
+
+
+def main():
+    port = free_port()
+    proc = start_server(port)
+    try:
+        asyncio.run(_measure(port))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: Keyword Planner clustering with MinHash/LSH (gtm.keywords).
+
+Clusters a synthetic export (head term + modifier + qualifiers, heavy-tailed
+searches) and reports the time per stage. The baseline is the exact stem
+Jaccard over every keyword pair; it is timed on a sample and extrapolated to
+the full export. Purity is the share of keywords whose cluster's majority
+head term is their own head term.
+
+Run from the repo root:  python benchmarks/bench_keywords.py [keywords]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.keywords import cluster_keywords, cluster_summary, jaccard, sample_keywords, stem_matrix, stem_sets
+
+PAIR_SAMPLE = 2_000_000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    keywords = sample_keywords(n)
+    n = len(keywords)
+
+    t0 = time.perf_counter()
+    cluster = cluster_keywords(keywords["keyword"], keywords["searches"])
+    t1 = time.perf_counter()
+    summary = cluster_summary(keywords, cluster)
+    t2 = time.perf_counter()
+
+    # all-pairs baseline: exact Jaccard on a random sample of pairs, scaled to n * (n - 1) / 2
+    kw, stems, _ = stem_sets(keywords["keyword"])
+    sets = stem_matrix(kw, stems, n)
+    rng = np.random.default_rng(0)
+    u, v = rng.integers(0, n, PAIR_SAMPLE), rng.integers(0, n, PAIR_SAMPLE)
+    t3 = time.perf_counter()
+    jaccard(sets, u, v)
+    per_pair = (time.perf_counter() - t3) / PAIR_SAMPLE
+    pairs = n * (n - 1) / 2
+
+    sizes = np.bincount(cluster)
+    purity = pd.crosstab(cluster, keywords["head"]).max(axis=1).sum() / n
+    print(f"{n:,} keywords -> {len(sizes):,} clusters (largest {sizes.max():,}, singletons {(sizes == 1).sum():,})")
+    print(f"MinHash/LSH      {t1 - t0:8.2f}s  {n / (t1 - t0):>10,.0f} keywords/s   summary {t2 - t1:.2f}s")
+    print(f"all pairs (est.) {pairs * per_pair:8.0f}s  ({pairs:,.0f} pairs at {per_pair * 1e9:.0f} ns)")
+    print(f"purity vs head term {purity:.3f}")
+    print(summary.drop(columns="Keywords (examples)").head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: bulk negative-keyword matching over a search-term report (gtm.negatives).
+
+Builds a synthetic search-term report and a few thousand negatives (broad,
+phrase and exact, cut from the report's own terms so they hit), then times the
+report aggregation and `NegativeSet.match` over the distinct terms. The
+baseline is one regex scan of the distinct terms per negative; it is timed on
+a sample of negatives and extrapolated, and its hits must equal the engine's.
+
+Run from the repo root:  python benchmarks/bench_negatives.py [report rows] [negatives]
+"""
+
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.negatives import (
+    SAMPLE_NEGATIVES, NegativeSet, _combine, _scan, _term_facts, parse_negatives, sample_search_terms,
+)
+
+REGEX_SAMPLE = 60
+
+
+def synthetic_negatives(terms: pd.Series, n: int, seed: int = 1) -> list[str]:
+    """
+    Ads Editor lines cut from random terms so they hit: [exact] whole terms, "phrase" of a term's
+    last 3 words, broad triples of a term's words in any order (the sample has a small vocabulary,
+    so shorter negatives would block most terms).
+    """
+    rng = np.random.default_rng(seed)
+    words = terms.iloc[rng.integers(0, len(terms), n)].str.split().tolist()
+    lines = list(SAMPLE_NEGATIVES)
+    for w, kind in zip(words, rng.integers(0, 3, n)):
+        if kind == 2 or len(w) < 4:
+            lines.append(f"[{' '.join(w)}]")
+        elif kind == 1:
+            lines.append(f'"{" ".join(w[-3:])}"')
+        else:
+            lines.append(" ".join(w[i] for i in rng.permutation(len(w))[:3]))
+    return lines
+
+
+def regex_hits(terms: pd.Series, negatives: pd.DataFrame) -> set:
+    """(term, negative) pairs, one regex scan of all terms per negative."""
+    text = terms.str.lower().str.replace(r"[^\w&]+", " ", regex=True).str.strip()
+    hits = set()
+    for i, (match, neg) in enumerate(zip(negatives["match"], negatives["text"])):
+        words = [re.escape(w) for w in re.sub(r"[^\w&]+", " ", neg.lower()).split()]
+        if match == "exact":
+            ok = text.str.fullmatch(" ".join(words))
+        elif match == "phrase":
+            ok = text.str.contains(rf"(?:^| ){' '.join(words)}(?: |$)")
+        else:
+            ok = np.logical_and.reduce([text.str.contains(rf"(?:^| ){w}(?: |$)") for w in words])
+        hits.update((t, i) for t in np.flatnonzero(np.asarray(ok, dtype=bool)))
+    return hits
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    n_negatives = int(sys.argv[2]) if len(sys.argv) > 2 else 3_000
+    t0 = time.perf_counter()
+    report = sample_search_terms(n_rows, n_terms=max(n_rows // 10, 1_000))
+    t1 = time.perf_counter()
+    facts = _combine([_term_facts(report)])
+    t2 = time.perf_counter()
+    terms = pd.Series(pd.unique(facts["search_term"]))
+    negatives = NegativeSet(parse_negatives(synthetic_negatives(terms, n_negatives), "bench"))
+    t3 = time.perf_counter()
+    term, neg = negatives.match(terms)
+    t4 = time.perf_counter()
+    print(f"{len(report):,} report rows, {len(terms):,} distinct terms, {len(negatives):,} negatives "
+          f"({negatives.patterns:,} patterns); sample built in {t1 - t0:.1f}s")
+    print(f"aggregate report {t2 - t1:6.2f}s  {len(report) / (t2 - t1):>12,.0f} rows/s")
+    print(f"compile          {t3 - t2:6.2f}s")
+    print(f"match            {t4 - t3:6.2f}s  {len(terms) / (t4 - t3):>12,.0f} terms/s  ({len(term):,} hits)")
+
+    picked = np.random.default_rng(2).choice(len(negatives), min(REGEX_SAMPLE, len(negatives)), replace=False)
+    t5 = time.perf_counter()
+    expected = regex_hits(terms, negatives.negatives.iloc[picked])
+    per_negative = (time.perf_counter() - t5) / len(picked)
+    got = {(t, int(np.flatnonzero(picked == n)[0])) for t, n in zip(term, neg) if n in set(picked)}
+    assert got == expected, f"{len(got ^ expected)} pairs differ from the regex scan"
+    print(f"regex per negative {per_negative * len(negatives):6.0f}s (est., {per_negative * 1000:.0f} ms x "
+          f"{len(negatives):,}); hits match on {len(picked)} negatives")
+
+    scan = _scan(facts, negatives, len(report), (), time.perf_counter())
+    print(f"full scan        {scan.seconds:6.2f}s  (match + {len(scan.blocked):,} negative x funnel rows, "
+          f"{len(scan.terms):,} blocked term x funnel rows)")
+
+
+if __name__ == "__main__":
+    main()
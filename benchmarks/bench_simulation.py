@@ -0,0 +1,37 @@
+"""Benchmark: Part 4 Monte Carlo draws (single batch and scenario pool).
+
+Run from the repo root:  python benchmarks/bench_simulation.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.simulation import BASE_BUDGETS, monte_carlo, monte_carlo_scenarios
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'draws/channel':>14} {'seconds':>9} {'draws/s':>12}")
+    for n in (10_000, 100_000, 1_000_000):
+        secs = _time(lambda: monte_carlo(BASE_BUDGETS, n_draws=n, seed=0))
+        print(f"{n:>14,} {secs:>9.3f} {n * len(BASE_BUDGETS) / secs:>12,.0f}")
+
+    scenarios = {f"€{k}K": {ch: v * k / 15 for ch, v in BASE_BUDGETS.items()} for k in range(15, 135, 15)}
+    serial = _time(lambda: monte_carlo_scenarios(scenarios, seed=0), repeat=1)
+    pooled = _time(lambda: monte_carlo_scenarios(scenarios, seed=0, processes=os.cpu_count()), repeat=1)
+    print(f"\n{len(scenarios)} scenarios x 100,000 draws: serial {serial:.2f}s, "
+          f"process pool ({os.cpu_count()} workers) {pooled:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: cold start per page (new server process -> first paint / fully rendered).
+
+Each sample starts a fresh `streamlit run app.py`, opens one websocket session
+straight onto the page and records, from process launch:
+  ready   - server health endpoint answers
+  paint   - first element of the page arrives
+  done    - the page script has finished
+
+Run from the repo root:  python benchmarks/bench_startup.py [samples]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from app_client import Session, free_port, open_session, start_server
+
+# url path -> label ("" is the home page)
+PAGES = {
+    "": "Home",
+    "Research_&_Prep": "1 Research & Prep",
+    "Paid_Strategy": "2 Paid Strategy",
+    "Prevention_&_Execution": "3 Prevention & Execution",
+    "Results_&_New_Strategy": "4 Results & New Strategy",
+}
+
+
+async def _first_run(port: int, page_name: str) -> tuple[float, float]:
+    async with open_session(port) as conn:
+        session = Session(conn)
+        await session.rerun(page_name=page_name)
+        return session.first_delta, time.perf_counter()
+
+
+def cold_start(page_name: str) -> tuple[float, float, float]:
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = start_server(port)
+    ready = time.perf_counter()
+    try:
+        paint, done = asyncio.run(_first_run(port, page_name))
+    finally:
+        proc.terminate()
+        proc.wait()
+    return ready - t0, paint - t0, done - t0
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'page':<26} {'ready s':>8} {'paint s':>8} {'done s':>8}   (median of {samples})")
+    for page_name, label in PAGES.items():
+        runs = [cold_start(page_name) for _ in range(samples)]
+        ready, paint, done = (statistics.median(r[i] for r in runs) for i in range(3))
+        print(f"{label:<26} {ready:>8.2f} {paint:>8.2f} {done:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
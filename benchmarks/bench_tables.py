@@ -0,0 +1,58 @@
+"""Benchmark: whole-frame tables vs server-side pages (gtm.tables).
+
+For keyword-list frames of growing size, compares the Arrow payload
+`st.dataframe` sends for the whole frame with the payload of one page, and
+times a page request cold (sort order and filter mask computed) and warm
+(memoized, as when paging through the same table).
+
+Run from the repo root:  python benchmarks/bench_tables.py [max_rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.tables import TableIndex
+
+
+def keywords(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        "Keyword": [f"keyword {i} {'compliance' if i % 7 == 0 else 'training'}" for i in range(n)],
+        "Cluster": rng.choice(["Compliance", "Leadership", "Onboarding", "Security"], n),
+        "Avg_Monthly_Searches": rng.integers(10, 50_000, n),
+        "CPC (€)": rng.gamma(2.0, 1.5, n).round(2),
+        "Competition": rng.choice(["Low", "Medium", "High"], n),
+    })
+
+
+def ms(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'rows':>10} {'full KB':>10} {'page KB':>8} {'full ms':>8} {'cold ms':>8} {'warm ms':>8}")
+    n = 10_000
+    while n <= top:
+        df = keywords(n)
+        full_ms = ms(lambda: convert_pandas_df_to_arrow_bytes(df))
+        full = len(convert_pandas_df_to_arrow_bytes(df))
+        index = TableIndex(df)
+        ask = lambda: index.window("compliance", sort="Avg_Monthly_Searches", ascending=False, page=3)
+        cold = ms(ask)
+        warm = ms(lambda: convert_pandas_df_to_arrow_bytes(ask().rows))
+        page = len(convert_pandas_df_to_arrow_bytes(ask().rows))
+        print(f"{n:>10,} {full / 1024:>10,.0f} {page / 1024:>8.1f} {full_ms:>8.0f} {cold:>8.0f} {warm:>8.1f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Benchmark: session validation over event logs (events/sec, CSV and Parquet).
+
+Writes a synthetic GA4-style event log (`gtm.traffic.sample_events`) and scores
+it in streaming batches with `gtm.traffic.score_logs`.
+
+Run from the repo root:  python benchmarks/bench_traffic.py [sessions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gtm.traffic import reason_counts, sample_events, score_logs
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    events = sample_events(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"parquet": Path(tmp) / "events.parquet", "csv": Path(tmp) / "events.csv"}
+        events.to_parquet(paths["parquet"], index=False)
+        events.to_csv(paths["csv"], index=False)
+        print(f"{len(events):,} events, {n:,} sessions")
+
+        print(f"{'format':<8} {'seconds':>8} {'events/s':>12} {'filtered':>9}")
+        for fmt, path in paths.items():
+            t0 = time.perf_counter()
+            scored, report = score_logs([path])
+            secs = time.perf_counter() - t0
+            filtered = (scored["status"] == "filtered").mean()
+            print(f"{fmt:<8} {secs:>8.2f} {report.events / secs:>12,.0f} {filtered:>9.1%}")
+    print()
+    print(reason_counts(scored).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
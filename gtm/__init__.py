@@ -0,0 +1,5 @@
+"""Headless compute helpers for the &ranj go-to-market case study.
+
+Everything in this package is importable without Streamlit so the pages,
+benchmarks and batch jobs share one implementation of the math.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from gtm.cli import main
+
+sys.exit(main())
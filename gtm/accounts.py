@@ -0,0 +1,210 @@
+"""
+Account universe and facet bitmaps for the Part 1 ICP explorer.
+
+An account list (one row per company: industry, employees, region, tier, buying
+role) is indexed once per file. Every value of every facet gets a packed row
+bitmap -- uint64 words, bit i set when row i has that value -- so a multi-select
+filter is an OR of bitmaps within a facet and an AND across facets over n / 64
+words, and a count is a popcount. Nothing rescans the frame when a selection
+changes.
+
+    index = FacetIndex(accounts)
+    mask = index.select({"industry": ["Healthcare"], "size_band": ["1,000–9,999"]})
+    index.count(mask)                     # matching accounts
+    index.facet_counts("region", selection)   # per region, given the other facets
+
+An account list in data/ (`accounts.csv` / `.parquet` / `.arrow`, schema in
+`gtm.ingest.SCHEMAS`) replaces the built-in mock universe. Accounts without a
+tier are tiered by `gtm.tiering.ICP_ENGINE`.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import SCHEMAS, IngestError, load_table
+from gtm.tiering import ICP_ENGINE
+
+MOCK_ACCOUNTS = 500_000
+
+# facet column -> label
+FACETS = {
+    "industry": "Industry",
+    "size_band": "Company size",
+    "region": "Region",
+    "tier": "Tier",
+    "role": "Buying role",
+}
+INDEXED = (*FACETS, "use_case")   # use case is counted per tier, not filtered on
+SIZE_EDGES = [0, 500, 1_000, 10_000, np.inf]   # employees, left-closed
+SIZE_BANDS = ["1–499", "500–999", "1,000–9,999", "10,000+"]
+
+# np.bitwise_count needs NumPy >= 2.0; older NumPy counts bytes through a 256-entry table
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1, dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        words = np.ascontiguousarray(words)
+        return _BYTE_BITS[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def size_band(employees) -> pd.Categorical:
+    """Employee counts -> SIZE_BANDS (the bands the ICP tiers are written in)."""
+    return pd.cut(np.asarray(employees, dtype=float), SIZE_EDGES, right=False, labels=SIZE_BANDS)
+
+
+# ---------------------------------------------------------------------------
+# Facet index
+# ---------------------------------------------------------------------------
+
+class FacetIndex:
+    """Per-facet value -> row bitmap over one account frame; selections are {facet: [values]}."""
+
+    def __init__(self, df: pd.DataFrame, facets=tuple(FACETS)):
+        self.df = df
+        self.n = len(df)
+        self.words = (self.n + 63) // 64
+        self.values: dict[str, list] = {}
+        self.bitmaps: dict[str, np.ndarray] = {}     # facet -> (values, words) uint64
+        for facet in facets:
+            codes, uniques = pd.factorize(df[facet], sort=True)
+            self.values[facet] = list(uniques)
+            self.bitmaps[facet] = self._bitmaps(codes, len(uniques))
+        # all rows, with the padding bits of the last word left clear
+        self.all = np.packbits(np.arange(self.words * 64) < self.n, bitorder="little").view(np.uint64)
+
+    def _bitmaps(self, codes: np.ndarray, n_values: int) -> np.ndarray:
+        """
+        (values, words) bitmaps from factorize codes without a dense values x rows matrix: rows are
+        grouped by value (ascending within a group), and the bits landing in one word are OR-ed together.
+        """
+        out = np.zeros(n_values * self.words, dtype=np.uint64)
+        # narrow codes sort by radix (stable argsort of <= 16-bit ints)
+        rows = np.argsort(codes.astype(np.int16) if n_values < 2 ** 15 else codes, kind="stable")
+        rows = rows[codes[rows] >= 0]                  # missing values are in no bitmap
+        if len(rows):
+            slot = codes[rows].astype(np.int64) * self.words + (rows >> 6)
+            bits = np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64))
+            starts = np.flatnonzero(np.r_[True, slot[1:] != slot[:-1]])
+            out[slot[starts]] = np.bitwise_or.reduceat(bits, starts)
+        return out.reshape(n_values, self.words)
+
+    def select(self, selection: dict, skip: str | None = None) -> np.ndarray:
+        """Bitmap of rows matching every facet's values (any of them); empty selections match all."""
+        mask = self.all.copy()
+        for facet, chosen in selection.items():
+            if facet == skip or not chosen:
+                continue
+            lookup = {v: i for i, v in enumerate(self.values[facet])}
+            picked = [lookup[v] for v in chosen if v in lookup]
+            mask &= np.bitwise_or.reduce(self.bitmaps[facet][picked], axis=0) if picked else 0
+        return mask
+
+    def count(self, mask: np.ndarray) -> int:
+        return int(_popcount(mask).sum())
+
+    def facet_counts(self, facet: str, selection: dict) -> pd.Series:
+        """Rows per value of `facet` under the other facets' selections (what picking that value would give)."""
+        others = self.select(selection, skip=facet)
+        counts = _popcount(self.bitmaps[facet] & others).sum(axis=1, dtype=np.int64)
+        return pd.Series(counts, index=self.values[facet], name=facet)
+
+    def cross_counts(self, a: str, b: str, mask: np.ndarray | None = None) -> pd.DataFrame:
+        """Rows per (a, b) value pair within `mask` (all rows if None); pairs with no rows dropped."""
+        within = self.bitmaps[a] if mask is None else self.bitmaps[a] & mask
+        counts = _popcount(within[:, None, :] & self.bitmaps[b][None, :, :]).sum(axis=2, dtype=np.int64)
+        out = pd.DataFrame(counts, index=pd.Index(self.values[a], name=a),
+                           columns=pd.Index(self.values[b], name=b)).stack().rename("accounts").reset_index()
+        return out[out["accounts"] > 0].reset_index(drop=True)
+
+    def rows(self, mask: np.ndarray) -> np.ndarray:
+        """Row positions set in `mask`."""
+        return np.flatnonzero(np.unpackbits(mask.view(np.uint8), bitorder="little")[:self.n])
+
+    def frame(self, mask: np.ndarray) -> pd.DataFrame:
+        return self.df.iloc[self.rows(mask)]
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Account frame with the `size_band` facet derived from employees, and `tier` / `use_case`
+    from the ICP tier rules. A `tier` column in the file wins where it is filled (blank tiers
+    take the engine's); the use case is the engine's where the two tiers agree, else the
+    tier's own when every rule for it names one use case, else left blank.
+    """
+    tiered = ICP_ENGINE.assign(df)
+    if "tier" in df:
+        stated = df["tier"].astype("string").str.strip().replace("", pd.NA)
+        tier = stated.fillna(tiered["tier"].astype("string"))
+        use_cases = {}
+        for rule in ICP_ENGINE.rules:
+            use_cases.setdefault(rule.tier, set()).add(rule.use_case)
+        use_cases.setdefault(ICP_ENGINE.default[0], set()).add(ICP_ENGINE.default[1])
+        own = {t: next(iter(u)) for t, u in use_cases.items() if len(u) == 1}
+        agree = (tier == tiered["tier"].astype("string")).fillna(False).to_numpy(dtype=bool)
+        use_case = np.where(agree, tiered["use_case"].astype(object), tier.map(own).astype(object))
+        tiered = pd.DataFrame({
+            "tier": pd.Categorical(tier, categories=ICP_ENGINE.tiers.union(tier.dropna().unique())),
+            "use_case": pd.Categorical(use_case, categories=ICP_ENGINE.use_cases),
+        }, index=df.index)
+    return df.assign(size_band=size_band(df["employees"]), **tiered)
+
+
+@lru_cache(maxsize=2)
+def cached_index(key: tuple | None) -> tuple[FacetIndex, str | None]:
+    """
+    Process-wide FacetIndex for the account file at `key` (`gtm.ingest.file_key`), or the mock
+    universe for None; a file that cannot be read falls back to the mock, with the error.
+    """
+    error = None
+    if key is not None:
+        try:
+            df, _ = load_table(key[0], SCHEMAS["accounts"])
+            return FacetIndex(prepare(df), INDEXED), None
+        except IngestError as e:
+            error = str(e)
+    return FacetIndex(prepare(mock_accounts()), INDEXED), error
+
+
+# ---------------------------------------------------------------------------
+# Mock universe
+# ---------------------------------------------------------------------------
+
+# industry -> share of US accounts
+MOCK_INDUSTRIES = {
+    "Banking/Financial Services": 0.09, "Healthcare": 0.12, "Manufacturing / HSE": 0.13, "Tech / IT": 0.11,
+    "FMCG / Retail": 0.14, "Education / Public Sector": 0.10, "Logistics": 0.08, "Energy / Utilities": 0.05,
+    "Professional Services": 0.12, "Hospitality": 0.06,
+}
+MOCK_REGIONS = {"US Northeast": 0.22, "Midwest": 0.21, "West Coast": 0.19, "South": 0.26, "Southwest": 0.12}
+MOCK_ROLES = {"CHRO": 0.2, "L&D Director": 0.3, "Compliance Officer": 0.2, "HSE Director": 0.12, "Ops / BU VP": 0.18}
+
+
+def mock_accounts(n: int = MOCK_ACCOUNTS, seed: int = 11) -> pd.DataFrame:
+    """
+    A synthetic US account universe: industry, region and buying role drawn from the shares above,
+    employees log-normal (median ~300). No tier: `prepare` assigns it from the ICP tier rules.
+    """
+    rng = np.random.default_rng(seed)
+
+    def draw(shares: dict) -> pd.Categorical:
+        labels = list(shares)
+        p = np.array(list(shares.values()))
+        return pd.Categorical.from_codes(rng.choice(len(labels), n, p=p / p.sum()), labels)
+
+    industry = draw(MOCK_INDUSTRIES)
+    employees = np.clip(rng.lognormal(np.log(300), 1.4, n), 10, 400_000).astype(np.int32)
+    return pd.DataFrame({
+        "company": pd.array([f"Account {i:06d}" for i in range(n)], dtype="string"),
+        "industry": industry,
+        "employees": employees,
+        "region": draw(MOCK_REGIONS),
+        "role": draw(MOCK_ROLES),
+    })
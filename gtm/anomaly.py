@@ -0,0 +1,242 @@
+"""
+Streaming anomaly detection over per-minute traffic series (the Part 3 "GA4 anomaly detection").
+
+Every series (channel x metric) keeps, per seasonal slot (hour of day), an EWMA
+baseline and an EWMA of absolute deviations as its scale. Each new minute is
+one vectorised update across all series, so the work per data point is O(1)
+and hundreds of series stream together:
+
+    z     = (x - mean[slot]) / max(1.2533 * dev[slot], sqrt(mean[slot]))   # Poisson floor for sparse counts
+    mean += alpha * (clip(x, mean +- CLIP * scale) - mean)                 # bursts barely move the baseline
+
+Minutes at or above Z_THRESHOLD are merged into flagged windows. Sessions and
+clicks bursting while conversions stay flat is the bot-burst pattern Phase 1
+watches for.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import DATA_DIR, IngestError
+from gtm.simulation import BASE_BUDGETS
+
+MONITORING_DIR = DATA_DIR / "monitoring"
+MONITORING_PATTERNS = ("*.csv", "*.csv.gz", "*.parquet")
+METRICS = ("sessions", "clicks", "conversions")
+
+SLOT_MINUTES = 60      # seasonal slot = hour of day
+SEASON = 24
+ALPHA = 0.02           # ~50 updates of memory per slot
+CLIP = 2.0             # baseline updates are winsorised to mean +- CLIP * scale
+WARMUP = 20            # updates a slot needs before it can flag
+Z_THRESHOLD = 5.0
+MIN_MINUTES = 3        # shorter runs are noise on sparse series
+MERGE_GAP = 2          # flagged runs this close (minutes) become one window
+
+# Canonical column -> names used by monitoring exports (first match wins)
+MONITORING_COLUMNS = {
+    "timestamp": ("minute", "timestamp", "time", "datetime", "date_hour_minute"),
+    "channel": ("channel", "channel_group", "session_default_channel_group", "source"),
+}
+
+
+class Series(NamedTuple):
+    minutes: np.ndarray       # (T,) epoch minutes, consecutive
+    values: np.ndarray        # (T, S) float64
+    labels: list              # S x (channel, metric)
+
+
+class StreamingDetector:
+    """Seasonal robust-EWMA z-scores for `n_series` series, one `update` per minute."""
+
+    def __init__(self, n_series: int, alpha: float = ALPHA, clip: float = CLIP, warmup: int = WARMUP,
+                 season: int = SEASON, slot_minutes: int = SLOT_MINUTES):
+        self.alpha, self.clip, self.warmup = alpha, clip, warmup
+        self.season, self.slot_minutes = season, slot_minutes
+        self.mean = np.zeros((season, n_series))
+        self.dev = np.zeros((season, n_series))
+        self.seen = np.zeros((season, n_series), dtype=np.int64)
+
+    def update(self, minute: int, x: np.ndarray) -> np.ndarray:
+        """z-score of every series at `minute` (NaN while its slot warms up or when x is NaN)."""
+        slot = (minute // self.slot_minutes) % self.season
+        mean, dev, seen = self.mean[slot], self.dev[slot], self.seen[slot]
+        ok = ~np.isnan(x)
+        scale = np.maximum(1.2533 * dev, np.sqrt(np.maximum(mean, 1.0)))
+        z = np.where(ok & (seen >= self.warmup), (x - mean) / scale, np.nan)
+
+        # exact running mean while warming up, EWMA after; winsorised once warm
+        alpha = np.maximum(self.alpha, 1.0 / (seen + 1))
+        xc = np.where(seen >= self.warmup, np.clip(x, mean - self.clip * scale, mean + self.clip * scale), x)
+        step = np.where(ok, alpha, 0.0)
+        delta = np.nan_to_num(xc - mean)
+        self.dev[slot] = dev + step * (np.abs(delta) - dev)
+        self.mean[slot] = mean + step * delta
+        self.seen[slot] = seen + ok
+        return z
+
+    def run(self, minutes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Stream a (T, S) block through `update`; returns the (T, S) z-scores."""
+        z = np.empty(values.shape)
+        for t, minute in enumerate(minutes):
+            z[t] = self.update(int(minute), values[t])
+        return z
+
+
+# ---------------------------------------------------------------------------
+# Flagged windows
+# ---------------------------------------------------------------------------
+
+def flag_windows(series: Series, z: np.ndarray, threshold: float = Z_THRESHOLD,
+                 min_minutes: int = MIN_MINUTES, gap: int = MERGE_GAP) -> pd.DataFrame:
+    """One row per flagged window: channel, metric, start, end (exclusive), minutes, peak_z."""
+    columns = ["channel", "metric", "start", "end", "minutes", "peak_z"]
+    hot = np.nan_to_num(z, nan=-np.inf) >= threshold
+    # run boundaries along time, series-major so the runs of one series are contiguous
+    edges = np.diff(np.pad(hot.T, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    s_idx, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    if not len(starts):
+        return pd.DataFrame(columns=columns)
+
+    runs = pd.DataFrame({"series": s_idx, "start": starts, "end": ends})
+    new = (runs["series"].diff() != 0) | (runs["start"] - runs["end"].shift() > gap)
+    runs = runs.groupby(new.cumsum()).agg(series=("series", "first"), start=("start", "first"), end=("end", "last"))
+    runs = runs[runs["end"] - runs["start"] >= min_minutes]
+
+    zt = np.nan_to_num(z.T, nan=-np.inf)
+    peak = [zt[s, a:b].max() for s, a, b in runs[["series", "start", "end"]].itertuples(index=False)]
+    labels = np.array(series.labels, dtype=object).reshape(-1, 2)
+    return pd.DataFrame({
+        "channel": labels[runs["series"], 0],
+        "metric": labels[runs["series"], 1],
+        "start": pd.to_datetime(series.minutes[runs["start"]] * 60, unit="s"),
+        "end": pd.to_datetime((series.minutes[runs["end"] - 1] + 1) * 60, unit="s"),
+        "minutes": (runs["end"] - runs["start"]).to_numpy(),
+        "peak_z": np.round(peak, 1),
+    }, columns=columns)
+
+
+def bot_bursts(windows: pd.DataFrame) -> pd.DataFrame:
+    """Session / click windows with no overlapping conversion window on the same channel."""
+    traffic = windows[windows["metric"] != "conversions"]
+    conv = windows[windows["metric"] == "conversions"]
+    if conv.empty:
+        return traffic.reset_index(drop=True)
+    pairs = traffic.reset_index().merge(conv[["channel", "start", "end"]], on="channel", how="left",
+                                        suffixes=("", "_conv"))
+    overlap = (pairs["start_conv"] < pairs["end"]) & (pairs["end_conv"] > pairs["start"])
+    explained = pairs.loc[overlap, "index"].unique()
+    return traffic.drop(index=explained).reset_index(drop=True)
+
+
+def detect(series: Series, threshold: float = Z_THRESHOLD, **detector) -> pd.DataFrame:
+    """Stream every series from its first minute and return the flagged windows."""
+    z = StreamingDetector(series.values.shape[1], **detector).run(series.minutes, series.values)
+    return flag_windows(series, z, threshold)
+
+
+# ---------------------------------------------------------------------------
+# Per-minute series
+# ---------------------------------------------------------------------------
+
+def minute_series(df: pd.DataFrame) -> Series:
+    """
+    Long frame (timestamp, channel, metric columns) -> dense per-minute matrix.
+    Rows are summed into their minute, so both per-minute aggregates and event rows work.
+    """
+    metrics = [m for m in METRICS if m in df]
+    if not metrics:
+        raise IngestError(f"no metric column (expected one of {', '.join(METRICS)})")
+    ts = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+    keep = ts.notna().to_numpy()
+    minute = ts[keep].to_numpy(dtype="datetime64[ns]").astype(np.int64) // 60_000_000_000
+    codes, channels = pd.factorize(df["channel"][keep].astype("string").fillna("(not set)"), sort=True)
+    if not len(minute):
+        return Series(np.zeros(0, dtype=np.int64), np.zeros((0, 0)), [])
+    first = minute.min()
+    n_t, n_c = int(minute.max() - first) + 1, len(channels)
+    flat = (minute - first) * n_c + codes
+    blocks = [np.bincount(flat, weights=df[m][keep].fillna(0).to_numpy(dtype=float), minlength=n_t * n_c)
+              .reshape(n_t, n_c) for m in metrics]
+    return Series(
+        np.arange(first, first + n_t),
+        np.hstack(blocks),
+        [(ch, m) for m in metrics for ch in channels],
+    )
+
+
+def monitoring_files(monitoring_dir=MONITORING_DIR) -> list[Path]:
+    monitoring_dir = Path(monitoring_dir)
+    return sorted({p for pattern in MONITORING_PATTERNS for p in monitoring_dir.glob(pattern)})
+
+
+def read_monitoring(path) -> pd.DataFrame:
+    """One monitoring export with canonical column names; raises `IngestError` on a missing column."""
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    rename = {}
+    for canon, aliases in MONITORING_COLUMNS.items():
+        col = next((a for a in aliases if a in df), None)
+        if col is None:
+            raise IngestError(f"{path.name}: missing column {canon} (one of {', '.join(aliases)})")
+        rename[col] = canon
+    return df.rename(columns=rename)[list(rename.values()) + [m for m in METRICS if m in df]]
+
+
+def read_monitoring_files(paths) -> tuple[pd.DataFrame, list[str]]:
+    """All monitoring exports in one frame; files that fail to read are reported and skipped."""
+    frames, errors = [], []
+    for path in paths:
+        try:
+            frames.append(read_monitoring(path))
+        except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+            errors.append(str(e) if isinstance(e, IngestError) else f"{Path(path).name}: {e}")
+    return (pd.concat(frames, ignore_index=True) if frames else None), errors
+
+
+def sample_minutes(days: int = 14, channels=None, bursts: int = 6, seed: int = 11) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Per-minute sessions / clicks / conversions for Phase 1 with injected bot bursts
+    (sessions and clicks spike, conversions do not). Returns (frame, injected bursts).
+    """
+    rng = np.random.default_rng(seed)
+    channels = list(BASE_BUDGETS) if channels is None else list(channels)
+    budgets = np.array([BASE_BUDGETS.get(ch, 2000) for ch in channels], dtype=float)
+    n = days * 1440
+    minute = np.arange(n)
+    hour = (minute // 60) % 24
+    weekday = (minute // 1440) % 7 < 5
+    # business-hours curve, quieter weekends
+    shape = (0.15 + np.exp(-0.5 * ((hour - 13) / 3.5) ** 2)) * np.where(weekday, 1.0, 0.45)
+    rate = shape[:, None] * (budgets / 600)[None, :]
+    sessions = rng.poisson(rate)
+    clicks = sessions + rng.poisson(rate * 0.15)
+    conversions = rng.binomial(sessions, 0.03)
+
+    injected = []
+    for _ in range(bursts):
+        c = int(rng.integers(len(channels)))
+        start = int(rng.integers(1440, n - 60))
+        length = int(rng.integers(10, 45))
+        extra = rng.poisson(float(rng.uniform(15, 40)), length)
+        sessions[start:start + length, c] += extra
+        clicks[start:start + length, c] += extra + rng.poisson(5, length)
+        injected.append((channels[c], start, start + length))
+
+    t0 = pd.Timestamp("2025-01-06")   # a Monday
+    frame = pd.DataFrame({
+        "timestamp": t0 + pd.to_timedelta(np.repeat(minute, len(channels)), unit="min"),
+        "channel": np.tile(channels, n),
+        "sessions": sessions.ravel(),
+        "clicks": clicks.ravel(),
+        "conversions": conversions.ravel(),
+    })
+    bursts_df = pd.DataFrame(injected, columns=["channel", "start", "end"])
+    for col in ("start", "end"):
+        bursts_df[col] = t0 + pd.to_timedelta(bursts_df[col], unit="min")
+    return frame, bursts_df
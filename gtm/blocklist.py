@@ -0,0 +1,288 @@
+"""
+IP / device blocklists for click and session checks (Part 3 "Ongoing Monitoring").
+
+List files (one entry per line, `#` comments; FireHOL `.netset`, `.txt` or the
+first column of a `.csv`) hold IPv4/IPv6 addresses, CIDRs, `a-b` ranges or
+device IDs. Ranges go into sorted interval arrays -- IPv4 as uint32, IPv6 as
+16-byte big-endian `S16` strings (byte order == numeric order) -- with a
+running maximum of the range ends, so overlapping ranges need no merge and a
+batch lookup is a single `searchsorted`. Device IDs are kept as a sorted array
+of 64-bit hashes.
+
+    bl = BlocklistWatcher()               # data/blocklists/, reloaded when a file changes
+    hit = bl.current().lookup(ips, device_ids)   # list index per row, -1 = not blocked
+"""
+
+import ipaddress
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import DATA_DIR, file_key
+
+BLOCKLIST_DIR = DATA_DIR / "blocklists"
+BLOCKLIST_PATTERNS = ("*.txt", "*.csv", "*.netset", "*.ipset")
+NOT_BLOCKED = -1
+
+_V4_RE = r"^(?P<a>\d{1,3})\.(?P<b>\d{1,3})\.(?P<c>\d{1,3})\.(?P<d>\d{1,3})(?:/(?P<p>\d{1,2}))?$"
+
+
+class IPArray(NamedTuple):
+    """Integer-encoded addresses: `kind` is 4, 6 or 0 (not an address) per row."""
+    kind: np.ndarray      # int8
+    v4: np.ndarray        # uint32 (0 where kind != 4)
+    v6: np.ndarray        # S16 (b"" where kind != 6)
+
+
+class BlocklistReport(NamedTuple):
+    lists: tuple          # list names, in lookup-code order
+    v4_ranges: int
+    v6_ranges: int
+    devices: int
+    invalid: int
+    seconds: float
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def _v4_parts(values: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(is IPv4, address, prefix length) for each string; dotted quads parsed column-wise (Arrow regex)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    parts = pc.extract_regex(pa.array(values.to_numpy(dtype=object, na_value=None), type=pa.string()), _V4_RE)
+    valid = pc.fill_null(pc.is_valid(parts), False)
+    # child fields of non-matching rows are undefined, so mask them before casting
+    field = lambda name, default: pc.cast(
+        pc.if_else(pc.and_(valid, pc.not_equal(parts.field(name), "")), parts.field(name), default), pa.int64()
+    ).to_numpy()
+    octets = np.column_stack([field(k, "0") for k in "abcd"])
+    prefix = field("p", "32")
+    ok = valid.to_numpy(zero_copy_only=False) & (octets <= 255).all(axis=1) & (prefix <= 32)
+    addr = (octets.astype(np.uint64) << np.array([24, 16, 8, 0], dtype=np.uint64)).sum(axis=1)
+    return ok, (addr & 0xFFFFFFFF).astype(np.uint32), prefix
+
+
+def encode_ips(values) -> IPArray:
+    """Encode address strings; each distinct value is parsed once (IPv4-mapped IPv6 counts as IPv4)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype="string").str.strip(), use_na_sentinel=True)
+    uniq = pd.Series(uniques, dtype="string")
+    is4, v4, prefix = _v4_parts(uniq)
+    is4 &= prefix == 32
+    kind = np.where(is4, 4, 0).astype(np.int8)
+    v6 = np.zeros(len(uniq), dtype="S16")
+    for i in np.flatnonzero(~is4 & uniq.str.contains(":", regex=False).fillna(False).to_numpy()):
+        try:
+            ip = ipaddress.IPv6Address(uniq.iloc[i].split("%")[0])
+        except ValueError:
+            continue
+        if ip.ipv4_mapped is not None:
+            kind[i], v4[i] = 4, int(ip.ipv4_mapped)
+        else:
+            kind[i], v6[i] = 6, ip.packed
+    pad = lambda a, fill: np.append(a, np.array([fill], dtype=a.dtype))   # code -1 (missing) -> last slot
+    return IPArray(pad(kind, 0)[codes], pad(v4, 0)[codes], pad(v6, b"")[codes])
+
+
+def hash_devices(values) -> np.ndarray:
+    """64-bit hashes of normalised (trimmed, lower-case) device IDs."""
+    ids = pd.Series(values, dtype="string").str.strip().str.lower().fillna("")
+    return pd.util.hash_array(ids.to_numpy(dtype=object), categorize=True)
+
+
+# -----------------------------
+# Interval index
+# -----------------------------
+class _Intervals:
+    """Sorted [start, end] ranges with a running max of the ends, for batch point lookups."""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, source: np.ndarray):
+        order = np.argsort(starts, kind="stable")
+        self.starts, ends, source = starts[order], ends[order], source[order]
+        # reach[i] = furthest end among ranges 0..i; owner[i] = the range that reaches it
+        if starts.dtype.kind == "S":
+            owner = np.empty(len(ends), dtype=np.int64)
+            best = -1
+            for i, e in enumerate(ends.tolist()):
+                if best < 0 or e.ljust(16, b"\0") > ends[best].ljust(16, b"\0"):
+                    best = i
+                owner[i] = best
+        else:
+            reach = np.maximum.accumulate(ends) if len(ends) else ends
+            owner = np.maximum.accumulate(np.where(ends == reach, np.arange(len(ends)), 0))
+        self.reach = ends[owner] if len(ends) else ends
+        self.source = source[owner] if len(ends) else source
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """Source list index for each point (NOT_BLOCKED if outside every range)."""
+        if not len(self.starts) or not len(points):
+            return np.full(len(points), NOT_BLOCKED, dtype=np.int16)
+        # sorted distinct points keep searchsorted cache-friendly; click logs repeat addresses a lot
+        points, inverse = np.unique(points, return_inverse=True)
+        i = np.searchsorted(self.starts, points, side="right") - 1
+        j = np.maximum(i, 0)
+        hit = (i >= 0) & (points <= self.reach[j])
+        return np.where(hit, self.source[j], NOT_BLOCKED).astype(np.int16)[inverse]
+
+
+class Blocklist:
+    """IPv4 + IPv6 interval indexes and a device-hash set built from named lists."""
+
+    def __init__(self, lists: dict):
+        """`lists`: name -> iterable of entries (address, CIDR, `a-b` range or device ID)."""
+        t0 = time.perf_counter()
+        self.names = tuple(lists)
+        v4, v6, dev = ([], [], []), ([], [], []), ([], [])
+        invalid = 0
+        for src, entries in enumerate(lists.values()):
+            s = pd.Series(list(entries), dtype="string").str.strip()
+            s = s[s.notna() & (s != "")]
+            ok, addr, prefix = _v4_parts(s)
+            mask = np.where(prefix >= 32, 0, (1 << (32 - np.minimum(prefix, 32))) - 1).astype(np.uint32)
+            start = addr & ~mask
+            v4[0].append(start[ok]); v4[1].append((start | mask)[ok]); v4[2].append(np.full(ok.sum(), src))
+            for entry in s[~ok].tolist():
+                net = _parse_other(entry)
+                if net is None:
+                    invalid += 1
+                elif net == "device":
+                    dev[0].append(entry); dev[1].append(src)
+                else:
+                    for version, lo, hi in net:
+                        if version == 4:
+                            v4[0].append(np.array([lo], np.uint32)); v4[1].append(np.array([hi], np.uint32))
+                            v4[2].append(np.array([src]))
+                        else:
+                            v6[0].append(lo); v6[1].append(hi); v6[2].append(src)
+        self.v4 = _Intervals(np.concatenate(v4[0] or [np.zeros(0, np.uint32)]).astype(np.uint32),
+                             np.concatenate(v4[1] or [np.zeros(0, np.uint32)]).astype(np.uint32),
+                             np.concatenate(v4[2] or [np.zeros(0, np.int64)]).astype(np.int16))
+        self.v6 = _Intervals(np.array(v6[0], dtype="S16"), np.array(v6[1], dtype="S16"),
+                             np.array(v6[2], dtype=np.int16))
+        hashes = hash_devices(dev[0])
+        order = np.argsort(hashes, kind="stable")
+        self.devices, self.device_source = hashes[order], np.array(dev[1], dtype=np.int16)[order]
+        self.report = BlocklistReport(self.names, len(self.v4), len(self.v6), len(self.devices), invalid,
+                                      time.perf_counter() - t0)
+
+    @classmethod
+    def from_files(cls, paths) -> "Blocklist":
+        return cls({Path(p).stem: read_list(p) for p in paths})
+
+    def lookup_ips(self, ips) -> np.ndarray:
+        """List index per address (strings or an `IPArray`); NOT_BLOCKED otherwise."""
+        enc = ips if isinstance(ips, IPArray) else encode_ips(ips)
+        out = np.full(len(enc.kind), NOT_BLOCKED, dtype=np.int16)
+        is4, is6 = enc.kind == 4, enc.kind == 6
+        out[is4] = self.v4.lookup(enc.v4[is4])
+        out[is6] = self.v6.lookup(enc.v6[is6])
+        return out
+
+    def lookup_devices(self, device_ids) -> np.ndarray:
+        h = device_ids if isinstance(device_ids, np.ndarray) and device_ids.dtype == np.uint64 else hash_devices(device_ids)
+        if not len(self.devices):
+            return np.full(len(h), NOT_BLOCKED, dtype=np.int16)
+        h, inverse = np.unique(h, return_inverse=True)
+        i = np.minimum(np.searchsorted(self.devices, h), len(self.devices) - 1)
+        return np.where(self.devices[i] == h, self.device_source[i], NOT_BLOCKED).astype(np.int16)[inverse]
+
+    def lookup(self, ips=None, device_ids=None) -> np.ndarray:
+        """List index per row from the IP lists, else the device list; NOT_BLOCKED otherwise."""
+        out = self.lookup_ips(ips) if ips is not None else None
+        if device_ids is not None:
+            dev = self.lookup_devices(device_ids)
+            out = dev if out is None else np.where(out != NOT_BLOCKED, out, dev)
+        return out
+
+    def labels(self, codes: np.ndarray) -> np.ndarray:
+        """List names for lookup codes (None where not blocked)."""
+        names = np.array(list(self.names) + [None], dtype=object)
+        return names[np.where(codes == NOT_BLOCKED, len(self.names), codes)]
+
+
+_V4_MAPPED = ipaddress.ip_network("::ffff:0:0/96")
+
+
+def _parse_other(entry: str):
+    """
+    IPv6 / range entries -> [(4|6, start, end), ...]; "device" for anything that is not an address.
+    The IPv4-mapped part (::ffff:a.b.c.d) of an IPv6 range is listed as IPv4, since lookups
+    encode mapped addresses as IPv4.
+    """
+    if ":" not in entry and not _looks_like_ip(entry.split("-")[0]):
+        return "device"
+    try:
+        if "-" in entry and entry.count("-") == 1 and (":" in entry or "." in entry):
+            lo, hi = (ipaddress.ip_address(x.strip()) for x in entry.split("-"))
+            if lo.version != hi.version or lo > hi:
+                return None
+        else:
+            net = ipaddress.ip_network(entry, strict=False)
+            lo, hi = net.network_address, net.broadcast_address
+    except ValueError:
+        return None if _looks_like_ip(entry) else "device"
+    if lo.version == 4:
+        return [(4, int(lo), int(hi))]
+    first, last = _V4_MAPPED.network_address, _V4_MAPPED.broadcast_address
+    if lo >= first and hi <= last:
+        return [(4, int(lo.ipv4_mapped), int(hi.ipv4_mapped))]
+    out = [(6, lo.packed, hi.packed)]
+    if lo <= last and hi >= first:
+        out.append((4, int(max(lo, first).ipv4_mapped), int(min(hi, last).ipv4_mapped)))
+    return out
+
+
+def _looks_like_ip(entry: str) -> bool:
+    head = entry.split("/")[0]
+    return head.replace(".", "").isdigit() or (head.count(":") >= 2 and all(c in "0123456789abcdefABCDEF:." for c in head))
+
+
+def read_list(path) -> list[str]:
+    """Entries of one list file (first field per line, `#`/`;` comments dropped)."""
+    entries = []
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            line = line.split("#", 1)[0].split(";", 1)[0].strip()
+            if line:
+                entries.append(line.replace(",", " ").split()[0])
+    return entries
+
+
+def blocklist_files(blocklist_dir=BLOCKLIST_DIR) -> list[Path]:
+    blocklist_dir = Path(blocklist_dir)
+    return sorted({p for pattern in BLOCKLIST_PATTERNS for p in blocklist_dir.glob(pattern)})
+
+
+# -----------------------------
+# Hot reload
+# -----------------------------
+class BlocklistWatcher:
+    """
+    Serve the blocklist for a directory and rebuild it when a list file is added,
+    removed or changed (mtime / size). `current()` only stats the files; readers
+    keep the old index until the new one is swapped in.
+    """
+
+    def __init__(self, blocklist_dir=BLOCKLIST_DIR):
+        self.dir = Path(blocklist_dir)
+        self.keys = None
+        self.blocklist = Blocklist({})
+        self.reloads = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> Blocklist:
+        keys = tuple(file_key(p) for p in blocklist_files(self.dir))
+        if keys != self.keys:
+            with self._lock:
+                if keys != self.keys:
+                    self.blocklist = Blocklist.from_files([k[0] for k in keys])
+                    self.keys = keys
+                    self.reloads += 1
+        return self.blocklist
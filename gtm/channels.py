@@ -0,0 +1,58 @@
+"""
+Channel taxonomy shared by the pages and batch jobs.
+
+The six Part 4 plan channels (`gtm.simulation.BASE_BUDGETS`) are the taxonomy;
+each belongs to one platform (the Part 2 "parent" channel) and one funnel stage.
+The other names the pages use -- the Part 2 base plan rows and the budget
+overview's campaign types -- are listed explicitly, so a name outside the table
+shows up as UNMAPPED instead of being guessed from a substring:
+
+    plan_channel("Google Search – RLSA (Retargeting)")   # "Google Search – RLSA (MOFU)"
+    parent_channel("LinkedIn (Awareness)")                # "LinkedIn"
+    parent_channel("Bing Ads")                            # "Unmapped"
+"""
+
+PLATFORMS = ("LinkedIn", "Google", "YouTube")
+UNMAPPED = "Unmapped"
+
+# plan channel -> platform it is bought on
+CHANNEL_PLATFORM = {
+    "LinkedIn – Awareness": "LinkedIn",
+    "YouTube – Awareness": "YouTube",
+    "Google Search – Generic (MOFU)": "Google",
+    "Google Search – RLSA (MOFU)": "Google",
+    "LinkedIn – Retargeting (MOFU)": "LinkedIn",
+    "Google Search – Exact/Brand/Comp (BOFU)": "Google",
+}
+
+# Part 2 base plan names -> plan channel
+CHANNEL_ALIASES = {
+    "LinkedIn (Awareness)": "LinkedIn – Awareness",
+    "YouTube (Awareness)": "YouTube – Awareness",
+    "Google Search – Text Ads (Generic)": "Google Search – Generic (MOFU)",
+    "Google Search – RLSA (Retargeting)": "Google Search – RLSA (MOFU)",
+    "LinkedIn (Retargeting: Text/Conversation)": "LinkedIn – Retargeting (MOFU)",
+    "Google Search – Exact/Branded/Competitor": "Google Search – Exact/Brand/Comp (BOFU)",
+}
+
+# Part 2 overview campaign types name a platform, not one plan channel ("Google Search" is MOFU and BOFU)
+CAMPAIGN_TYPE_PLATFORM = {
+    "LinkedIn Awareness": "LinkedIn",
+    "LinkedIn Retargeting": "LinkedIn",
+    "YouTube Awareness": "YouTube",
+    "Google Search": "Google",
+    "Google Search (Retargeting)": "Google",
+}
+
+
+def plan_channel(name: str) -> str | None:
+    """The plan channel a channel name stands for (None if it is not one of them)."""
+    return name if name in CHANNEL_PLATFORM else CHANNEL_ALIASES.get(name)
+
+
+# Normalize channels to parent (LinkedIn / Google / YouTube)
+def parent_channel(name: str) -> str:
+    channel = plan_channel(name)
+    if channel is not None:
+        return CHANNEL_PLATFORM[channel]
+    return CAMPAIGN_TYPE_PLATFORM.get(name, UNMAPPED)
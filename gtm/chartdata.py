@@ -0,0 +1,256 @@
+"""
+Chart data budgets: cut a frame down to a row budget before it is embedded in a chart spec.
+
+Altair inlines every row of a chart's data in the Vega-Lite spec sent to the
+browser, so a chart over daily or keyword-level rows ships the whole table.
+`fit` reduces a frame the way its chart is read:
+
+    lines        LTTB (largest triangle, three buckets) per series: keeps peaks and dips
+    bars / areas equal-width bins over x with the values summed
+    categories   the top N by value, the rest folded into one "Other" row
+
+and logs rows in / out and the JSON size of what is left in PAYLOADS.
+
+    data = fit(weekly, "Weekly actuals", x="Week", y="value", by="Metric")
+
+Compiled specs are cached in a SpecCache keyed on `chart_key`: the chart
+builder's code and every input it reads, with frames content-hashed, so an
+unchanged chart costs a hash check instead of an Altair build.
+"""
+
+import hashlib
+import threading
+import types
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+ROW_BUDGET = 5_000     # rows per chart (Altair's own MaxRowsError limit)
+TOP_N = 12             # slices / bars before the rest becomes "Other"
+OTHER = "Other"
+SPEC_CACHE_SIZE = 128  # compiled specs kept per process
+
+
+class Payload(NamedTuple):
+    chart: str
+    rows_in: int
+    rows_out: int
+    bytes: int           # data as JSON records, about what the spec inlines
+
+
+PAYLOADS: dict[str, Payload] = {}   # last payload per chart, for this process
+
+
+# ---------------------------------------------------------------------------
+# Reducers
+# ---------------------------------------------------------------------------
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the `n` points of (x, y) that LTTB keeps; `x` ascending, first and last always kept."""
+    size = len(x)
+    n = max(n, 3)
+    if size <= n:
+        return np.arange(size)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    # n - 2 buckets between the first and the last point; each bucket's mean is the
+    # third triangle corner for the bucket before it
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    cx, cy = np.concatenate([[0.0], np.cumsum(x)]), np.concatenate([[0.0], np.cumsum(y)])
+    counts = ends - starts
+    next_x = np.append(((cx[ends] - cx[starts]) / counts)[1:], x[-1])
+    next_y = np.append(((cy[ends] - cy[starts]) / counts)[1:], y[-1])
+
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+        xa, ya = x[a], y[a]
+        # twice the triangle area (a, point, next mean), for every point of the bucket at once
+        area = np.abs((xa - next_x[i]) * (y[s:e] - ya) - (xa - x[s:e]) * (next_y[i] - ya))
+        a = s + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, budget: int = ROW_BUDGET, by=None) -> pd.DataFrame:
+    """LTTB per series (one per `by` value) so the frame fits `budget` rows; each series' share follows its length."""
+    if len(df) <= budget:
+        return df
+    groups = [df] if by is None else [g for _, g in df.groupby(by, sort=False, observed=True)]
+    parts = []
+    for g in groups:
+        g = g.sort_values(x, kind="stable")
+        parts.append(g.iloc[lttb(_numeric(g[x]), g[y].to_numpy(dtype=float), budget * len(g) // len(df))])
+    return pd.concat(parts)
+
+
+def bin_sum(df: pd.DataFrame, x: str, values, budget: int = ROW_BUDGET, by=None) -> pd.DataFrame:
+    """
+    Equal-width bins over `x` (numeric or datetime) with `values` summed per bin (and `by` group);
+    x becomes the bin start. Bin widths are whole multiples of the data's own step (e.g. whole days).
+    """
+    if len(df) <= budget:
+        return df
+    values = [values] if isinstance(values, str) else list(values)
+    by = [] if by is None else [by] if isinstance(by, str) else list(by)
+    bins = max(budget // (df.groupby(by, observed=True).ngroups if by else 1), 1)
+    xs = _numeric(df[x])
+    distinct = np.unique(xs)
+    step = np.diff(distinct).min() if len(distinct) > 1 else 1.0
+    width = step * np.ceil((distinct[-1] - distinct[0] + step) / (step * bins))
+    start = distinct[0] + (xs - distinct[0]) // width * width
+    if pd.api.types.is_datetime64_any_dtype(df[x]):
+        start = pd.to_datetime(start.astype(np.int64), unit="ns")
+    binned = df[by + values].assign(**{x: start})
+    return binned.groupby(by + [x], observed=True, sort=True)[values].sum().reset_index()
+
+
+def top_n(df: pd.DataFrame, category: str, value: str, n: int = TOP_N, by=None, other: str = OTHER,
+          sum_columns=None) -> pd.DataFrame:
+    """
+    The n - 1 largest categories by total `value`, plus one `other` row (per `by` group) for the rest.
+    Only additive columns are summed into the `other` row -- `value` and those of `sum_columns` the
+    frame has; rates, prices and text are left empty.
+    """
+    totals = df.groupby(category, sort=False, observed=True)[value].sum()
+    if len(totals) <= n:
+        return df
+    rest = ~df[category].isin(totals.nlargest(max(n - 1, 1)).index)
+    keys = [] if by is None else [by] if isinstance(by, str) else list(by)
+    summed = list(dict.fromkeys(c for c in [value, *(sum_columns or ())] if c in df and c not in keys))
+    if by is None:
+        folded = df.loc[rest, summed].agg(["sum"])
+    else:
+        folded = df.loc[rest].groupby(by, observed=True)[summed].sum().reset_index()
+    return pd.concat([df[~rest], folded.assign(**{category: other})], ignore_index=True)
+
+
+def _numeric(s: pd.Series) -> np.ndarray:
+    """Float x values; datetimes as ns since the epoch."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+    return s.to_numpy(dtype=float)
+
+
+# ---------------------------------------------------------------------------
+# Chart entry point + payload log
+# ---------------------------------------------------------------------------
+
+def fit(df: pd.DataFrame, chart: str, *, x: str | None = None, y=None, by=None, category: str | None = None,
+        value: str | None = None, top: int | None = None, sum_columns=None, bins: bool = False,
+        budget: int = ROW_BUDGET) -> pd.DataFrame:
+    """
+    `df` reduced for one chart and logged under `chart` in PAYLOADS:
+    `category` + `value` -> top_n (`top` categories, default TOP_N; `sum_columns` are summed into
+    the other row with `value`); `x` + `y` -> LTTB lines, or binned sums with `bins=True`. Frames already within budget pass through unchanged.
+    """
+    if category is not None:
+        out = top_n(df, category, value, n=top or TOP_N, by=by, sum_columns=sum_columns)
+    elif x is not None and y is not None:
+        out = bin_sum(df, x, y, budget, by) if bins else downsample(df, x, y, budget, by)
+    else:
+        out = df
+    PAYLOADS[chart] = Payload(chart, len(df), len(out), payload_bytes(out))
+    return out
+
+
+def payload_bytes(df: pd.DataFrame) -> int:
+    return len(df.to_json(orient="records", date_format="iso").encode())
+
+
+def payload_report() -> pd.DataFrame:
+    """Every logged chart: rows in / out and the data payload in KB, largest first."""
+    report = pd.DataFrame(list(PAYLOADS.values()), columns=Payload._fields)
+    report["kb"] = (report["bytes"] / 1024).round(1)
+    return report.drop(columns="bytes").sort_values("kb", ascending=False, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# Compiled spec cache
+# ---------------------------------------------------------------------------
+
+def fingerprint(df) -> str:
+    """Content hash of a frame or series: values, column names and dtypes (the index is ignored, as in a chart)."""
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def chart_key(build, args: tuple = (), params: dict | None = None) -> tuple:
+    """
+    Cache key for the chart `build(*args, **params)`: the builder's code, the closure cells and
+    module globals it reads (modules, classes and functions skipped) and its arguments.
+    Frames anywhere in there are fingerprinted.
+    """
+    code = build.__code__
+    cells = tuple(_key_part(c.cell_contents) for c in build.__closure__ or ())
+    reads = tuple((name, _key_part(build.__globals__[name])) for name in code.co_names
+                  if name in build.__globals__ and not _is_code(build.__globals__[name]))
+    named = tuple(sorted((k, _key_part(v)) for k, v in (params or {}).items()))
+    return code, cells, reads, tuple(_key_part(a) for a in args), named
+
+
+def _is_code(value) -> bool:
+    return isinstance(value, (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType))
+
+
+def _key_part(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return fingerprint(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _key_part(v)) for k, v in value.items()))
+    if isinstance(value, types.FunctionType):
+        return value.__code__
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class SpecCache:
+    """LRU of compiled chart specs with hit / miss counters; safe to share between sessions (threads)."""
+
+    def __init__(self, maxsize: int = SPEC_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compile):
+        """The spec cached under `key`, or `compile()` stored under it (evicting the least recently used)."""
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+        spec = compile()    # outside the lock: a slow build must not stall other sessions' hits
+        with self._lock:
+            self._specs[key] = spec
+            while len(self._specs) > self.maxsize:
+                self._specs.popitem(last=False)
+        return spec
+
+    def stats(self) -> dict:
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / calls if calls else 0.0,
+                "size": len(self._specs), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self.hits = self.misses = 0
+
+
+SPECS = SpecCache()   # process-wide: shared by every page and session
@@ -0,0 +1,205 @@
+"""Batch CLI: run the estimation / simulation logic over a directory of plan CSVs.
+
+    python -m gtm batch plans/ --out results/ --format parquet --workers 8
+    python -m gtm batch plans/ --out results/ --mode simulate
+
+`estimate` plans are Part 2 style (Budget, CPC, CPM, CTR[, Channel, ...]);
+`simulate` plans are Part 4 style (Channel, Budget) using the six benchmark channels.
+Each plan gets `<out>/<plan>.<format>`; `<out>/summary.<format>` has one row per plan.
+
+    python -m gtm tier accounts.parquet --out tiered.parquet
+
+tiers an account list (industry, employees, region) with the Part 1 ICP tier rules
+and writes it back with `tier` and `use_case` columns.
+
+    python -m gtm negatives search_terms.csv --lists negatives.txt --out blocked.csv
+
+writes the spend, clicks and conversions each negative keyword would have blocked
+in Google Ads search-term reports, per funnel stage.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from gtm.channels import parent_channel
+from gtm.ingest import read_table
+from gtm.estimation import estimate_frame
+from gtm.ranges import parse_range_columns
+from gtm.scenarios import with_pct
+from gtm.simulation import BENCHMARKS, simulate_performance
+
+MODES = ("estimate", "simulate")
+FORMATS = ("parquet", "csv")
+REQUIRED = {
+    "estimate": ["Budget", "CPC", "CPM", "CTR"],
+    "simulate": ["Channel", "Budget"],
+}
+
+
+class PlanError(ValueError):
+    """A plan file that cannot be processed (missing columns, unknown channels...)."""
+
+
+def _check_columns(df: pd.DataFrame, mode: str):
+    missing = [c for c in REQUIRED[mode] if c not in df.columns]
+    if missing:
+        raise PlanError(f"missing column(s): {', '.join(missing)}")
+
+
+def _numeric_budget(df: pd.DataFrame) -> pd.DataFrame:
+    """`Budget` as numbers; raises `PlanError` naming the rows that are not."""
+    budget = pd.to_numeric(df["Budget"], errors="coerce")
+    bad = budget.isna()
+    if bad.any():
+        raise PlanError(f"non-numeric Budget in row(s): {', '.join(map(str, (df.index[bad] + 1)[:10]))}")
+    return df.assign(Budget=budget)
+
+
+def estimate_plan(df: pd.DataFrame) -> pd.DataFrame:
+    """Part 2 estimation for one plan: parsed ranges, %Budget, parent channel, impressions & clicks."""
+    _check_columns(df, "estimate")
+    out = estimate_frame(parse_range_columns(with_pct(_numeric_budget(df))))
+    if "Channel" in out.columns:
+        out["Parent"] = out["Channel"].astype(str).map(parent_channel)
+    return out
+
+
+def simulate_plan(df: pd.DataFrame) -> pd.DataFrame:
+    """Part 4 simulation for one plan (spend summed per benchmark channel)."""
+    _check_columns(df, "simulate")
+    df = _numeric_budget(df)
+    blank = df["Channel"].isna()
+    if blank.any():
+        raise PlanError(f"blank Channel in row(s): {', '.join(map(str, (df.index[blank] + 1)[:10]))}")
+    unknown = sorted(set(df["Channel"].astype(str)) - set(BENCHMARKS))
+    if unknown:
+        raise PlanError(f"unknown channel(s): {', '.join(map(str, unknown))}")
+    budgets = df.groupby("Channel", sort=False)["Budget"].sum().to_dict()
+    return simulate_performance(budgets)
+
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def process_file(path: str, out_dir: str, mode: str, fmt: str) -> dict:
+    """Process one plan file and write its result; never raises, errors go into the summary row."""
+    t0 = time.perf_counter()
+    row = {"plan": Path(path).name, "rows": 0, "error": None}
+    try:
+        plan = pd.read_csv(path)
+        row["rows"] = len(plan)
+        result = estimate_plan(plan) if mode == "estimate" else simulate_plan(plan)
+        write_frame(result, Path(out_dir) / f"{Path(path).stem}.{fmt}", fmt)
+        row["budget"] = float(result["Budget" if mode == "estimate" else "Spend (€)"].sum())
+        row["impressions"] = float(result["Impressions_est" if mode == "estimate" else "Impressions"].sum())
+        row["clicks"] = float(result["Clicks_est" if mode == "estimate" else "Clicks"].sum())
+        if mode == "simulate":
+            row["conversions"] = int(result["Conversions"].sum())
+            row["sqls"] = int(result["SQLs"].sum())
+    except Exception as e:      # one bad plan must not stop the batch
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - t0, 4)
+    return row
+
+
+def _process(args) -> dict:
+    return process_file(*args)
+
+
+def run_batch(plan_dir: str, out_dir: str, mode: str = "estimate", fmt: str = "parquet",
+              workers: int | None = None, pattern: str = "*.csv") -> pd.DataFrame:
+    """Process every plan in `plan_dir` (in parallel when `workers` > 1) and return the summary."""
+    files = sorted(str(p) for p in Path(plan_dir).glob(pattern))
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(f, out_dir, mode, fmt) for f in files]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_process, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        rows = [_process(job) for job in jobs]
+    summary = pd.DataFrame(rows, columns=["plan", "rows", "budget", "impressions", "clicks",
+                                          "conversions", "sqls", "seconds", "error"])
+    if mode == "estimate":
+        summary = summary.drop(columns=["conversions", "sqls"])
+    write_frame(summary, Path(out_dir) / f"summary.{fmt}", fmt)
+    return summary
+
+
+def tier_file(path: str, out: str) -> pd.DataFrame:
+    """Tier every account in `path` (CSV / Parquet / Arrow) and write it to `out`; returns the tier counts."""
+    from gtm.tiering import ICP_ENGINE, tier_counts
+    accounts = read_table(path)
+    tiered = accounts.drop(columns=["tier", "use_case"], errors="ignore").assign(**ICP_ENGINE.assign(accounts))
+    write_frame(tiered, Path(out), "csv" if out.endswith(".csv") else "parquet")
+    return tier_counts(tiered)
+
+
+def negatives_file(reports: list, lists: list, out: str):
+    """Match negative lists against search-term reports and write the per negative x funnel table to `out`."""
+    from gtm.negatives import NegativeSet, read_negatives, scan_search_terms
+    negatives = NegativeSet(pd.concat([read_negatives(p) for p in lists], ignore_index=True))
+    scan = scan_search_terms(reports, negatives)
+    write_frame(scan.blocked, Path(out), "csv" if out.endswith(".csv") else "parquet")
+    return scan
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m gtm", description="Headless batch runs of the case-study models.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("batch", help="process a directory of plan CSVs")
+    batch.add_argument("plan_dir")
+    batch.add_argument("--out", required=True, help="output directory")
+    batch.add_argument("--mode", choices=MODES, default="estimate")
+    batch.add_argument("--format", choices=FORMATS, default="parquet")
+    batch.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    batch.add_argument("--pattern", default="*.csv", help="glob for plan files (default: *.csv)")
+    tier = sub.add_parser("tier", help="assign ICP tiers to an account list")
+    tier.add_argument("accounts", help="CSV / Parquet / Arrow with industry, employees, region")
+    tier.add_argument("--out", required=True, help="output file (.parquet or .csv)")
+    neg = sub.add_parser("negatives", help="spend each negative keyword would have blocked in search-term reports")
+    neg.add_argument("reports", nargs="+", help="Google Ads search-term reports (.csv / .tsv, optionally .gz)")
+    neg.add_argument("--lists", nargs="+", required=True, help="negative lists (.txt in Ads Editor notation, or .csv)")
+    neg.add_argument("--out", required=True, help="output file (.parquet or .csv)")
+    args = parser.parse_args(argv)
+
+    if args.command == "negatives":
+        try:
+            scan = negatives_file(args.reports, args.lists, args.out)
+        except ValueError as e:                 # IngestError: an unreadable negative list
+            print(f"{type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        print(f"{scan.negatives:,} negative(s) x {scan.search_terms:,} search term(s) ({scan.rows:,} rows) "
+              f"in {scan.seconds:.1f}s -> {args.out}")
+        print(scan.funnels.round(3).to_string(index=False))
+        for error in scan.errors:
+            print(f"  {error}", file=sys.stderr)
+        return 1 if scan.errors else 0
+
+    if args.command == "tier":
+        t0 = time.perf_counter()
+        try:
+            counts = tier_file(args.accounts, args.out)
+        except (ValueError, KeyError) as e:     # IngestError / TierError are ValueErrors
+            print(f"{args.accounts}: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        print(f"{int(counts['accounts'].sum()):,} account(s) in {time.perf_counter() - t0:.1f}s -> {args.out}")
+        print(counts.to_string(index=False))
+        return 0
+
+    t0 = time.perf_counter()
+    summary = run_batch(args.plan_dir, args.out, args.mode, args.format, args.workers, args.pattern)
+    failed = summary["error"].notna().sum()
+    print(f"{len(summary)} plan(s) in {time.perf_counter() - t0:.1f}s -> {args.out} ({failed} failed)")
+    for _, r in summary[summary["error"].notna()].iterrows():
+        print(f"  {r['plan']}: {r['error']}", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,500 @@
+"""
+Click-fraud scan: sliding-window click counters per IP, device and placement.
+
+Click logs (CSV or Parquet, one row per paid click) are replayed in time order
+in chunks. Every rule is a windowed count over a sorted key:
+
+    RAPID_IP      >= RAPID_CLICKS clicks from one IP within RAPID_WINDOW_S
+    RAPID_DEVICE  >= RAPID_CLICKS clicks from one device within RAPID_WINDOW_S
+    REPEAT_AD     the same device (or IP) clicking the same ad again within REPEAT_WINDOW_S
+    NO_SESSION    >= NO_SESSION_CLICKS clicks from one IP within REPEAT_WINDOW_S that never
+                  led to a landing session within LANDING_WINDOW_S (only with sessions;
+                  a single bounce is normal)
+
+`window_counts` is one sort per rule and chunk plus a `searchsorted` on a combined
+(dense key code, time) value, so there is no per-row Python. A chunk carries
+the last REPEAT_WINDOW_S of the previous one so windows span chunk
+boundaries. IPs and devices with EXCLUDE_MIN_FLAGGED flagged clicks, and
+placements whose flagged share passes PLACEMENT_MAX_INVALID, make up the
+exclusion list. Its per-channel impact feeds Part 4.
+"""
+
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import DATA_DIR, IngestError, epoch_seconds
+from gtm.simulation import BASE_BUDGETS, BENCHMARKS
+
+CLICKS_DIR = DATA_DIR / "clicks"
+CLICK_PATTERNS = ("*.csv", "*.csv.gz", "*.parquet")
+CHUNK_ROWS = 2_000_000
+COMPACT_ROWS = 2_000_000     # merge per-chunk aggregates once they pass this many rows
+
+RAPID_WINDOW_S = 60
+RAPID_CLICKS = 5
+REPEAT_WINDOW_S = 3600
+LANDING_WINDOW_S = 120
+NO_SESSION_CLICKS = 3
+EXCLUDE_MIN_FLAGGED = 3
+PLACEMENT_MIN_CLICKS = 100
+PLACEMENT_MAX_INVALID = 0.30
+
+# bit -> reason code
+REASONS = {1: "RAPID_IP", 2: "RAPID_DEVICE", 4: "REPEAT_AD", 8: "NO_SESSION"}
+RAPID_IP, RAPID_DEVICE, REPEAT_AD, NO_SESSION = REASONS
+
+# Canonical column -> names used by click logs (first match wins); only the first two are required
+CLICK_COLUMNS = {
+    "timestamp": ("timestamp", "click_time", "event_time", "time"),
+    "ip": ("ip", "ip_address", "client_ip"),
+    "device_id": ("device_id", "device", "user_pseudo_id"),
+    "placement": ("placement", "site", "app", "publisher"),
+    "ad_id": ("ad_id", "creative_id", "ad"),
+    "channel": ("channel",),
+    "cost": ("cost", "cpc", "spend"),
+}
+REQUIRED = ("timestamp", "ip")
+_NONE = "(none)"
+
+
+class ClickScan(NamedTuple):
+    clicks: int
+    flagged: int
+    seconds: float
+    exclusions: pd.DataFrame   # kind, value, clicks, flagged, flagged cost, reasons
+    channels: pd.DataFrame     # channel, clicks, flagged, excluded, cost, excluded cost, excluded share
+    reasons: pd.DataFrame      # reason, clicks
+    errors: tuple
+
+
+# ---------------------------------------------------------------------------
+# Windowed counting
+# ---------------------------------------------------------------------------
+
+def window_counts(codes: np.ndarray, ts: np.ndarray, window: int, mask: np.ndarray | None = None) -> np.ndarray:
+    """
+    Per event: events with the same key code in (ts - window, ts], itself included.
+    `codes` are dense non-negative ints (e.g. from pd.factorize); `ts` and `window` share one
+    integer unit; events outside `mask` are not counted and get 0.
+    """
+    if not len(codes):
+        return np.zeros(0, dtype=np.int64)
+    codes = codes.astype(np.int64)
+    if mask is not None:
+        codes[~mask] = -1          # their own group below every real key
+    rel = ts - ts.min()
+    span = int(rel.max()) + window + 1
+    if (int(codes.max()) + 1) * span >= 2 ** 62:
+        raise ValueError("window_counts: too many keys x too long a time span; use smaller chunks")
+    ordered = codes * span + rel
+    order = np.argsort(ordered)
+    ordered = ordered[order]
+    # upper bound: end of the run of equal (key, time) values, no search needed
+    change = ordered[1:] != ordered[:-1]
+    if change.all():
+        right = np.arange(1, len(ordered) + 1)
+    else:
+        run_end = np.flatnonzero(np.append(change, True))
+        right = run_end[np.concatenate([[0], np.cumsum(change)])] + 1
+    counts = np.empty(len(codes), dtype=np.int64)
+    counts[order] = right - np.searchsorted(ordered, ordered - window, side="right")
+    return np.where(codes >= 0, counts, 0)
+
+
+class LandingIndex:
+    """Landing sessions (IP hash, start ms), sorted once; `landed` asks "a session within `within` ms after?"."""
+
+    def __init__(self, ip_hash: np.ndarray, start_ms: np.ndarray):
+        codes, self.keys = pd.factorize(ip_hash)          # hash table, no sort of the raw hashes
+        self._lookup = pd.Index(self.keys)
+        self.t0 = int(start_ms.min()) if len(start_ms) else 0
+        self.span = (int(start_ms.max()) - self.t0 + 1 if len(start_ms) else 1) + 2 * LANDING_WINDOW_S * 1000
+        self.sorted = np.sort(codes.astype(np.int64) * self.span + (start_ms - self.t0))
+        self.last = self.t0 + self.span - 2 * LANDING_WINDOW_S * 1000
+
+    @classmethod
+    def from_sessions(cls, sessions: pd.DataFrame) -> "LandingIndex":
+        """From a session table with `ip` and `start` (epoch seconds), e.g. gtm.traffic.build_sessions."""
+        sessions = sessions[sessions["ip"].notna()]
+        return cls(hash_keys(sessions["ip"]), (sessions["start"].to_numpy(dtype=float) * 1000).astype(np.int64))
+
+    def landed(self, ip_hash: np.ndarray, ts_ms: np.ndarray, within_ms: int = LANDING_WINDOW_S * 1000) -> np.ndarray:
+        if not len(self.keys):
+            return np.zeros(len(ip_hash), dtype=bool)
+        rank = self._lookup.get_indexer(ip_hash)          # hash lookup, -1 = IP never landed
+        known = (rank >= 0) & (ts_ms >= self.t0 - within_ms) & (ts_ms <= self.last)
+        query = rank.astype(np.int64) * self.span + np.clip(ts_ms - self.t0, 0, None)
+        # binary search in query order: sorted needles walk the array instead of jumping around it
+        order = np.argsort(query)
+        pos = np.empty(len(query), dtype=np.int64)
+        pos[order] = np.searchsorted(self.sorted, query[order])
+        pos = np.minimum(pos, len(self.sorted) - 1)
+        return known & (self.sorted[pos] >= query) & (self.sorted[pos] <= query + within_ms)
+
+
+def hash_keys(values) -> np.ndarray:
+    """uint64 hash per value; missing -> 0."""
+    return _hashed(values)[0]
+
+
+def _hashed(values) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(uint64 hash per value, factorize codes, distinct values). Factorize first, hash only the distinct values."""
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    if not len(uniques):
+        return np.zeros(len(codes), dtype=np.uint64), codes, uniques
+    hashed = pd.util.hash_array(uniques, categorize=False)    # already distinct
+    return np.where(codes >= 0, hashed[codes], np.uint64(0)), codes, uniques
+
+
+# ---------------------------------------------------------------------------
+# Streaming replay
+# ---------------------------------------------------------------------------
+
+_KEY_COLUMNS = ("flagged", "flagged_cost", *REASONS.values())
+
+
+class ClickScanner:
+    """Feed time-ordered click chunks; `result()` builds the exclusion list."""
+
+    def __init__(self, landing: LandingIndex | None = None):
+        self.landing = landing
+        self._tail = None
+        self._ips, self._devices, self._placements = [], [], []
+        self._reasons = np.zeros(len(REASONS), dtype=np.int64)
+        self.clicks = self.flagged = 0
+        self.unreadable = 0       # clicks skipped for a missing / unparseable timestamp
+        self.seconds = 0.0
+
+    def feed(self, chunk: pd.DataFrame):
+        """One chunk with canonical columns (see `normalize_clicks`), sorted or not."""
+        t0 = time.perf_counter()
+        ts = _millis(chunk["timestamp"])
+        # NaT / NaN would be INT64_MIN here and throw every window of the chunk off
+        bad = ts == _NO_TIME
+        if bad.any():
+            self.unreadable += int(bad.sum())
+            chunk, ts = chunk[~bad], ts[~bad]
+        n = len(chunk)
+        if not n:
+            self.seconds += time.perf_counter() - t0
+            return
+        order = np.argsort(ts, kind="stable")
+        none = (np.zeros(n, dtype=np.uint64), None, None)
+        (ip, ip_codes, ip_names), (device, device_codes, device_names), (ad, _, _) = (
+            _hashed(chunk[c]) if c in chunk else none for c in ("ip", "device_id", "ad_id"))
+        keys = {"ts": ts[order], "ip": ip[order], "device": device[order], "ad": ad[order]}
+        names = {"ip": None if ip_names is None else (ip_codes[order], ip_names),
+                 "device": None if device_names is None else (device_codes[order], device_names)}
+        # windows reach back into the previous chunk through its tail
+        tail = 0 if self._tail is None else len(self._tail["ts"])
+        window = {k: np.concatenate([self._tail[k], v]) if tail else v for k, v in keys.items()}
+        flags = self._flags(window)[tail:]
+        keep = window["ts"] > window["ts"][-1] - REPEAT_WINDOW_S * 1000
+        self._tail = {k: v[keep] for k, v in window.items()}
+
+        cost = chunk["cost"].fillna(0).to_numpy(dtype=float)[order] if "cost" in chunk else np.zeros(n)
+        cells = [pd.factorize(chunk[c] if c in chunk else np.full(n, _NONE, dtype=object), use_na_sentinel=False)
+                 for c in ("placement", "channel")]
+        self._accumulate(keys, flags, cost, names, [(c[order], u) for c, u in cells])
+        self.seconds += time.perf_counter() - t0
+
+    def _flags(self, keys: dict) -> np.ndarray:
+        ts, ip, device, ad = keys["ts"], keys["ip"], keys["device"], keys["ad"]
+        # hash 0 = value missing: anonymous clicks are nobody's repeats
+        has_ip, has_device = ip != 0, device != 0
+        ip_codes = pd.factorize(ip)[0]
+        flags = np.where(window_counts(ip_codes, ts, RAPID_WINDOW_S * 1000, has_ip) >= RAPID_CLICKS, RAPID_IP, 0)
+        if has_device.any():
+            dev_counts = window_counts(pd.factorize(device)[0], ts, RAPID_WINDOW_S * 1000, has_device)
+            flags |= np.where(dev_counts >= RAPID_CLICKS, RAPID_DEVICE, 0)
+        if (ad != 0).any():
+            # same viewer (device, else IP) x same ad; the two hashes are mixed into one key
+            pair = np.where(has_device, device, ip) * np.uint64(0x9E3779B97F4A7C15) ^ ad
+            repeats = window_counts(pd.factorize(pair)[0], ts, REPEAT_WINDOW_S * 1000, (ad != 0) & (has_device | has_ip))
+            flags |= np.where(repeats >= 2, REPEAT_AD, 0)
+        if self.landing is not None:
+            lost = has_ip & ~self.landing.landed(ip, ts)
+            lost_counts = window_counts(ip_codes, ts, REPEAT_WINDOW_S * 1000, lost)
+            flags |= np.where(lost_counts >= NO_SESSION_CLICKS, NO_SESSION, 0)
+        return flags.astype(np.int8)
+
+    def checkpoint(self) -> dict:
+        """Scanner state to go back to with `restore` (a file that fails part-way is dropped whole)."""
+        return {"tail": self._tail, "ips": list(self._ips), "devices": list(self._devices),
+                "placements": list(self._placements), "reasons": self._reasons.copy(),
+                "clicks": self.clicks, "flagged": self.flagged, "unreadable": self.unreadable}
+
+    def restore(self, state: dict):
+        self._tail, self._reasons, self.clicks, self.flagged, self.unreadable = (
+            state["tail"], state["reasons"].copy(), state["clicks"], state["flagged"], state["unreadable"])
+        self._ips, self._devices, self._placements = list(state["ips"]), list(state["devices"]), list(state["placements"])
+
+    def _accumulate(self, keys: dict, flags: np.ndarray, cost: np.ndarray, names: dict, cells):
+        n = len(flags)
+        hit = flags != 0
+        self.clicks += n
+        self.flagged += int(hit.sum())
+        bits = {name: (flags & bit) != 0 for bit, name in REASONS.items()}
+        for i, b in enumerate(bits.values()):
+            self._reasons[i] += int(b.sum())
+
+        # flagged clicks per IP / device, keyed by hash (the first string seen names it)
+        flagged = {"flagged": np.ones(int(hit.sum()), dtype=np.int64), "flagged_cost": cost[hit],
+                   **{name: b[hit] for name, b in bits.items()}}
+        for parts, key in ((self._ips, "ip"), (self._devices, "device")):
+            if names[key] is None:
+                continue
+            codes, uniques = names[key]
+            rows = hit & (keys[key] != 0)
+            df = pd.DataFrame({k: v[rows[hit]] for k, v in flagged.items()},
+                              index=pd.Index(keys[key][rows], name="hash"))
+            df["value"] = uniques[codes[rows]]
+            parts.append(_combine([df]))
+
+        # totals per (placement, channel): bincount over the local codes
+        (p_codes, p_names), (c_codes, c_names) = cells
+        cell = p_codes.astype(np.int64) * len(c_names) + c_codes
+        size = len(p_names) * len(c_names)
+        sums = np.column_stack([
+            np.bincount(cell, minlength=size),
+            np.bincount(cell, weights=hit, minlength=size),
+            np.bincount(cell, weights=cost, minlength=size),
+            np.bincount(cell, weights=np.where(hit, cost, 0.0), minlength=size),
+        ])
+        index = pd.MultiIndex.from_product([pd.Index(p_names, dtype=object).fillna(_NONE),
+                                            pd.Index(c_names, dtype=object).fillna(_NONE)],
+                                           names=["placement", "channel"])
+        frame = pd.DataFrame(sums, index=index, columns=["clicks", "flagged", "cost", "flagged_cost"])
+        self._placements.append(frame[frame["clicks"] > 0])
+
+        for parts in (self._ips, self._devices, self._placements):
+            if len(parts) > 1 and sum(map(len, parts)) > COMPACT_ROWS:
+                parts[:] = [_combine(parts)]
+
+    def result(self, errors=()) -> ClickScan:
+        if self.unreadable:
+            errors = (*errors, f"{self.unreadable:,} click(s) without a readable timestamp skipped")
+        placements = _combine(self._placements)
+        by_place = (placements.groupby(level="placement").sum() if len(placements)
+                    else pd.DataFrame(columns=["clicks", "flagged", "cost", "flagged_cost"]))
+        share = by_place["flagged"] / by_place["clicks"].clip(lower=1)
+        bad = by_place[(by_place["clicks"] >= PLACEMENT_MIN_CLICKS) & (share >= PLACEMENT_MAX_INVALID)
+                       & (by_place.index != _NONE)]
+
+        parts = []
+        for kind, keyed in (("ip", _combine(self._ips)), ("device", _combine(self._devices))):
+            keyed = keyed[keyed["flagged"] >= EXCLUDE_MIN_FLAGGED]
+            parts.append(pd.DataFrame({
+                "kind": kind, "value": keyed["value"].astype(str).to_numpy(), "clicks": pd.NA,
+                "flagged": keyed["flagged"].to_numpy(), "flagged_cost": keyed["flagged_cost"].to_numpy(),
+                "reasons": _reason_text(keyed[list(REASONS.values())]),
+            }))
+        parts.append(pd.DataFrame({
+            "kind": "placement", "value": bad.index.astype(str), "clicks": bad["clicks"].to_numpy(),
+            "flagged": bad["flagged"].to_numpy(), "flagged_cost": bad["flagged_cost"].to_numpy(),
+            "reasons": [f"{f / c:.0%} of clicks flagged" for f, c in zip(bad["flagged"], bad["clicks"])],
+        }))
+        exclusions = pd.concat(parts, ignore_index=True).astype(
+            {"clicks": "Int64", "flagged": np.int64, "flagged_cost": float})
+        exclusions = exclusions.sort_values(["kind", "flagged", "value"], ascending=[True, False, True],
+                                        ignore_index=True)
+
+        # per channel: flagged clicks, plus every click on an excluded placement
+        cells = placements.reset_index()
+        on_bad = cells["placement"].isin(bad.index)
+        cells["excluded"] = np.where(on_bad, cells["clicks"], cells["flagged"])
+        cells["excluded_cost"] = np.where(on_bad, cells["cost"], cells["flagged_cost"])
+        channels = cells.groupby("channel", as_index=False)[["clicks", "flagged", "excluded", "cost", "excluded_cost"]].sum()
+        channels = channels.astype({"clicks": np.int64, "flagged": np.int64, "excluded": np.int64})
+        channels["excluded_share"] = channels["excluded"] / channels["clicks"].clip(lower=1)
+        reasons = pd.DataFrame({"reason": list(REASONS.values()), "clicks": self._reasons})
+        return ClickScan(self.clicks, self.flagged, self.seconds, exclusions, channels, reasons, tuple(errors))
+
+
+def _combine(parts: list) -> pd.DataFrame:
+    if not parts:
+        return pd.DataFrame(columns=["value", *_KEY_COLUMNS])
+    df = pd.concat(parts)
+    levels = list(range(df.index.nlevels))
+    if "value" not in df:
+        return df.groupby(level=levels, sort=False).sum()
+    out = df.drop(columns="value").groupby(level=levels, sort=False).sum()
+    out["value"] = df["value"].groupby(level=levels, sort=False).first()
+    return out
+
+
+def _reason_text(counts: pd.DataFrame) -> list:
+    names = np.array(counts.columns)
+    return [", ".join(names[row > 0]) for row in counts.to_numpy()]
+
+
+_NO_TIME = np.iinfo(np.int64).min    # what NaT / NaN timestamps become in `_millis`
+
+
+def _millis(ts: pd.Series) -> np.ndarray:
+    """Epoch milliseconds (`_NO_TIME` where missing); numeric columns are s, ms or µs by magnitude."""
+    if pd.api.types.is_numeric_dtype(ts):
+        ms = np.round(epoch_seconds(ts.to_numpy(dtype=float)) * 1e3)
+        return np.where(np.isfinite(ms), ms, _NO_TIME).astype(np.int64)
+    return pd.to_datetime(ts, errors="coerce", utc=True).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+
+# ---------------------------------------------------------------------------
+# Click logs
+# ---------------------------------------------------------------------------
+
+def click_files(clicks_dir=CLICKS_DIR) -> list[Path]:
+    clicks_dir = Path(clicks_dir)
+    return sorted({p for pattern in CLICK_PATTERNS for p in clicks_dir.glob(pattern)})
+
+
+def normalize_clicks(df: pd.DataFrame, source: str = "clicks") -> pd.DataFrame:
+    """Select and rename a click frame to the canonical columns; raises `IngestError` if one is missing."""
+    names = set(df.columns)
+    cols = {k: next((a for a in aliases if a in names), None) for k, aliases in CLICK_COLUMNS.items()}
+    missing = [k for k in REQUIRED if cols[k] is None]
+    if missing:
+        raise IngestError(f"{Path(source).name}: missing column(s): {', '.join(missing)}")
+    cols = {k: v for k, v in cols.items() if v is not None}
+    return df[list(cols.values())].rename(columns={v: k for k, v in cols.items()})
+
+
+def read_clicks(path, chunk_rows: int = CHUNK_ROWS):
+    """Iterate one click log as chunks with canonical column names."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield normalize_clicks(batch.to_pandas(), path)
+    else:
+        with pd.read_csv(path, chunksize=chunk_rows, dtype={"ip": "string", "device_id": "string"}) as reader:
+            for chunk in reader:
+                yield normalize_clicks(chunk, path)
+
+
+def scan_clicks(paths, landing: LandingIndex | None = None, chunk_rows: int = CHUNK_ROWS) -> ClickScan:
+    """Replay every click log (in path order) through one scanner; unreadable files are reported."""
+    scanner, errors = ClickScanner(landing), []
+    for path in paths:
+        state = scanner.checkpoint()
+        try:
+            for chunk in read_clicks(path, chunk_rows):
+                scanner.feed(chunk)
+        except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+            scanner.restore(state)
+            errors.append(str(e) if isinstance(e, IngestError) else f"{Path(path).name}: {e}")
+    return scanner.result(errors)
+
+
+@lru_cache(maxsize=2)
+def cached_scan(keys: tuple, traffic_keys: tuple = ()) -> ClickScan:
+    """
+    Process-wide memo keyed on `gtm.ingest.file_key` tuples, shared by Parts 3 and 4.
+    Sessions from the traffic logs (when they carry IPs) drive NO_SESSION; no click logs -> sample clicks.
+    """
+    if not keys:
+        clicks, sessions = sample_clicks()
+        scanner = ClickScanner(LandingIndex.from_sessions(sessions))
+        scanner.feed(clicks)
+        return scanner.result()
+    landing = None
+    if traffic_keys:
+        from gtm.traffic import build_sessions
+        sessions, _ = build_sessions([k[0] for k in traffic_keys])
+        if "ip" in sessions and sessions["ip"].notna().any():
+            landing = LandingIndex.from_sessions(sessions)
+    return scan_clicks([k[0] for k in keys], landing)
+
+
+def apply_exclusions(perf: pd.DataFrame, channels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Part 4 performance frame with excluded clicks taken out: Clicks become valid clicks,
+    CPC and CTR are recomputed, conversions stay (excluded clicks do not convert).
+    """
+    share = perf["Channel"].map(channels.set_index("channel")["excluded_share"]).fillna(0.0).to_numpy()
+    out = perf.copy()
+    invalid = np.round(perf["Clicks"].to_numpy(dtype=float) * share).astype(np.int64)
+    out["Invalid clicks"] = invalid
+    out["Clicks"] = perf["Clicks"].to_numpy() - invalid
+    out["Wasted (€)"] = np.round(perf["Spend (€)"].to_numpy(dtype=float) * share, 2)
+    valid = out["Clicks"].to_numpy(dtype=float)
+    out["CPC (€)"] = np.where(valid > 0, np.round(perf["Spend (€)"].to_numpy(dtype=float) / np.maximum(valid, 1), 2), np.nan)
+    out["CTR"] = np.where(perf["Impressions"] > 0, valid / perf["Impressions"].clip(lower=1), perf["CTR"])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Sample click log
+# ---------------------------------------------------------------------------
+
+def click_stream(n_clicks: int, chunk_rows: int = CHUNK_ROWS, days: int = 14, seed: int = 5):
+    """
+    Time-ordered synthetic click chunks with their landing sessions: (clicks, sessions) per chunk.
+    Humans click now and then (~10 times each) and land; bots fire bursts of ~8 clicks within 40 s from a small pool
+    of IPs/devices, repeat a few ads, rarely land, and concentrate on a few junk placements.
+    """
+    rng = np.random.default_rng(seed)
+    channels = np.array(list(BASE_BUDGETS))
+    cpc = np.array([BENCHMARKS[ch]["cpc"] for ch in channels])
+    weight = np.array([BASE_BUDGETS[ch] for ch in channels]) / cpc
+    # ~10 clicks per person over the period, however long the log
+    people = np.arange(min(max(50_000, n_clicks // 10), 1 << 24))
+    human_ips = np.array([f"10.{i >> 16}.{(i >> 8) & 255}.{i & 255}" for i in people], dtype=object)
+    human_devices = np.array([f"dev-{i:08d}" for i in people], dtype=object)
+    bot_ips = np.array([f"203.0.113.{i}" for i in range(256)] + [f"198.51.100.{i}" for i in range(64)], dtype=object)
+    bot_devices = np.array([f"bot-{i:05d}" for i in range(len(bot_ips))], dtype=object)
+    ads = np.array([f"ad-{i:03d}" for i in range(120)], dtype=object)
+    good = np.array([f"news-site-{i}.example" for i in range(40)], dtype=object)
+    junk = np.array(["app::com.flashlight.free", "game-rewards.example", "parked-domain.example"], dtype=object)
+    start = pd.Timestamp("2025-01-06").value // 1_000_000
+    step = days * 86_400_000 / max(n_clicks, 1)
+    done = 0
+    while done < n_clicks:
+        n = min(chunk_rows, n_clicks - done)
+        ts = start + ((done + np.arange(n)) * step).astype(np.int64)
+        who = rng.integers(0, len(human_ips), n)
+        ip, device = human_ips[who], human_devices[who]
+        ad = ads[rng.integers(0, len(ads), n)]
+        chan = rng.choice(len(channels), n, p=weight / weight.sum())
+        placement = np.where(np.char.startswith(channels[chan].astype(str), "Google"), "google.com",
+                             good[rng.integers(0, len(good), n)]).astype(object)
+
+        # bots: ~8% of clicks, in bursts of 8 sharing an IP / device within 40 s
+        bot = np.flatnonzero(rng.random(n) < 0.08)
+        burst = np.arange(len(bot)) // 8
+        n_burst = int(burst[-1]) + 1 if len(bot) else 0
+        src = (rng.zipf(1.5, n_burst) - 1) % len(bot_ips)
+        ts[bot] = ts[bot[burst * 8]] + rng.integers(0, 40_000, len(bot))
+        ip[bot], device[bot] = bot_ips[src[burst]], bot_devices[src[burst]]
+        ad[bot] = ads[rng.integers(0, 8, n_burst)[burst]]
+        on_junk = rng.random(n_burst) < 0.6
+        placement[bot] = np.where(on_junk[burst], junk[rng.integers(0, len(junk), n_burst)][burst], placement[bot])
+        lands = rng.random(n) < 0.92
+        lands[bot] = rng.random(len(bot)) < 0.15
+
+        order = np.argsort(ts, kind="stable")
+        cost = np.round(cpc[chan] * rng.uniform(0.6, 1.4, n), 2)
+        clicks = pd.DataFrame({
+            "timestamp": pd.to_datetime(ts[order], unit="ms"),
+            "ip": ip[order], "device_id": device[order], "ad_id": ad[order],
+            "placement": placement[order], "channel": channels[chan][order], "cost": cost[order],
+        })
+        landed = lands[order]
+        sessions = pd.DataFrame({
+            "ip": clicks["ip"].to_numpy()[landed],
+            "start": (ts[order][landed] + rng.integers(2_000, 40_000, int(landed.sum()))) / 1000,
+        })
+        yield clicks, sessions
+        done += n
+
+
+def sample_clicks(n_clicks: int = 300_000, seed: int = 5) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """One in-memory sample: (clicks, landing sessions)."""
+    clicks, sessions = zip(*click_stream(n_clicks, chunk_rows=n_clicks, seed=seed))
+    return pd.concat(clicks, ignore_index=True), pd.concat(sessions, ignore_index=True)
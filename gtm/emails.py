@@ -0,0 +1,236 @@
+"""
+Lead email normalisation and classification (business / free / disposable / role / invalid).
+
+Backs the Part 3 rule "exclusion of free/invalid email domains" and the Part 4
+"keep business email required" LP fix. Whole columns go through Arrow kernels:
+one regex pass validates the syntax and splits local part and domain, domains
+are dictionary-encoded so the hash-set lookups run once per distinct domain
+(a CRM export has millions of rows but a few thousand domains), then the
+result is broadcast back to the rows.
+
+    classify_emails(df["email"])          # normalized, domain, category + flags
+
+CRM / form-fill exports dropped into data/leads/ (CSV or Parquet with an email
+column) feed the Part 3 lead-quality breakdown.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import DATA_DIR, IngestError
+
+LEADS_DIR = DATA_DIR / "leads"
+LEAD_PATTERNS = ("*.csv", "*.csv.gz", "*.parquet")
+# matched after lower-casing and turning spaces / hyphens into "_" ("Email Address" -> email_address)
+EMAIL_COLUMNS = ("email", "email_address", "e_mail", "work_email", "business_email")
+
+# in priority order: the first matching category wins
+CATEGORIES = ("missing", "invalid", "disposable", "free", "role", "business")
+
+FREE_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.uk", "ymail.com", "hotmail.com", "hotmail.co.uk",
+    "outlook.com", "live.com", "msn.com", "aol.com", "icloud.com", "me.com", "mac.com", "mail.com",
+    "gmx.com", "gmx.net", "gmx.de", "web.de", "proton.me", "protonmail.com", "pm.me", "yandex.com",
+    "yandex.ru", "mail.ru", "zoho.com", "fastmail.com", "hey.com", "tutanota.com", "qq.com", "163.com",
+    "comcast.net", "verizon.net", "att.net", "sbcglobal.net",
+})
+DISPOSABLE_DOMAINS = frozenset({
+    "mailinator.com", "guerrillamail.com", "guerrillamail.net", "sharklasers.com", "10minutemail.com",
+    "temp-mail.org", "tempmail.com", "tempmail.net", "yopmail.com", "trashmail.com", "getnada.com",
+    "dispostable.com", "maildrop.cc", "throwawaymail.com", "fakeinbox.com", "mintemail.com", "mailnesia.com",
+    "spamgourmet.com", "emailondeck.com", "moakt.com", "mohmal.com", "tempr.email", "discard.email",
+    "burnermail.io", "mailpoof.com", "33mail.com", "spambox.us", "mytemp.email", "inboxkitten.com",
+})
+ROLE_LOCAL_PARTS = frozenset({
+    "info", "admin", "administrator", "sales", "support", "contact", "hello", "hi", "hr", "office", "team",
+    "marketing", "billing", "accounts", "finance", "jobs", "careers", "recruiting", "help", "service",
+    "enquiries", "inquiries", "webmaster", "postmaster", "hostmaster", "abuse", "noreply", "no-reply",
+    "donotreply", "privacy", "legal", "press", "media", "security", "it", "root", "test",
+})
+# providers that ignore dots in the local part; "+tag" is stripped for every address
+DOTLESS_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+DOMAIN_ALIASES = {"googlemail.com": "gmail.com"}
+
+_LOCAL = r"[a-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_LOCAL_RE = rf"^{_LOCAL}(?:\.{_LOCAL})*$"
+_DOMAIN_RE = re.compile(r"(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}")
+
+
+def _read_domains(path: Path) -> frozenset:
+    with open(path, encoding="utf-8") as f:
+        return frozenset(d for line in f if (d := line.split("#", 1)[0].strip().lower()))
+
+
+def domain_list_files(data_dir=DATA_DIR) -> list[Path]:
+    """Optional extra domain lists: `free_domains.txt` / `disposable_domains.txt`, one domain per line."""
+    return [p for p in (Path(data_dir) / "free_domains.txt", Path(data_dir) / "disposable_domains.txt") if p.exists()]
+
+
+def domain_sets(data_dir=DATA_DIR) -> tuple[frozenset, frozenset]:
+    """Built-in free / disposable domains plus the lists from `domain_list_files`."""
+    free, disposable = FREE_DOMAINS, DISPOSABLE_DOMAINS
+    for path in domain_list_files(data_dir):
+        if path.name.startswith("free"):
+            free = free | _read_domains(path)
+        else:
+            disposable = disposable | _read_domains(path)
+    return free, disposable
+
+
+def _domain_classes(domains: list, free: frozenset, disposable: frozenset) -> np.ndarray:
+    """
+    (valid, free, disposable, dotless) per distinct domain, shape (4, n).
+    Disposable services also match on subdomains.
+    """
+    out = np.zeros((4, len(domains)), dtype=bool)
+    for i, d in enumerate(domains):
+        if _DOMAIN_RE.fullmatch(d):
+            out[:, i] = True, d in free, d in disposable or d.split(".", 1)[1] in disposable, d in DOTLESS_DOMAINS
+    return out
+
+
+def classify_emails(values, free: frozenset = FREE_DOMAINS, disposable: frozenset = DISPOSABLE_DOMAINS,
+                    role: frozenset = ROLE_LOCAL_PARTS) -> pd.DataFrame:
+    """
+    Normalise and classify a column of addresses (one row per input, same order).
+
+    normalized - lower-case, trimmed, "mailto:"/<> removed, "+tag" dropped, dots dropped on Gmail,
+                 DOMAIN_ALIASES applied
+    category   - first of CATEGORIES that applies
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(values, pd.Series):
+        values = values.astype("string[pyarrow]")
+    raw = pa.array(values, type=pa.string(), from_pandas=True)
+    if isinstance(raw, pa.ChunkedArray):
+        raw = raw.combine_chunks()
+    text = pc.utf8_lower(pc.utf8_trim_whitespace(raw))
+    # wrappers are rare; skip the regex rewrite when there are none
+    if pc.any(pc.starts_with(text, "mailto:")).as_py() or pc.any(pc.match_substring(text, "<")).as_py():
+        text = pc.replace_substring_regex(text, r"^<?(?:mailto:)?|>$", "")
+    missing = pc.fill_null(pc.equal(text, ""), True).to_numpy(zero_copy_only=False)
+
+    # per row: exactly one "@" and a well-formed local part
+    parts = pc.split_pattern(text, "@")
+    parts = pc.if_else(pc.fill_null(pc.equal(pc.list_value_length(parts), 2), False), parts, None)
+    local = pc.list_element(parts, 0)
+    local_ok = pc.fill_null(pc.match_substring_regex(local, _LOCAL_RE), False).to_numpy(zero_copy_only=False)
+
+    # per distinct domain: syntax, free / disposable / dotless
+    enc = pc.dictionary_encode(pc.list_element(parts, 1))
+    uniq = enc.dictionary.to_pylist()
+    classes = _domain_classes(uniq, free, disposable)
+    has = enc.indices.is_valid().to_numpy(zero_copy_only=False)
+    pos = pc.fill_null(enc.indices, 0).to_numpy(zero_copy_only=False)
+    dom_ok, is_free, is_disp, dotless = (
+        classes[:, pos] & has if classes.shape[1] else np.zeros((4, len(pos)), dtype=bool)
+    )
+    valid = local_ok & dom_ok
+    is_free, is_disp = is_free & valid, is_disp & valid
+
+    keep = pa.array(valid)
+    domain = pc.if_else(keep, enc.dictionary_decode(), None)
+    base = pc.list_element(pc.split_pattern(pc.if_else(keep, local, None), "+", max_splits=1), 0)
+    is_role = pc.fill_null(pc.is_in(base, value_set=pa.array(sorted(role))), False).to_numpy(zero_copy_only=False)
+    base = pc.if_else(pa.array(dotless), pc.replace_substring(base, ".", ""), base)
+    canonical = pc.take(pa.array([DOMAIN_ALIASES.get(d, d) for d in uniq], type=pa.string()), enc.indices)
+    normalized = pc.binary_join_element_wise(base, canonical, "@")
+
+    conditions = [missing, ~valid, is_disp, is_free, is_role]
+    category = np.select(conditions, list(range(len(conditions))), default=len(conditions))
+    return pd.DataFrame({
+        "normalized": normalized.to_pandas(types_mapper=pd.ArrowDtype).astype("string"),
+        "domain": domain.to_pandas(types_mapper=pd.ArrowDtype).astype("string"),
+        "category": pd.Categorical.from_codes(category, categories=CATEGORIES),
+        "valid": valid,
+        "free": is_free,
+        "disposable": is_disp,
+        "role": is_role,
+    })
+
+
+def lead_quality(classified: pd.DataFrame) -> pd.DataFrame:
+    """Leads per category with shares, plus distinct (normalised) addresses."""
+    counts = classified["category"].value_counts(sort=False).reindex(list(CATEGORIES), fill_value=0)
+    distinct = classified.groupby("category", observed=False)["normalized"].nunique().reindex(list(CATEGORIES), fill_value=0)
+    out = pd.DataFrame({"Category": list(CATEGORIES), "Leads": counts.to_numpy(), "Distinct": distinct.to_numpy()})
+    out["Share"] = out["Leads"] / max(int(out["Leads"].sum()), 1)
+    return out
+
+
+def flagged_domains(classified: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """The `n` free / disposable domains with the most leads."""
+    flagged = classified.loc[classified["category"].isin(["free", "disposable"]), ["domain", "category"]]
+    out = flagged.value_counts().head(n).reset_index()
+    out.columns = ["Domain", "Category", "Leads"]
+    out["Category"] = out["Category"].astype(str)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Lead exports
+# ---------------------------------------------------------------------------
+
+def lead_files(leads_dir=LEADS_DIR) -> list[Path]:
+    leads_dir = Path(leads_dir)
+    return sorted({p for pattern in LEAD_PATTERNS for p in leads_dir.glob(pattern)})
+
+
+def read_lead_emails(path) -> pd.Series:
+    """The email column of one lead export; raises `IngestError` when there is none."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        names = pq.ParquetFile(path).schema_arrow.names
+    else:
+        names = pd.read_csv(path, nrows=0).columns
+    key = lambda c: re.sub(r"[\s-]+", "_", str(c).strip().lower())
+    col = next((c for alias in EMAIL_COLUMNS for c in names if key(c) == alias), None)
+    if col is None:
+        raise IngestError(f"{path.name}: no email column (expected one of {', '.join(EMAIL_COLUMNS)})")
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=[col])[col].astype("string[pyarrow]")
+    return pd.read_csv(path, usecols=[col], dtype={col: "string[pyarrow]"})[col]
+
+
+def classify_leads(paths, free: frozenset = FREE_DOMAINS,
+                   disposable: frozenset = DISPOSABLE_DOMAINS) -> tuple[pd.DataFrame, list[str]]:
+    """Classify every lead export; files that fail to read are reported and skipped."""
+    parts, errors = [], []
+    for path in paths:
+        try:
+            parts.append(classify_emails(read_lead_emails(path), free, disposable))
+        except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+            errors.append(str(e) if isinstance(e, IngestError) else f"{Path(path).name}: {e}")
+    return (pd.concat(parts, ignore_index=True) if parts else classify_emails([])), errors
+
+
+def sample_leads(n: int = 50_000, seed: int = 7) -> pd.Series:
+    """A synthetic form-fill history with a realistic mix of messy, free, disposable and role addresses."""
+    rng = np.random.default_rng(seed)
+    first = np.array(["anna", "ben", "chloe", "david", "emma", "felix", "grace", "henry", "isla", "jack"])
+    last = np.array(["smith", "jones", "miller", "brown", "davis", "wilson", "moore", "clark"])
+    business = np.array([f"{c}{s}" for c in ("medi", "dent", "ortho", "care", "vita", "health", "clinic")
+                         for s in ("group.com", "partners.com", "labs.io", "co.de", "plus.com")])
+    kind = rng.choice(6, n, p=[.58, .22, .06, .05, .05, .04])   # business, free, role, disposable, invalid, empty
+    local = np.char.add(np.char.add(rng.choice(first, n), "."), rng.choice(last, n))
+    domain = rng.choice(business, n)
+    free = np.array(["gmail.com", "googlemail.com", "yahoo.com", "hotmail.com", "outlook.com", "icloud.com", "aol.com"])
+    domain = np.where(kind == 1, rng.choice(free, n, p=[.4, .05, .2, .15, .1, .06, .04]), domain)
+    domain = np.where(kind == 3, rng.choice(np.array(sorted(DISPOSABLE_DOMAINS)), n), domain)
+    local = np.where(kind == 2, rng.choice(np.array(["info", "sales", "contact", "office", "hello"]), n), local)
+    local = np.where(rng.random(n) < .04, np.char.add(local, "+webinar"), local)
+    email = np.char.add(np.char.add(local, "@"), domain)
+    email = np.where(kind == 4, rng.choice(np.array(["n/a", "test", "asdf@", "x@y", "john@@clinic.com"]), n), email)
+    email = np.where(kind == 5, "", email).astype(object)
+    # the way people really type them: upper case, padding, plus tags
+    upper = rng.random(n) < .1
+    email[upper] = np.char.upper(email[upper].astype(str))
+    padded = rng.random(n) < .05
+    email[padded] = np.char.add(" ", email[padded].astype(str))
+    return pd.Series(email, name="email", dtype="string")
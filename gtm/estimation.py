@@ -0,0 +1,89 @@
+"""Impression / click estimation from CPM, CPC and CTR benchmarks."""
+
+import numpy as np
+import pandas as pd
+
+from gtm.ranges import mid_range_num, parse_range_column
+
+
+# -----------------------------
+# Single-row estimator (reference)
+# -----------------------------
+def estimate_row_impr_clicks(budget_eur: float, cpm_txt: str, cpc_txt: str, ctr_txt: str) -> tuple[float, float]:
+    """
+    Estimate impressions & clicks for a single line using whatever is available:
+    - If CPM present -> Impr = budget / (CPM/1000); if CTR present -> Clicks = Impr * CTR
+    - Else if CPC present -> Clicks = budget / CPC; if CTR present -> Impr = Clicks / CTR
+    - Else fallback zeros
+    """
+    cpm = mid_range_num(cpm_txt)
+    cpc = mid_range_num(cpc_txt)
+    ctr = mid_range_num(ctr_txt)
+
+    impr = 0.0
+    clicks = 0.0
+
+    if cpm:  # we can get impressions
+        impr = budget_eur / (cpm / 1000.0)
+        if ctr:
+            clicks = impr * ctr
+    elif cpc:  # no CPM, but CPC given
+        clicks = budget_eur / cpc
+        if ctr and ctr > 0:
+            impr = clicks / ctr
+    return impr, clicks
+
+
+# -----------------------------
+# Columnar estimator
+# -----------------------------
+def estimate_impr_clicks(budget, cpm, cpc, ctr) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized twin of `estimate_row_impr_clicks` over numeric columns.
+
+    Inputs are array-likes of equal length (CTR as a decimal; NaN or 0 = not
+    available). Same precedence as the row version: CPM first, CPC fallback,
+    zeros when neither is usable.
+    """
+    budget = np.asarray(budget, dtype=float)
+    cpm = np.asarray(cpm, dtype=float)
+    cpc = np.asarray(cpc, dtype=float)
+    ctr = np.asarray(ctr, dtype=float)
+
+    has_cpm = np.nan_to_num(cpm) != 0
+    has_cpc = ~has_cpm & (np.nan_to_num(cpc) != 0)
+    has_ctr = np.nan_to_num(ctr) != 0
+
+    impr = np.zeros_like(budget)
+    clicks = np.zeros_like(budget)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # CPM path: impressions from spend, clicks via CTR
+        impr = np.where(has_cpm, budget / (cpm / 1000.0), impr)
+        clicks = np.where(has_cpm & has_ctr, impr * ctr, clicks)
+        # CPC path: clicks from spend, impressions via (positive) CTR
+        clicks = np.where(has_cpc, budget / cpc, clicks)
+        impr = np.where(has_cpc & (ctr > 0), clicks / ctr, impr)
+    return impr, clicks
+
+
+def _mid_values(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Numeric midpoints for a range column, reusing `<col>_mid` when the frame was pre-parsed."""
+    if f"{col}_mid" in df.columns:
+        return df[f"{col}_mid"].to_numpy(dtype=float)
+    return parse_range_column(df[col].to_numpy())["mid"].to_numpy()
+
+
+def estimate_frame(df: pd.DataFrame, budget_col: str = "Budget", cpm_col: str = "CPM",
+                   cpc_col: str = "CPC", ctr_col: str = "CTR") -> pd.DataFrame:
+    """Return `df` with `Impressions_est` / `Clicks_est` added, computed column-wise.
+
+    Frames that went through `gtm.ranges.parse_range_columns` are used as-is;
+    raw range text is parsed on the fly otherwise.
+    """
+    impr, clicks = estimate_impr_clicks(
+        df[budget_col].to_numpy(dtype=float),
+        _mid_values(df, cpm_col),
+        _mid_values(df, cpc_col),
+        _mid_values(df, ctr_col),
+    )
+    return df.assign(Impressions_est=impr, Clicks_est=clicks)
@@ -0,0 +1,262 @@
+"""
+Streaming ingest of ad-platform exports (Google Ads, LinkedIn Campaign Manager, YouTube).
+
+Exports are read in fixed-size chunks (only the day, campaign and metric
+columns) and summed into day × channel × campaign facts as they stream past,
+so memory stays bounded by the chunk size whatever the file size. Campaign
+names are mapped to the six Part 4 channels once per distinct name per chunk,
+not per row. The facts go into a `gtm.facts.FactStore`.
+
+    store, reports = ingest_exports(export_files())
+    df = actuals_performance(store)       # same columns as simulate_performance()
+"""
+
+import codecs
+import csv
+import gzip
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.facts import METRICS, FactStore
+from gtm.ingest import DATA_DIR, IngestError
+from gtm.simulation import BASE_BUDGETS, CHANNEL_FUNNEL, SQL_RATE
+
+EXPORTS_DIR = DATA_DIR / "exports"
+EXPORT_PATTERNS = ("*.csv", "*.csv.gz", "*.tsv")
+CHUNK_ROWS = 250_000
+HEADER_SCAN_LINES = 20     # exports start with a few title / date-range lines before the header
+
+# Canonical column -> header names used by the platforms (first match wins); day is optional
+COLUMN_ALIASES = {
+    "day": ("Day", "Date", "Start Date (in UTC)", "Reporting starts"),
+    "campaign": ("Campaign", "Campaign Name", "Campaign name"),
+    "spend": ("Cost", "Total Spent", "Amount Spent", "Spend"),
+    "impressions": ("Impr.", "Impressions"),
+    "clicks": ("Clicks",),
+    "conversions": ("Conversions", "Conv.", "Leads"),
+}
+
+# (platform, campaign-name pattern, channel); first match wins, unmatched rows are reported
+CHANNEL_RULES = [
+    ("youtube", r"", "YouTube – Awareness"),
+    ("google", r"youtube|\byt\b|video", "YouTube – Awareness"),
+    ("google", r"rlsa|remarketing|retargeting", "Google Search – RLSA (MOFU)"),
+    ("google", r"non[-_ ]?brand", "Google Search – Generic (MOFU)"),    # before the BOFU rule: "Non-Brand" contains "brand"
+    ("google", r"brand|exact|competitor|\bcomp\b|bofu", "Google Search – Exact/Brand/Comp (BOFU)"),
+    ("google", r"search|generic|mofu|\bdsa\b", "Google Search – Generic (MOFU)"),
+    ("linkedin", r"retarget|remarketing|website visitors|mofu", "LinkedIn – Retargeting (MOFU)"),
+    ("linkedin", r"", "LinkedIn – Awareness"),
+]
+_RULES = [(p, re.compile(rx, re.IGNORECASE), ch) for p, rx, ch in CHANNEL_RULES]
+
+CHANNELS = list(BASE_BUDGETS)
+_CHANNEL_IDX = {ch: i for i, ch in enumerate(CHANNELS)}
+_SKIP, _UNMAPPED = -2, -1   # summary rows ("Total: ..."), campaigns no rule matches
+
+
+class ExportLayout(NamedTuple):
+    platform: str             # "google", "linkedin" or "youtube"
+    header_row: int           # lines to skip before the header
+    sep: str
+    encoding: str
+    columns: dict             # canonical name -> header name in this file
+
+
+class ExportReport(NamedTuple):
+    path: str
+    platform: str | None
+    rows: int
+    skipped: int              # summary rows (no campaign or "Total ...")
+    unmapped_rows: int
+    unmapped_spend: float
+    seconds: float
+    error: str | None = None
+
+
+# -----------------------------
+# Layout detection
+# -----------------------------
+def export_files(export_dir=EXPORTS_DIR) -> list[Path]:
+    export_dir = Path(export_dir)
+    return sorted({p for pattern in EXPORT_PATTERNS for p in export_dir.glob(pattern)})
+
+
+def _head(path: Path) -> tuple[list[str], str]:
+    """First lines of a (possibly gzipped, possibly UTF-16) export, plus its encoding."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        raw = f.read(64 * 1024)
+    # Google Ads "Excel CSV" downloads are UTF-16 and tab separated
+    encoding = "utf-16" if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) else "utf-8-sig"
+    text = raw.decode(encoding, errors="ignore")
+    return text.splitlines()[:HEADER_SCAN_LINES], encoding
+
+
+def _platform(path: Path, header: list[str]) -> str:
+    if "Total Spent" in header or "Campaign Name" in header:
+        return "linkedin"
+    if "Views" in header or "youtube" in path.name.lower():
+        return "youtube"
+    return "google"
+
+
+def detect_layout(path, aliases: dict = COLUMN_ALIASES) -> ExportLayout:
+    """Find the header line, separator and platform of one export; raises `IngestError`."""
+    path = Path(path)
+    try:
+        lines, encoding = _head(path)
+    except OSError as e:
+        raise IngestError(f"{path.name}: {e}") from e
+    for i, line in enumerate(lines):
+        sep = "\t" if line.count("\t") > line.count(",") else ","
+        header = [h.strip() for h in next(csv.reader([line], delimiter=sep), [])]
+        columns = {}
+        for name, names in aliases.items():
+            found = next((a for a in names if a in header), None)
+            if found:
+                columns[name] = found
+        if "campaign" in columns and "spend" in columns:
+            missing = [m for m in METRICS if m not in columns]
+            if missing:
+                raise IngestError(f"{path.name}: missing column(s): {', '.join(missing)}")
+            return ExportLayout(_platform(path, header), i, sep, encoding, columns)
+    raise IngestError(f"{path.name}: no campaign/cost header in the first {HEADER_SCAN_LINES} lines")
+
+
+@lru_cache(maxsize=65536)
+def channel_for(platform: str, campaign: str) -> int:
+    """Index into `CHANNELS` for one campaign name (`_SKIP` for summary rows, `_UNMAPPED` if no rule)."""
+    if campaign.startswith("Total"):
+        return _SKIP
+    for p, rx, ch in _RULES:
+        if p == platform and rx.search(campaign):
+            return _CHANNEL_IDX[ch]
+    return _UNMAPPED
+
+
+# -----------------------------
+# Streaming aggregation
+# -----------------------------
+def read_export(path, layout: ExportLayout | None = None, chunk_rows: int = CHUNK_ROWS):
+    """Iterate one export as chunks with canonical columns ([day,] campaign, spend, impressions, clicks, conversions)."""
+    path = Path(path)
+    layout = layout or detect_layout(path)
+    rename = {v: k for k, v in layout.columns.items()}
+    labels = [layout.columns[c] for c in ("day", "campaign", "search_term") if c in layout.columns]
+    reader = pd.read_csv(
+        path, sep=layout.sep, encoding=layout.encoding, skiprows=layout.header_row,
+        usecols=list(rename), dtype=dict.fromkeys(labels, "category"),
+        thousands=",", na_values=["--", " --", ""], chunksize=chunk_rows,
+        compression="gzip" if path.suffix == ".gz" else None,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk.rename(columns=rename)
+
+
+def _chunk_days(chunk: pd.DataFrame, fallback: np.datetime64) -> np.ndarray:
+    """Row dates (datetime64[D]); only the distinct day labels are parsed. Missing -> `fallback`."""
+    if "day" not in chunk:
+        return np.full(len(chunk), fallback)
+    parsed = pd.to_datetime(chunk["day"].cat.categories, errors="coerce", format="mixed").values.astype("datetime64[D]")
+    lookup = np.append(np.where(np.isnat(parsed), fallback, parsed), fallback)
+    return lookup[chunk["day"].cat.codes.to_numpy()]
+
+
+def aggregate_export(path, chunk_rows: int = CHUNK_ROWS) -> tuple[pd.DataFrame, ExportReport]:
+    """
+    Stream one export into day × channel × campaign facts; errors go into the report.
+
+    Rows are summed per chunk, so memory follows the chunk size and the number of
+    distinct (day, campaign) pairs, not the file size. Exports without a date
+    column land on the file's modification date.
+    """
+    t0 = time.perf_counter()
+    path = Path(path)
+    parts = []
+    rows = skipped = unmapped = 0
+    unmapped_spend = 0.0
+    platform = None
+    error = None
+    try:
+        layout = detect_layout(path)
+        platform = layout.platform
+        fallback_day = np.datetime64(int(path.stat().st_mtime), "s").astype("datetime64[D]")
+        for chunk in read_export(path, layout, chunk_rows):
+            # map each distinct campaign once, then broadcast through the category codes
+            cats = chunk["campaign"].cat.categories
+            lookup = np.array([channel_for(platform, str(c)) for c in cats] + [_SKIP], dtype=np.int64)
+            # code -1 (no campaign: summary lines such as "Total: Account") -> last slot
+            codes = chunk["campaign"].cat.codes.to_numpy()
+            idx = lookup[codes]
+            values = np.nan_to_num(chunk[list(METRICS)].to_numpy(dtype=float))
+
+            ok = idx >= 0
+            part = pd.DataFrame(values[ok], columns=list(METRICS))
+            part.insert(0, "day", _chunk_days(chunk, fallback_day)[ok])
+            part.insert(1, "channel", idx[ok])
+            part.insert(2, "campaign", codes[ok])
+            part = part.groupby(["day", "channel", "campaign"], sort=False).sum().reset_index()
+            part["campaign"] = cats.take(part["campaign"].to_numpy())
+            parts.append(part)
+
+            rows += len(chunk)
+            skipped += int((idx == _SKIP).sum())
+            lost = idx == _UNMAPPED
+            unmapped += int(lost.sum())
+            unmapped_spend += float(values[lost, 0].sum())
+    except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+        error = str(e) if isinstance(e, IngestError) else f"{path.name}: {e}"
+        parts = []
+
+    facts = (pd.concat(parts).groupby(["day", "channel", "campaign"], sort=False).sum().reset_index()
+             if parts else pd.DataFrame(columns=["day", "channel", "campaign", *METRICS]))
+    facts["channel"] = np.array(CHANNELS, dtype=object)[facts["channel"].to_numpy(dtype=np.int64)]
+    facts["funnel"] = facts["channel"].map(CHANNEL_FUNNEL)
+    return facts, ExportReport(str(path), platform, rows, skipped, unmapped, unmapped_spend,
+                               time.perf_counter() - t0, error)
+
+
+def ingest_exports(paths, chunk_rows: int = CHUNK_ROWS, store: FactStore | None = None) -> tuple[FactStore, list[ExportReport]]:
+    """Append every export to a fact store (files that fail contribute nothing and report the error)."""
+    store = store if store is not None else FactStore()
+    reports = []
+    for path in paths:
+        facts, report = aggregate_export(path, chunk_rows)
+        if report.error is None:
+            store.append(facts)
+        reports.append(report)
+    return store, reports
+
+
+def actuals_performance(store: FactStore) -> pd.DataFrame:
+    """Part 4 performance table from the channel rollup; SQLs are estimated (exports carry no CRM stage)."""
+    totals = store.rollup("channel").set_index("channel").reindex(CHANNELS, fill_value=0)
+    spend, impr, clicks, conv = (totals[m].to_numpy(dtype=float) for m in METRICS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df = pd.DataFrame({
+            "Channel": list(totals.index),
+            "Spend (€)": np.round(spend, 2),
+            "CPC (€)": np.round(np.where(clicks > 0, spend / clicks, np.nan), 2),
+            "CPM (€)": np.round(np.where(impr > 0, spend / impr * 1000, np.nan), 2),
+            "Impressions": impr.astype(np.int64),
+            "Clicks": clicks.astype(np.int64),
+            "CTR": np.where(impr > 0, clicks / impr, 0.0),
+        })
+    df["Click Share"] = df["Clicks"] / max(df["Clicks"].sum(), 1)
+    df["Conversions"] = np.round(conv, 1)
+    df["CPA (€)"] = (df["Spend (€)"] / df["Conversions"]).where(df["Conversions"] > 0)
+    df["SQLs"] = np.round(conv * SQL_RATE).astype(np.int64)
+    return df
+
+
+def reports_frame(reports) -> pd.DataFrame:
+    out = pd.DataFrame([r._asdict() for r in reports], columns=ExportReport._fields)
+    out["rows/s"] = (out["rows"] / out["seconds"].where(out["seconds"] > 0)).round(0)
+    return out
@@ -0,0 +1,175 @@
+"""
+Columnar fact store: day × channel × funnel stage × campaign, with incremental rollups.
+
+Dimensions are stored as int32 codes into append-only dictionaries (a code never
+changes once assigned, so stored rows and rollups stay valid as new values
+arrive) and metrics as float32. Each `append` folds only the new rows into the
+per-channel, per-funnel, per-parent-channel and per-week rollups, so dashboards
+read O(groups) rows instead of rescanning the facts.
+
+    store = FactStore()
+    store.append(day_df)                  # columns: day, channel, funnel, campaign + metrics
+    store.rollup("funnel")                # one row per funnel stage
+"""
+
+import numpy as np
+import pandas as pd
+
+from gtm.channels import parent_channel
+
+DIMENSIONS = ("channel", "funnel", "campaign")   # coded dimensions (day is stored as an int32 day number)
+METRICS = ("spend", "impressions", "clicks", "conversions")
+ROLLUPS = ("channel", "funnel", "parent", "week")
+INITIAL_CAPACITY = 1024
+
+
+class FactStoreError(ValueError):
+    """Rows that cannot be appended (missing columns or dimension values, bad dates)."""
+
+
+class _Dictionary:
+    """Append-only value <-> int32 code mapping."""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, values) -> np.ndarray:
+        # factorize once, then map only the distinct values through the dict
+        local, uniques = pd.factorize(np.asarray(values))
+        if (local < 0).any():
+            raise ValueError("missing value")
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for i, v in enumerate(uniques):
+            code = self._index.get(v)
+            if code is None:
+                code = self._index[v] = len(self.values)
+                self.values.append(v)
+            lookup[i] = code
+        return lookup[local]
+
+
+class _Rollup:
+    """Running float64 sums (and row counts) per group code; grows as new codes appear."""
+
+    def __init__(self, n_metrics: int):
+        self.sums = np.zeros((0, n_metrics))
+        self.rows = np.zeros(0, dtype=np.int64)
+
+    def add(self, keys: np.ndarray, values: np.ndarray):
+        n = max(len(self.sums), int(keys.max()) + 1)
+        if n > len(self.sums):
+            self.sums = np.vstack([self.sums, np.zeros((n - len(self.sums), self.sums.shape[1]))])
+            self.rows = np.concatenate([self.rows, np.zeros(n - len(self.rows), dtype=np.int64)])
+        for j in range(values.shape[1]):
+            self.sums[:, j] += np.bincount(keys, weights=values[:, j], minlength=n)
+        self.rows += np.bincount(keys, minlength=n)
+
+
+def _day_numbers(values) -> np.ndarray:
+    """Days since 1970-01-01 as int32 (parses the distinct values only)."""
+    local, uniques = pd.factorize(np.asarray(values))
+    dates = pd.to_datetime(pd.Index(uniques), errors="coerce")
+    if (local < 0).any() or dates.isna().any():
+        raise ValueError("missing or unparseable day")
+    days = dates.values.astype("datetime64[D]").astype(np.int64).astype(np.int32)
+    return days[local]
+
+
+class FactStore:
+    """Append-only columnar facts plus rollups maintained on append."""
+
+    def __init__(self, metrics=METRICS, capacity: int = INITIAL_CAPACITY):
+        self.metrics = tuple(metrics)
+        self.dicts = {name: _Dictionary() for name in DIMENSIONS + ("parent", "week")}
+        self._n = 0
+        self._day = np.empty(capacity, dtype=np.int32)
+        self._codes = {d: np.empty(capacity, dtype=np.int32) for d in DIMENSIONS}
+        self._values = {m: np.empty(capacity, dtype=np.float32) for m in self.metrics}
+        self._parent_of = np.zeros(0, dtype=np.int32)        # channel code -> parent code
+        self._rollups = {name: _Rollup(len(self.metrics)) for name in ROLLUPS}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, metrics=METRICS) -> "FactStore":
+        store = cls(metrics, capacity=max(len(df), 1))
+        store.append(df)
+        return store
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the fact columns (allocated capacity)."""
+        return (self._day.nbytes + sum(a.nbytes for a in self._codes.values())
+                + sum(a.nbytes for a in self._values.values()))
+
+    def _reserve(self, extra: int):
+        need = self._n + extra
+        if need <= len(self._day):
+            return
+        cap = max(need, 2 * len(self._day))
+        grow = lambda a: np.concatenate([a[:self._n], np.empty(cap - self._n, dtype=a.dtype)])
+        self._day = grow(self._day)
+        self._codes = {d: grow(a) for d, a in self._codes.items()}
+        self._values = {m: grow(a) for m, a in self._values.items()}
+
+    def append(self, df: pd.DataFrame):
+        """Append rows (`day`, `channel`, `funnel`, `campaign` + metric columns) and update the rollups."""
+        missing = [c for c in ("day",) + DIMENSIONS + self.metrics if c not in df.columns]
+        if missing:
+            raise FactStoreError(f"missing column(s): {', '.join(missing)}")
+        if df.empty:
+            return
+        try:
+            day = _day_numbers(df["day"])
+            codes = {d: self.dicts[d].encode(df[d]) for d in DIMENSIONS}
+        except ValueError as e:
+            raise FactStoreError(str(e)) from e
+        values = df[list(self.metrics)].to_numpy(dtype=float)
+        if np.isnan(values).any():
+            raise FactStoreError("missing metric values")
+
+        n, start = len(df), self._n
+        self._reserve(n)
+        self._day[start:start + n] = day
+        for d in DIMENSIONS:
+            self._codes[d][start:start + n] = codes[d]
+        for j, m in enumerate(self.metrics):
+            self._values[m][start:start + n] = values[:, j]
+        self._n += n
+
+        # parent channel is resolved once per new channel code
+        channels = self.dicts["channel"].values
+        if len(channels) > len(self._parent_of):
+            new = channels[len(self._parent_of):]
+            self._parent_of = np.concatenate([self._parent_of, self.dicts["parent"].encode([parent_channel(str(c)) for c in new])])
+
+        week = self.dicts["week"].encode((day + 3) // 7)   # Monday-based week number (1970-01-01 is a Thursday)
+        for name, keys in (("channel", codes["channel"]), ("funnel", codes["funnel"]),
+                           ("parent", self._parent_of[codes["channel"]]), ("week", week)):
+            self._rollups[name].add(keys, values)
+
+    def rollup(self, name: str) -> pd.DataFrame:
+        """Totals per group (`channel`, `funnel`, `parent` or `week`), plus the number of fact rows."""
+        r = self._rollups[name]
+        labels = self.dicts[name].values
+        if name == "week":
+            labels = [np.datetime64(int(w) * 7 - 3, "D") for w in labels]   # week start (Monday)
+        out = pd.DataFrame(r.sums, columns=self.metrics)
+        out.insert(0, name, pd.Series(labels, dtype="datetime64[ns]" if name == "week" else object))
+        out["rows"] = r.rows
+        return out.sort_values(name, ignore_index=True) if name == "week" else out
+
+    def frame(self) -> pd.DataFrame:
+        """The facts as a DataFrame (categoricals over the stored codes; no copy of the dictionaries)."""
+        n = self._n
+        out = pd.DataFrame({"day": self._day[:n].astype("datetime64[D]")})
+        for d in DIMENSIONS:
+            out[d] = pd.Categorical.from_codes(self._codes[d][:n], categories=pd.Index(self.dicts[d].values))
+        for m in self.metrics:
+            out[m] = self._values[m][:n]
+        return out
@@ -0,0 +1,224 @@
+"""
+Table ingestion for the `data/` directory.
+
+CSV, Parquet and Arrow/Feather files are read with a declared schema (compact
+dtypes, categoricals for low-cardinality labels) and cached on
+(path, mtime, size), so replacing a file is picked up on the next read.
+Every load returns a `LoadReport` with timing and any error instead of
+silently swallowing failures.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+INGEST_CACHE_SIZE = 32
+SUFFIXES = (".parquet", ".arrow", ".feather", ".csv")   # lookup order for a bare table name
+
+
+class IngestError(ValueError):
+    """A data file that cannot be read or does not match its schema."""
+
+
+class Schema(NamedTuple):
+    columns: dict                     # column -> dtype ("category", "int32", "float32", "string", ...)
+    required: tuple | None = None     # columns that must be present (default: all)
+
+
+class LoadReport(NamedTuple):
+    name: str
+    path: str | None
+    source: str                       # "file", "fallback" (no file) or "error" (fallback used)
+    rows: int
+    seconds: float
+    cached: bool
+    error: str | None = None
+
+
+SCHEMAS = {
+    "channel_reach": Schema({
+        "channel": "category",
+        "est_audience": "int64",
+        "typical_role_fit": "string",
+        "cpc_low": "float32",
+        "cpc_high": "float32",
+        "funnel_role": "category",
+    }),
+    "icp_mock": Schema({
+        "industry": "category",
+        "company_size_min": "int32",
+        "company_size_max": "int32",
+        "region": "category",
+        "primary_role": "category",
+        "accounts": "int32",
+    }),
+    "accounts": Schema({
+        "company": "string",
+        "industry": "category",
+        "employees": "int32",
+        "region": "category",
+        "tier": "category",
+        "role": "category",
+    }, required=("industry", "employees", "region", "role")),
+    "competitors": Schema({
+        "company": "string",
+        "focus": "string",
+        "strength": "string",
+        "gap": "string",
+    }),
+}
+
+
+# -----------------------------
+# Numeric epochs
+# -----------------------------
+def epoch_seconds(t: np.ndarray) -> np.ndarray:
+    """
+    Numeric epoch timestamps in seconds, the unit picked by magnitude: seconds below 1e11,
+    milliseconds below 1e14, microseconds (GA4) above.
+    """
+    t = np.asarray(t, dtype=float)
+    top = np.nanmax(np.abs(t), initial=0)
+    return t if top < 1e11 else t / 1e3 if top < 1e14 else t / 1e6
+
+
+# -----------------------------
+# Reading + schema enforcement
+# -----------------------------
+def apply_schema(df: pd.DataFrame, schema: Schema, source: str = "frame") -> pd.DataFrame:
+    """Select the schema's columns (in order) and cast them; raises `IngestError` on mismatch."""
+    required = schema.columns if schema.required is None else schema.required
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise IngestError(f"{source}: missing column(s): {', '.join(missing)}")
+    cols = [c for c in schema.columns if c in df.columns]
+    try:
+        return df[cols].astype({c: schema.columns[c] for c in cols})
+    except (TypeError, ValueError) as e:
+        raise IngestError(f"{source}: {e}") from e
+
+
+def read_table(path, schema: Schema | None = None) -> pd.DataFrame:
+    """Read one CSV / Parquet / Arrow file, projecting and casting to `schema` when given."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    cols = list(schema.columns) if schema else None
+    try:
+        if suffix == ".csv":
+            df = pd.read_csv(
+                path,
+                usecols=(lambda c: c in schema.columns) if schema else None,
+                dtype={c: t for c, t in schema.columns.items() if t in ("category", "string")} if schema else None,
+            )
+        elif suffix == ".parquet":
+            df = pd.read_parquet(path, columns=_parquet_columns(path, cols))
+        elif suffix in (".arrow", ".feather"):
+            df = pd.read_feather(path)
+        else:
+            raise IngestError(f"{path.name}: unsupported file type {suffix!r}")
+    except (OSError, ValueError, pd.errors.ParserError) as e:
+        if isinstance(e, IngestError):
+            raise
+        raise IngestError(f"{path.name}: {e}") from e
+    return apply_schema(df, schema, path.name) if schema else df
+
+
+def _parquet_columns(path: Path, cols):
+    """Requested columns present in a Parquet file (missing ones are reported by `apply_schema`)."""
+    if cols is None:
+        return None
+    import pyarrow.parquet as pq
+    names = set(pq.read_schema(path).names)
+    return [c for c in cols if c in names]
+
+
+# -----------------------------
+# Cache keyed on (path, mtime, size)
+# -----------------------------
+_cache: "OrderedDict[tuple, pd.DataFrame | IngestError]" = OrderedDict()
+cache_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()        # the cache and stats are shared by every session (thread)
+
+
+def file_key(path) -> tuple:
+    st = os.stat(path)
+    return str(Path(path).resolve()), st.st_mtime_ns, st.st_size
+
+
+def find_table(name: str, data_dir=DATA_DIR) -> Path | None:
+    """First existing `data_dir/<name><suffix>` in `SUFFIXES` order."""
+    for suffix in SUFFIXES:
+        path = Path(data_dir) / f"{name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def load_table(path, schema: Schema | None = None) -> tuple[pd.DataFrame, LoadReport]:
+    """
+    Read `path` through the cache; a changed mtime or size re-reads the file.
+    Failures are cached too (and re-raised) until the file changes.
+    """
+    t0 = time.perf_counter()
+    key = file_key(path) + (repr(schema),)
+    with _lock:
+        cached = key in _cache
+        if cached:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            df = _cache[key]
+        else:
+            cache_stats["misses"] += 1
+    if not cached:
+        # outside the lock: a slow read must not stall other sessions' hits
+        try:
+            df = read_table(path, schema)
+        except IngestError as e:
+            df = e
+        with _lock:
+            # drop stale entries for the same file before adding the new one
+            for k in [k for k in _cache if k[0] == key[0]]:
+                del _cache[k]
+            _cache[key] = df
+            while len(_cache) > INGEST_CACHE_SIZE:
+                _cache.popitem(last=False)
+    if isinstance(df, IngestError):
+        raise df
+    report = LoadReport(Path(path).stem, str(path), "file", len(df), time.perf_counter() - t0, cached)
+    return df.copy(deep=False), report
+
+
+def load_with_fallback(name: str, fallback: pd.DataFrame, data_dir=DATA_DIR,
+                       schema: Schema | None = None) -> tuple[pd.DataFrame, LoadReport]:
+    """
+    Load table `name` from `data_dir` (any supported format) or return `fallback`.
+
+    The fallback goes through the same schema, so callers always get the same
+    dtypes. Read / schema errors are returned in the report, not raised.
+    """
+    schema = schema or SCHEMAS.get(name)
+    t0 = time.perf_counter()
+    path = find_table(name, data_dir)
+    error = None
+    if path is not None:
+        try:
+            return load_table(path, schema)
+        except IngestError as e:
+            error = str(e)
+    df = apply_schema(fallback, schema, f"{name} (fallback)") if schema else fallback.copy()
+    return df, LoadReport(name, str(path) if path else None, "error" if error else "fallback",
+                          len(df), time.perf_counter() - t0, False, error)
+
+
+def reports_frame(reports) -> pd.DataFrame:
+    """One row per load, for display."""
+    out = pd.DataFrame([r._asdict() for r in reports], columns=LoadReport._fields)
+    out["ms"] = (out.pop("seconds") * 1000).round(2)
+    return out
@@ -0,0 +1,322 @@
+"""
+Keyword clustering for Google Ads Keyword Planner exports (Part 1 Google Search sub-tab).
+
+Keywords are grouped by the overlap of their word stems, without comparing
+every pair:
+
+    stems       lower-cased words, stop words dropped, crude suffix stripping
+                ("gamified" / "gamification" -> "gam"), cut to STEM_CHARS
+    MinHash     MINHASH_PERMS hashes per stem set; the share of equal positions
+                between two signatures estimates their Jaccard similarity
+    LSH         signatures cut into LSH_BANDS bands; keywords sharing a band
+                bucket are candidates, compared with the bucket's most-searched
+                keyword only
+    clusters    each keyword links to the most-searched candidate whose exact
+                Jaccard similarity reaches SIMILARITY; clusters are the trees of
+                those links, headed by a keyword with no better-searched match
+
+Linking upwards by search volume, rather than taking connected components,
+keeps long-tail keywords that share only a modifier ("... pricing", "... near
+me") from chaining every head term into one cluster. Each keyword is compared
+LSH_BANDS times, so a 200k-keyword export clusters in seconds. Clusters are
+named after their head keyword and carry the summed monthly searches and the
+search-weighted low / high top-of-page bids.
+
+    keywords = read_keywords(path)
+    cluster = cluster_keywords(keywords["keyword"], keywords["searches"])
+    clusters = cluster_summary(keywords, cluster)
+
+Exports dropped into data/keywords/ (the Keyword Planner CSV download, UTF-16
+"Excel" variant included) replace the hand-built clusters on the page.
+"""
+
+import codecs
+import csv
+import gzip
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from gtm.ingest import DATA_DIR, IngestError
+
+KEYWORDS_DIR = DATA_DIR / "keywords"
+KEYWORD_PATTERNS = ("*.csv", "*.csv.gz", "*.tsv")
+HEADER_SCAN_LINES = 20     # Keyword Planner puts a title and a date-range line above the header
+
+STEM_CHARS = 5
+MINHASH_PERMS = 30
+LSH_BANDS = 10             # 10 bands x 3 rows: pairs at Jaccard 0.5 meet in a bucket ~74% of the time
+SIMILARITY = 0.5           # exact stem Jaccard needed to link a keyword to a better-searched one
+MAX_STEMS = 12            # stems compared per keyword (Keyword Planner caps keywords at 10 words)
+EXAMPLES = 5               # keywords listed per cluster
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "at", "by", "from", "or", "vs",
+    "what", "is", "are", "how", "best", "top", "near", "me", "my", "your",
+})
+SUFFIXES = ("ification", "ified", "ations", "ation", "ings", "ing", "ies", "ers", "er", "ed", "es", "s")
+
+# Canonical column -> Keyword Planner header names (first match wins)
+KEYWORD_COLUMNS = {
+    "keyword": ("Keyword", "Keywords", "Search term"),
+    "searches": ("Avg. monthly searches", "Avg. Monthly Searches", "Searches"),
+    "cpc_low": ("Top of page bid (low range)", "Top of page bid (low)", "CPC low"),
+    "cpc_high": ("Top of page bid (high range)", "Top of page bid (high)", "CPC high"),
+    "currency": ("Currency",),
+}
+
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+# -----------------------------
+# Stems + MinHash
+# -----------------------------
+def stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word.rstrip("e")[:STEM_CHARS] if len(word) > 3 else word
+
+
+def stem_sets(keywords: pd.Series) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    (keyword position, stem code) pairs, one per distinct stem of each keyword, sorted by keyword;
+    plus the number of distinct stems. Words are split and stemmed once per distinct word.
+    """
+    words = (keywords.astype(str).str.lower().str.replace(r"[^0-9a-z]+", " ", regex=True)
+             .str.split().explode())
+    words = words[words.notna() & ~words.isin(STOP_WORDS)]
+    distinct, inverse = np.unique(words.to_numpy(dtype=str), return_inverse=True)
+    stem_codes, stems = pd.factorize(pd.Series([stem(w) for w in distinct]))
+    pairs = pd.DataFrame({"kw": words.index.to_numpy(dtype=np.int64), "stem": stem_codes[inverse]})
+    pairs = pairs.drop_duplicates().sort_values(["kw", "stem"], kind="stable")
+    return pairs["kw"].to_numpy(), pairs["stem"].to_numpy(), len(stems)
+
+
+def minhash(kw: np.ndarray, stems: np.ndarray, n_keywords: int, n_stems: int,
+            perms: int = MINHASH_PERMS, seed: int = 1) -> np.ndarray:
+    """
+    (n_keywords, perms) MinHash signatures from sorted (keyword, stem) pairs. Each permutation is
+    a universal hash of the stem code, computed once per distinct stem; keywords without stems get
+    a signature of their own (their position), so they only cluster with themselves.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 61, perms, dtype=np.uint64)
+    b = rng.integers(0, 1 << 61, perms, dtype=np.uint64)
+    codes = np.arange(n_stems, dtype=np.uint64)
+    # (a * x + b) mod p, with x < 2^32 so the product wraps at most once per limb; mixing, not exactness
+    per_stem = ((codes[:, None] * a[None, :] + b[None, :]) % _PRIME).astype(np.uint64)
+    sig = np.empty((n_keywords, perms), dtype=np.uint64)
+    sig[:] = np.iinfo(np.uint64).max - np.arange(n_keywords, dtype=np.uint64)[:, None]
+    if len(kw):
+        starts = np.flatnonzero(np.r_[True, kw[1:] != kw[:-1]])
+        sig[kw[starts]] = np.minimum.reduceat(per_stem[stems], starts, axis=0)
+    return sig
+
+
+# -----------------------------
+# LSH + clusters
+# -----------------------------
+def stem_matrix(kw: np.ndarray, stems: np.ndarray, n_keywords: int, width: int = MAX_STEMS) -> np.ndarray:
+    """(n_keywords, width) stem codes per keyword, padded with -1 (longer keywords keep their first `width`)."""
+    starts = np.flatnonzero(np.r_[True, kw[1:] != kw[:-1]]) if len(kw) else np.array([], dtype=np.int64)
+    rank = np.arange(len(kw)) - np.repeat(starts, np.diff(np.r_[starts, len(kw)]))
+    keep = rank < width
+    out = np.full((n_keywords, width), -1, dtype=np.int32)
+    out[kw[keep], rank[keep]] = stems[keep]
+    return out
+
+
+def jaccard(sets: np.ndarray, u: np.ndarray, v: np.ndarray, chunk: int = 200_000) -> np.ndarray:
+    """Exact Jaccard similarity of the stem sets of keyword pairs (u[i], v[i])."""
+    size = (sets >= 0).sum(axis=1)
+    out = np.empty(len(u))
+    for at in range(0, len(u), chunk):
+        a, b = sets[u[at:at + chunk]], sets[v[at:at + chunk]]
+        inter = ((a[:, :, None] == b[:, None, :]) & (a[:, :, None] >= 0)).sum(axis=(1, 2))
+        union = size[u[at:at + chunk]] + size[v[at:at + chunk]] - inter
+        out[at:at + chunk] = np.where(union > 0, inter / np.maximum(union, 1), 0.0)
+    return out
+
+
+def lsh_parents(sig: np.ndarray, sets: np.ndarray, rank: np.ndarray, bands: int = LSH_BANDS,
+                similarity: float = SIMILARITY) -> np.ndarray:
+    """
+    Parent per keyword: the best-ranked (most-searched) keyword heading one of its band buckets
+    whose exact Jaccard similarity reaches `similarity`; keywords with none are their own parent.
+    Bucket heads are the best-ranked member, so each keyword is compared once per band.
+    """
+    rows = sig.shape[1] // bands
+    parent = np.arange(len(sig))
+    for band in range(bands):
+        block = sig[:, band * rows:(band + 1) * rows]
+        key = block[:, 0].copy()
+        for col in range(1, rows):
+            key = key * np.uint64(0x9E3779B97F4A7C15) ^ block[:, col]
+        order = np.lexsort((rank, key))
+        ordered = key[order]
+        first = np.r_[True, ordered[1:] != ordered[:-1]]
+        head = order[np.flatnonzero(first)[np.cumsum(first) - 1]]
+        other = head != order
+        u, v = order[other], head[other]
+        close = jaccard(sets, u, v) >= similarity
+        u, v = u[close], v[close]
+        better = rank[v] < rank[parent[u]]
+        parent[u[better]] = v[better]
+    return parent
+
+
+def roots(parent: np.ndarray) -> np.ndarray:
+    """Root per node of a parent forest (parents always rank better, so there are no cycles), by pointer jumping."""
+    while True:
+        jumped = parent[parent]
+        if (jumped == parent).all():
+            return parent
+        parent = jumped
+
+
+def cluster_keywords(keywords: pd.Series, searches=None, bands: int = LSH_BANDS,
+                     similarity: float = SIMILARITY) -> np.ndarray:
+    """Cluster id per keyword (0..k-1, in order of first appearance); `searches` picks the cluster heads."""
+    keywords = keywords.reset_index(drop=True)
+    n = len(keywords)
+    volume = np.zeros(n) if searches is None else np.asarray(searches, dtype=float)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), -np.nan_to_num(volume)))] = np.arange(n)     # 0 = most searched
+    kw, stems, n_stems = stem_sets(keywords)
+    sig = minhash(kw, stems, n, n_stems, perms=bands * max(MINHASH_PERMS // LSH_BANDS, 1))
+    sets = stem_matrix(kw, stems, n)
+    return pd.factorize(roots(lsh_parents(sig, sets, rank, bands, similarity)))[0]
+
+
+def cluster_summary(keywords: pd.DataFrame, cluster: np.ndarray, examples: int = EXAMPLES) -> pd.DataFrame:
+    """
+    One row per cluster, most searched first: Cluster (its top keyword), Keywords (count),
+    Keywords (examples), Avg_Monthly_Searches, CPC_Low_<cur> / CPC_High_<cur> (search-weighted).
+    """
+    currency = str(keywords["currency"].dropna().mode().iat[0]) if keywords["currency"].notna().any() else "GBP"
+    df = keywords.assign(cluster=cluster).sort_values("searches", ascending=False, kind="stable")
+    weight = df["searches"].clip(lower=1)
+    df = df.assign(w=weight, wl=df["cpc_low"] * weight, wh=df["cpc_high"] * weight,
+                   wl_n=weight.where(df["cpc_low"].notna(), 0), wh_n=weight.where(df["cpc_high"].notna(), 0))
+    g = df.groupby("cluster", sort=False)
+    out = pd.DataFrame({
+        "Cluster": g["keyword"].first(),
+        "Keywords": g.size(),
+        "Keywords (examples)": g["keyword"].agg(lambda s: "; ".join(s.iloc[:examples])),
+        "Avg_Monthly_Searches": g["searches"].sum().astype(np.int64),
+        f"CPC_Low_{currency}": (g["wl"].sum() / g["wl_n"].sum().replace(0, np.nan)).round(2),
+        f"CPC_High_{currency}": (g["wh"].sum() / g["wh_n"].sum().replace(0, np.nan)).round(2),
+    })
+    return out.sort_values("Avg_Monthly_Searches", ascending=False, ignore_index=True)
+
+
+# -----------------------------
+# Keyword Planner exports
+# -----------------------------
+def keyword_files(keywords_dir=KEYWORDS_DIR) -> list[Path]:
+    keywords_dir = Path(keywords_dir)
+    return sorted({p for pattern in KEYWORD_PATTERNS for p in keywords_dir.glob(pattern)})
+
+
+def read_keywords(path) -> pd.DataFrame:
+    """keyword, searches, cpc_low, cpc_high, currency from one export; raises `IngestError`."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rb") as f:
+            raw = f.read(64 * 1024)
+        # the "Excel CSV" download is UTF-16 and tab separated
+        encoding = "utf-16" if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) else "utf-8-sig"
+        for i, line in enumerate(raw.decode(encoding, errors="ignore").splitlines()[:HEADER_SCAN_LINES]):
+            sep = "\t" if line.count("\t") > line.count(",") else ","
+            header = [h.strip() for h in next(csv.reader([line], delimiter=sep), [])]
+            columns = {name: next((a for a in aliases if a in header), None) for name, aliases in KEYWORD_COLUMNS.items()}
+            if columns["keyword"] and columns["searches"]:
+                break
+        else:
+            raise IngestError(f"{path.name}: no Keyword / Avg. monthly searches header in the first {HEADER_SCAN_LINES} lines")
+        found = {name: col for name, col in columns.items() if col}
+        df = pd.read_csv(path, sep=sep, encoding=encoding, skiprows=i, usecols=list(found.values()),
+                         compression="gzip" if path.suffix == ".gz" else None)
+    except (OSError, UnicodeError, ValueError, pd.errors.ParserError) as e:
+        if isinstance(e, IngestError):
+            raise
+        raise IngestError(f"{path.name}: {e}") from e
+    df = df.rename(columns={col: name for name, col in found.items()})
+    out = pd.DataFrame({"keyword": df["keyword"].astype("string").str.strip()})
+    for name in ("searches", "cpc_low", "cpc_high"):
+        values = df[name] if name in df else pd.Series(np.nan, index=df.index)
+        out[name] = pd.to_numeric(values.astype(str).str.replace(",", "", regex=False), errors="coerce")
+    out["searches"] = out["searches"].fillna(0)
+    out["currency"] = df["currency"].astype("string") if "currency" in df else pd.NA
+    return out[out["keyword"].notna() & (out["keyword"] != "")].reset_index(drop=True)
+
+
+@lru_cache(maxsize=2)
+def cached_clusters(keys: tuple) -> tuple[pd.DataFrame, tuple]:
+    """
+    Process-wide memo keyed on `gtm.ingest.file_key` tuples: clusters over every readable export
+    (duplicate keywords across files kept once), plus the read errors.
+    """
+    frames, errors = [], []
+    for key in keys:
+        try:
+            frames.append(read_keywords(key[0]))
+        except IngestError as e:
+            errors.append(str(e))
+    if not frames:
+        return pd.DataFrame(), tuple(errors)
+    keywords = pd.concat(frames, ignore_index=True)
+    keywords = keywords.drop_duplicates("keyword", ignore_index=True)
+    return cluster_summary(keywords, cluster_keywords(keywords["keyword"], keywords["searches"])), tuple(errors)
+
+
+# -----------------------------
+# Sample export (benchmark)
+# -----------------------------
+SAMPLE_HEADS = (
+    "gamification", "gamified learning", "serious games", "business simulation", "management simulation game",
+    "compliance training", "safety training", "leadership training", "onboarding training", "sales training",
+    "soft skills training", "cyber security awareness training", "employee engagement", "microlearning",
+    "scenario based learning", "vr training", "learning management system", "corporate training",
+)
+SAMPLE_MODIFIERS = (
+    "", "software", "platform", "examples", "for employees", "in the workplace", "companies", "online",
+    "courses", "ideas", "benefits", "tools", "app", "program", "solutions", "providers", "cost", "pricing",
+    "certification", "for managers", "for healthcare", "for manufacturing", "for banks", "games", "vendors",
+)
+SAMPLE_QUALIFIERS = (
+    "", "", "", "free", "2025", "near me", "usa", "texas", "california", "new york", "florida", "ohio", "illinois",
+    "chicago", "boston", "seattle", "atlanta", "dallas", "remote", "small business", "enterprise", "nurses",
+    "hospitals", "banks", "warehouse", "retail", "construction", "hr", "it", "sales teams", "new hires",
+    "supervisors", "pdf", "ppt", "template", "checklist", "quiz", "video", "ai", "vr",
+)
+
+
+def sample_keywords(n: int = 200_000, seed: int = 9) -> pd.DataFrame:
+    """
+    A synthetic Keyword Planner export: a head term, a modifier and up to two qualifiers per
+    keyword (`head` keeps the head term); searches heavy-tailed, bids log-normal.
+    """
+    rng = np.random.default_rng(seed)
+    parts = [np.array(SAMPLE_HEADS), np.array(SAMPLE_MODIFIERS), np.array(SAMPLE_QUALIFIERS), np.array(SAMPLE_QUALIFIERS)]
+    draws = 2 * n
+    picks = [rng.integers(0, len(p), draws) for p in parts]
+    keyword = pd.Series(parts[0][picks[0]])
+    for p, pick in zip(parts[1:], picks[1:]):
+        keyword = keyword.str.cat(pd.Series(p[pick]), sep=" ")
+    keyword = keyword.str.split().str.join(" ")
+    keep = np.flatnonzero(~keyword.duplicated().to_numpy())[:n]
+    low = rng.lognormal(0.2, 0.6, len(keep)).round(2)
+    return pd.DataFrame({
+        "keyword": keyword.iloc[keep].astype("string").to_numpy(),
+        "searches": (rng.pareto(1.3, len(keep)) * 20).round().astype(np.int64),
+        "cpc_low": low,
+        "cpc_high": (low * rng.uniform(2, 8, len(keep))).round(2),
+        "currency": "GBP",
+        "head": parts[0][picks[0][keep]],
+    })
@@ -0,0 +1,455 @@
+"""
+Negative-keyword matching over Google Ads search-term reports (Part 4 "update negative KWs").
+
+Negative lists in data/negatives/ (`.txt`: one keyword per line in Ads Editor
+notation -- `free`, `"what is"`, `[training games]`; `.csv`: Keyword and Match
+type columns) are matched against every distinct search term of the reports in
+data/search_terms/, with the Google Ads rules for negatives (no close variants):
+
+    broad     every word of the negative is in the term, in any order
+    phrase    the words are in the term in the same order, next to each other
+    exact     the term is exactly the negative's words
+
+Terms and negatives are split into words once and words become integer ids.
+Phrase and exact negatives share one word trie, walked from every word of every
+term at once -- one vectorized step per trie level, so the cost follows the
+longest negative, not how many there are. Broad negatives go through an
+inverted (word -> terms) index on their rarest word, and the candidates are
+checked for the other words. Nothing loops over negatives or terms in Python.
+
+    negatives = NegativeSet(parse_negatives(lines))
+    term, negative = negatives.match(search_terms)      # one pair per hit
+    scan = scan_search_terms(report_paths, negatives)
+    scan.blocked      # per negative x funnel stage: terms, clicks, spend, conversions
+
+Lists apply to every campaign of the report (shared negative lists); campaigns
+are put in funnel stages by the Part 4 channel rules in `gtm.exports`.
+"""
+
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from gtm.exports import CHANNELS, COLUMN_ALIASES, CHUNK_ROWS, _SKIP, _UNMAPPED, channel_for, detect_layout, read_export
+from gtm.facts import METRICS
+from gtm.ingest import DATA_DIR, IngestError
+from gtm.simulation import CHANNEL_FUNNEL
+
+SEARCH_TERMS_DIR = DATA_DIR / "search_terms"
+NEGATIVES_DIR = DATA_DIR / "negatives"
+REPORT_PATTERNS = ("*.csv", "*.csv.gz", "*.tsv")
+LIST_PATTERNS = ("*.txt", "*.csv")
+
+MATCH_TYPES = ("broad", "phrase", "exact")
+FUNNELS = ("TOFU", "MOFU", "BOFU", "Unmapped")     # Unmapped: campaigns no channel rule matches
+SEARCH_TERM_ALIASES = {**COLUMN_ALIASES, "search_term": ("Search term", "Search Term", "Search query", "Query")}
+# Negative list CSVs: canonical column -> header names (first match wins)
+LIST_COLUMNS = {
+    "keyword": ("Negative keyword", "Keyword", "Negative Keyword"),
+    "match": ("Match type", "Match Type", "Criterion Type"),
+}
+_WORD_BREAK = r"[^\w&]+"      # Google Ads ignores most punctuation in queries and keywords
+
+_FUNNEL_CODE = np.array([FUNNELS.index(CHANNEL_FUNNEL[ch]) for ch in CHANNELS], dtype=np.int8)
+
+
+class NegativeScan(NamedTuple):
+    blocked: pd.DataFrame     # per negative x funnel: list, negative, match, funnel, terms, impressions, clicks, spend, conversions
+    funnels: pd.DataFrame     # per funnel: spend / clicks / conversions, total and blocked by any negative
+    terms: pd.DataFrame       # blocked search terms per funnel, with the first negative blocking each
+    rows: int                 # report rows read
+    search_terms: int         # distinct search terms
+    negatives: int
+    seconds: float
+    errors: tuple = ()
+
+
+# -----------------------------
+# Words
+# -----------------------------
+def split_words(texts) -> tuple[pa.Array, np.ndarray]:
+    """
+    Lower-cased words of every text, flattened, and the offsets of each text's words
+    (text i -> words[offsets[i]:offsets[i + 1]]). Empty texts give one empty word.
+    """
+    arr = pa.array(pd.Series(texts, dtype="string").fillna(""))
+    arr = arr.combine_chunks() if isinstance(arr, pa.ChunkedArray) else arr
+    words = pc.utf8_split_whitespace(pc.utf8_trim_whitespace(
+        pc.replace_substring_regex(pc.utf8_lower(arr), _WORD_BREAK, " ")))
+    return words.flatten(), words.offsets.to_numpy().astype(np.int64)
+
+
+def _ids(words: pa.Array, vocab: pa.Array) -> np.ndarray:
+    """Position of each word in `vocab`; -1 for words no negative uses."""
+    return pc.fill_null(pc.index_in(words, value_set=vocab), -1).to_numpy().astype(np.int64)
+
+
+# -----------------------------
+# Negative lists
+# -----------------------------
+def parse_negatives(lines, name: str = "negatives", comments: bool = True) -> pd.DataFrame:
+    """
+    Negatives in Ads Editor notation, one per line: `word`, `"phrase"`, `[exact]` (a leading `-`
+    is dropped; with `comments`, a line starting with `#` is skipped -- `#` inside a keyword, as in
+    `c# training`, is part of it). Returns list, negative (as written), match and text, indexed
+    by the position of the line each negative came from.
+    """
+    rows, kept = [], []
+    for i, line in enumerate(lines):
+        keyword = str(line).strip()
+        if comments and keyword.startswith("#"):
+            continue
+        keyword = keyword.lstrip("-").strip()
+        if not keyword:
+            continue
+        if keyword.startswith("[") and keyword.endswith("]"):
+            match, text = "exact", keyword[1:-1]
+        elif keyword.startswith('"') and keyword.endswith('"') and len(keyword) > 1:
+            match, text = "phrase", keyword[1:-1]
+        else:
+            match, text = "broad", keyword
+        rows.append((name, keyword, match, text))
+        kept.append(i)
+    return pd.DataFrame(rows, columns=["list", "negative", "match", "text"], index=pd.Index(kept, dtype=np.int64))
+
+
+def read_negatives(path) -> pd.DataFrame:
+    """One negative list file (`.txt` in Ads Editor notation, or a `.csv` export); raises `IngestError`."""
+    path = Path(path)
+    try:
+        if path.suffix != ".csv":
+            return parse_negatives(path.read_text(encoding="utf-8-sig").splitlines(), path.stem).reset_index(drop=True)
+        df = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    except (OSError, UnicodeError, ValueError, pd.errors.ParserError) as e:
+        raise IngestError(f"{path.name}: {e}") from e
+    columns = {name: next((a for a in aliases if a in df), None) for name, aliases in LIST_COLUMNS.items()}
+    if not columns["keyword"]:
+        raise IngestError(f"{path.name}: no Keyword / Negative keyword column")
+    # a cell is a whole keyword: no comment lines in an export
+    out = parse_negatives(df[columns["keyword"]].fillna(""), path.stem, comments=False)
+    if columns["match"]:
+        # "Phrase match", "Negative Exact", ...: the column wins over the notation (rows parse_negatives kept)
+        stated = (df[columns["match"]].fillna("").str.lower()
+                  .str.extract(f"({'|'.join(MATCH_TYPES)})", expand=False)).to_numpy()[out.index]
+        out["match"] = np.where(pd.notna(stated), stated, out["match"])
+    return out.reset_index(drop=True)
+
+
+def list_files(negatives_dir=NEGATIVES_DIR) -> list[Path]:
+    negatives_dir = Path(negatives_dir)
+    return sorted({p for pattern in LIST_PATTERNS for p in negatives_dir.glob(pattern)})
+
+
+def report_files(reports_dir=SEARCH_TERMS_DIR) -> list[Path]:
+    reports_dir = Path(reports_dir)
+    return sorted({p for pattern in REPORT_PATTERNS for p in reports_dir.glob(pattern)})
+
+
+# -----------------------------
+# Matcher
+# -----------------------------
+class NegativeSet:
+    """Negative keywords compiled for bulk matching: a word trie (phrase, exact) and broad word sets."""
+
+    def __init__(self, negatives: pd.DataFrame):
+        """`negatives`: list, negative, match, text per row (see `parse_negatives`)."""
+        self.negatives = negatives.reset_index(drop=True)
+        words, offsets = split_words(self.negatives["text"])
+        self.vocab = pc.unique(pc.filter(words, pc.not_equal(words, "")))
+        self.V = max(len(self.vocab), 1)
+        ids = _ids(words, self.vocab)
+
+        # identical negatives (also across lists) share one pattern; a one-word broad negative is a phrase
+        patterns: dict[tuple, int] = {}
+        self.pattern = np.full(len(self.negatives), -1, dtype=np.int64)
+        for i, match in enumerate(self.negatives["match"]):
+            seq = tuple(w for w in ids[offsets[i]:offsets[i + 1]] if w >= 0)
+            if not seq:
+                continue                      # nothing left after punctuation: matches no term
+            if match == "broad":
+                seq = tuple(sorted(set(seq)))
+                match = "phrase" if len(seq) == 1 else "broad"
+            self.pattern[i] = patterns.setdefault((match, seq), len(patterns))
+        self.patterns = len(patterns)
+
+        # word trie: edge key = parent state * V + word; phrase / exact pattern ending at each state
+        edges: dict[int, int] = {}
+        phrase_at, exact_at = [-1], [-1]
+        broad = []
+        for (match, seq), p in patterns.items():
+            if match == "broad":
+                broad.append((p, seq))
+                continue
+            state = 0
+            for w in seq:
+                key = state * self.V + w
+                if key not in edges:
+                    edges[key] = len(phrase_at)
+                    phrase_at.append(-1)
+                    exact_at.append(-1)
+                state = edges[key]
+            (phrase_at if match == "phrase" else exact_at)[state] = p
+        keys = np.fromiter(edges, dtype=np.int64, count=len(edges))
+        order = np.argsort(keys)
+        self._edge_key = keys[order]
+        self._edge_child = np.fromiter(edges.values(), dtype=np.int64, count=len(edges))[order]
+        self._phrase_at, self._exact_at = np.array(phrase_at), np.array(exact_at)
+        self.depth = max((len(seq) for (match, seq) in patterns if match != "broad"), default=0)
+
+        # broad: (pattern, words) padded with -1
+        width = max((len(seq) for _, seq in broad), default=0)
+        self._broad_pattern = np.array([p for p, _ in broad], dtype=np.int64)
+        self._broad_words = np.full((len(broad), width), -1, dtype=np.int64)
+        for i, (_, seq) in enumerate(broad):
+            self._broad_words[i, :len(seq)] = seq
+
+    def __len__(self) -> int:
+        return len(self.negatives)
+
+    def match_patterns(self, terms) -> tuple[np.ndarray, np.ndarray]:
+        """(term position, pattern) for every pattern that blocks a term; a pair appears once."""
+        words, offsets = split_words(terms)
+        ids = _ids(words, self.vocab)
+        length = np.diff(offsets)
+        row = np.repeat(np.arange(len(length)), length)
+        (t1, p1), (t2, p2) = self._walk(ids, row, offsets), self._broad(ids, row)
+        return np.concatenate([t1, t2]), np.concatenate([p1, p2])
+
+    def _walk(self, ids, row, offsets) -> tuple[np.ndarray, np.ndarray]:
+        """Trie walk from every word position at once; level d extends every live walk by one word."""
+        out_t, out_p = [], []
+        start = np.flatnonzero(ids >= 0)
+        state = np.zeros(len(start), dtype=np.int64)
+        end = offsets[1:][row[start]]
+        for depth in range(self.depth):
+            at = start + depth
+            live = at < end
+            live[live] = ids[at[live]] >= 0
+            start, state, end, at = start[live], state[live], end[live], at[live]
+            key = state * self.V + ids[at]
+            j = np.minimum(np.searchsorted(self._edge_key, key), max(len(self._edge_key) - 1, 0))
+            found = self._edge_key[j] == key if len(self._edge_key) else np.zeros(len(key), dtype=bool)
+            start, end, at, state = start[found], end[found], at[found], self._edge_child[j[found]]
+            phrase = self._phrase_at[state]
+            hit = phrase >= 0
+            out_t.append(row[start[hit]])
+            out_p.append(phrase[hit])
+            exact = self._exact_at[state]
+            hit = (exact >= 0) & (start == offsets[row[start]]) & (at + 1 == end)
+            out_t.append(row[start[hit]])
+            out_p.append(exact[hit])
+            if not len(start):
+                break
+        if not out_t:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        # a phrase can occur twice in one term
+        pairs = np.unique(np.concatenate(out_t) * self.patterns + np.concatenate(out_p))
+        return pairs // self.patterns, pairs % self.patterns
+
+    def _broad(self, ids, row) -> tuple[np.ndarray, np.ndarray]:
+        """Candidates from each broad pattern's rarest word, kept when the term has all its words."""
+        known = ids >= 0
+        if not len(self._broad_pattern) or not known.any():
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        pairs = np.unique(row[known] * self.V + ids[known])        # distinct (term, word), sorted
+        word = pairs % self.V
+        by_word = np.argsort(word, kind="stable")
+        terms_by_word = pairs[by_word] // self.V
+        df = np.bincount(word, minlength=self.V)
+        first = np.r_[0, np.cumsum(df)]
+
+        B = self._broad_words
+        anchor = B[np.arange(len(B)), np.where(B >= 0, df[np.maximum(B, 0)], np.iinfo(np.int64).max).argmin(axis=1)]
+        counts = df[anchor]
+        cand = np.repeat(np.arange(len(B)), counts)
+        at = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first[anchor], counts)
+        term = terms_by_word[at]
+        # the other words: hash lookups of (term, word) (random-order searchsorted is cache-bound)
+        has = pd.Index(pairs)
+        ok = np.ones(len(term), dtype=bool)
+        for col in range(B.shape[1]):
+            need = B[cand, col]
+            check = ok & (need >= 0) & (need != anchor[cand])
+            ok[check] = has.get_indexer(term[check] * self.V + need[check]) >= 0
+        return term[ok], self._broad_pattern[cand[ok]]
+
+    def match(self, terms) -> tuple[np.ndarray, np.ndarray]:
+        """(term position, negative row) for every negative that blocks a term."""
+        t, p = self.match_patterns(terms)
+        negs = np.flatnonzero(self.pattern >= 0)
+        negs = negs[np.argsort(self.pattern[negs], kind="stable")]
+        per = np.bincount(self.pattern[negs], minlength=self.patterns)
+        first = np.r_[0, np.cumsum(per)]
+        reps = per[p]
+        at = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps) + np.repeat(first[p], reps)
+        return np.repeat(t, reps), negs[at]
+
+
+# -----------------------------
+# Search-term reports
+# -----------------------------
+def _term_facts(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Search term x funnel sums of one chunk; each distinct campaign is mapped once, summary rows dropped."""
+    campaign = chunk["campaign"].astype("category")
+    lookup = np.array([channel_for("google", str(c)) for c in campaign.cat.categories] + [_SKIP], dtype=np.int64)
+    idx = lookup[campaign.cat.codes.to_numpy()]      # code -1 (no campaign: "Total: ..." lines) -> _SKIP
+    funnel = np.where(idx == _UNMAPPED, FUNNELS.index("Unmapped"), _FUNNEL_CODE[np.maximum(idx, 0)])
+    term = chunk["search_term"].astype("category")
+    codes = term.cat.codes.to_numpy()
+    keep = (idx != _SKIP) & (codes >= 0)
+    part = pd.DataFrame(np.nan_to_num(chunk[list(METRICS)].to_numpy(dtype=float))[keep], columns=list(METRICS))
+    part.insert(0, "search_term", codes[keep])
+    part.insert(1, "funnel", funnel[keep].astype(np.int8))
+    part = part.groupby(["search_term", "funnel"], sort=False).sum().reset_index()
+    part["search_term"] = term.cat.categories.take(part["search_term"].to_numpy())
+    return part
+
+
+def _combine(parts: list) -> pd.DataFrame:
+    if not parts:
+        return pd.DataFrame({"search_term": pd.Series(dtype=str), "funnel": pd.Series(dtype=np.int8),
+                             **{m: pd.Series(dtype=float) for m in METRICS}})
+    return pd.concat(parts, ignore_index=True).groupby(["search_term", "funnel"], sort=False).sum().reset_index()
+
+
+def search_term_facts(paths, chunk_rows: int = CHUNK_ROWS) -> tuple[pd.DataFrame, int, list]:
+    """Stream search-term reports into search term x funnel sums: (facts, rows read, errors)."""
+    parts, rows, errors = [], 0, []
+    for path in paths:
+        path = Path(path)
+        mine = []
+        try:
+            layout = detect_layout(path, SEARCH_TERM_ALIASES)
+            if "search_term" not in layout.columns:
+                raise IngestError(f"{path.name}: no Search term column (a campaign report, not a search-term report?)")
+            for chunk in read_export(path, layout, chunk_rows):
+                mine.append(_term_facts(chunk))
+                rows += len(chunk)
+        except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+            errors.append(str(e) if isinstance(e, IngestError) else f"{path.name}: {e}")
+            continue
+        parts.append(_combine(mine))
+    return _combine(parts), rows, errors
+
+
+def _scan(facts: pd.DataFrame, negatives: NegativeSet, rows: int, errors, t0: float) -> NegativeScan:
+    codes, terms = pd.factorize(facts["search_term"])
+    hit_term, hit_neg = negatives.match(pd.Series(terms))
+    hits = pd.DataFrame({"term": hit_term, "neg": hit_neg}).merge(
+        facts.assign(term=codes)[["term", "funnel", *METRICS]], on="term")
+
+    blocked = hits.groupby(["neg", "funnel"], sort=False).agg(terms=("term", "size"), **{m: (m, "sum") for m in METRICS})
+    blocked = blocked.reset_index()
+    blocked = negatives.negatives[["list", "negative", "match"]].iloc[blocked["neg"]].reset_index(drop=True).join(
+        blocked.drop(columns="neg"))
+    blocked["funnel"] = pd.Categorical.from_codes(blocked["funnel"], FUNNELS)
+    blocked["spend"] = blocked["spend"].round(2)
+    blocked = blocked.sort_values(["spend", "clicks"], ascending=False, ignore_index=True)
+
+    # a term blocked by several negatives counts once here, under the first negative listed
+    first = pd.Series(hit_neg).groupby(hit_term).min()
+    is_blocked = np.zeros(len(terms), dtype=bool)
+    is_blocked[first.index.to_numpy()] = True
+    rows_blocked = is_blocked[codes]
+    total = facts.groupby("funnel")[list(METRICS)].sum()
+    lost = facts[rows_blocked].groupby("funnel")[list(METRICS)].sum().reindex(total.index, fill_value=0)
+    funnels = pd.DataFrame({
+        "funnel": pd.Categorical.from_codes(total.index.to_numpy(dtype=np.int8), FUNNELS),
+        "spend": total["spend"].to_numpy(), "clicks": total["clicks"].to_numpy(),
+        "conversions": total["conversions"].to_numpy(),
+        "blocked_spend": lost["spend"].to_numpy(), "blocked_clicks": lost["clicks"].to_numpy(),
+        "blocked_conversions": lost["conversions"].to_numpy(),
+    }).sort_values("funnel", ignore_index=True)
+    funnels[["spend", "blocked_spend"]] = funnels[["spend", "blocked_spend"]].round(2)
+    funnels["blocked_share"] = funnels["blocked_spend"] / funnels["spend"].where(funnels["spend"] > 0)
+
+    blocked_terms = facts[rows_blocked].assign(
+        funnel=lambda d: pd.Categorical.from_codes(d["funnel"], FUNNELS),
+        blocked_by=negatives.negatives["negative"].to_numpy()[first.reindex(codes[rows_blocked]).to_numpy()],
+        spend=lambda d: d["spend"].round(2),
+    ).sort_values("spend", ascending=False, ignore_index=True)
+    return NegativeScan(blocked, funnels, blocked_terms, rows, len(terms), len(negatives),
+                        time.perf_counter() - t0, tuple(errors))
+
+
+def scan_search_terms(paths, negatives: NegativeSet, chunk_rows: int = CHUNK_ROWS) -> NegativeScan:
+    """Spend, clicks and conversions each negative would have blocked in the reports, per funnel stage."""
+    t0 = time.perf_counter()
+    facts, rows, errors = search_term_facts(paths, chunk_rows)
+    return _scan(facts, negatives, rows, errors, t0)
+
+
+@lru_cache(maxsize=2)
+def cached_negatives(report_keys: tuple, list_keys: tuple = ()) -> NegativeScan:
+    """
+    Process-wide memo keyed on `gtm.ingest.file_key` tuples. No negative lists -> SAMPLE_NEGATIVES;
+    no search-term reports -> a sample report.
+    """
+    t0 = time.perf_counter()
+    frames, errors = [], []
+    for key in list_keys:
+        try:
+            frames.append(read_negatives(key[0]))
+        except IngestError as e:
+            errors.append(str(e))
+    negatives = NegativeSet(pd.concat(frames, ignore_index=True) if frames else parse_negatives(SAMPLE_NEGATIVES, "sample"))
+    if report_keys:
+        facts, rows, report_errors = search_term_facts([k[0] for k in report_keys])
+        errors += report_errors
+    else:
+        report = sample_search_terms()
+        facts, rows = _combine([_term_facts(report)]), len(report)
+    return _scan(facts, negatives, rows, errors, t0)
+
+
+# -----------------------------
+# Sample report
+# -----------------------------
+SAMPLE_NEGATIVES = (
+    "jobs", "careers", "salary", '"for kids"', '"what is"', "definition", "meaning", "pdf", "download",
+    "reddit", "degree", "[free]", "free download", '"free games"', "[gamification]", "[serious games]",
+)
+# campaign -> share of report rows (named so the Part 4 channel rules map them; PMax stays unmapped)
+SAMPLE_CAMPAIGNS = {
+    "US | Search | Generic | Serious games": 0.40, "US | Search | DSA": 0.12, "US | Search | RLSA": 0.15,
+    "US | Search | Brand Exact": 0.10, "US | Search | Competitors": 0.13, "US | PMax | Prospecting": 0.10,
+}
+SAMPLE_JUNK = ("jobs", "salary", "free", "for kids", "what is", "definition", "pdf", "download", "reddit",
+               "degree", "careers", "meaning", "free download")
+
+
+def sample_search_terms(n_rows: int = 300_000, n_terms: int = 30_000, seed: int = 3) -> pd.DataFrame:
+    """
+    A synthetic search-term report (search_term, campaign, spend, impressions, clicks, conversions):
+    terms from the keyword sample, ~15% of the long tail with a junk word in front or behind;
+    popular terms repeat across rows and campaigns; junk converts ten times less.
+    """
+    from gtm.keywords import sample_keywords
+    rng = np.random.default_rng(seed)
+    base = sample_keywords(n_terms, seed=seed)["keyword"].to_numpy(dtype=object)
+    n_terms = len(base)
+    junk = (rng.random(n_terms) < 0.15) & (np.arange(n_terms) >= 100)     # the head terms are clean
+    word = np.array(SAMPLE_JUNK, dtype=object)[rng.integers(0, len(SAMPLE_JUNK), n_terms)]
+    front = rng.random(n_terms) < 0.5
+    terms = np.where(junk & front, word + " " + base, np.where(junk, base + " " + word, base))
+
+    popularity = 1 / (np.arange(n_terms) + 20.0)
+    term = rng.choice(n_terms, n_rows, p=popularity / popularity.sum())
+    share = np.array(list(SAMPLE_CAMPAIGNS.values()))
+    campaign = np.array(list(SAMPLE_CAMPAIGNS), dtype=object)[rng.choice(len(share), n_rows, p=share / share.sum())]
+    impressions = np.ceil(rng.lognormal(2.0, 1.2, n_rows)).astype(np.int64)
+    clicks = rng.binomial(impressions, 0.06)
+    return pd.DataFrame({
+        "search_term": pd.array(terms[term], dtype="string"),
+        "campaign": campaign,
+        "spend": np.round(clicks * rng.lognormal(np.log(3.5), 0.4, n_rows), 2),
+        "impressions": impressions,
+        "clicks": clicks,
+        "conversions": rng.binomial(clicks, np.where(junk[term], 0.003, 0.03)),
+    })
@@ -0,0 +1,185 @@
+"""Budget allocation across channels with diminishing-returns response curves.
+
+Each channel converts as  f(x) = a · (1 − exp(−x / s)):  `a / s` is the
+conversion rate per euro at low spend (benchmarks) and `s` the spend at which
+the audience starts to saturate. With concave curves the optimum equalises
+marginal returns, so the solve is a 1-D search on the shadow price λ:
+
+    x_i(λ) = clip(s_i · ln(k_i / λ), min_i, max_i),   Σ x_i(λ) = budget
+"""
+
+import numpy as np
+import pandas as pd
+
+from gtm.simulation import (
+    BENCHMARKS, CPC_INFLATE_FOR_UNDERPERF, GLOBAL_CVR, UNDERPERFORM_CLICK_CHANNELS,
+)
+
+# Spend (€/month) at which a channel reaches ~63% of its conversion ceiling.
+# Search pools are small (few high-intent queries); LI/YT awareness audiences are large.
+SATURATION_EUR = {
+    "LinkedIn – Awareness": 25000,
+    "YouTube – Awareness": 20000,
+    "Google Search – Generic (MOFU)": 9000,
+    "Google Search – RLSA (MOFU)": 2500,
+    "LinkedIn – Retargeting (MOFU)": 5000,
+    "Google Search – Exact/Brand/Comp (BOFU)": 3000,
+}
+
+# SQL yield per conversion when optimising for SQLs (high-intent leads qualify more often)
+SQL_RATE_BY_FUNNEL = {"TOFU": 0.20, "MOFU": 0.30, "BOFU": 0.45}
+
+_MAX_ITER = 200
+_TOL_EUR = 0.01
+
+
+class BudgetOptimizer:
+    """
+    Maximise Σ w_i · f_i(x_i) subject to Σ x_i = budget and min_i ≤ x_i ≤ max_i.
+
+    `slope` (conversions per € at zero spend), `saturation` (€) and `weight`
+    (value per conversion, 1 for conversions or an SQL rate) are per-channel
+    arrays. The last shadow price is kept, so changing one bound or the total
+    re-solves from a warm bracket instead of from scratch.
+    """
+
+    def __init__(self, channels, slope, saturation, lower, upper, budget: float, weight=None):
+        self.channels = list(channels)
+        n = len(self.channels)
+        self.slope = np.asarray(slope, dtype=float)
+        self.saturation = np.asarray(saturation, dtype=float)
+        self.weight = np.ones(n) if weight is None else np.asarray(weight, dtype=float)
+        self.lower = np.asarray(lower, dtype=float).copy()
+        self.upper = np.asarray(upper, dtype=float).copy()
+        self.budget = float(budget)
+        self._lam = None
+        self.iterations = 0       # iterations used by the last solve
+        self.allocation = None
+
+    # ---- response curve
+    def conversions(self, x) -> np.ndarray:
+        """Expected conversions per channel at spend `x`."""
+        x = np.asarray(x, dtype=float)
+        return self.slope * self.saturation * (1.0 - np.exp(-x / self.saturation))
+
+    def marginal(self, x) -> np.ndarray:
+        """Weighted conversions per extra € at spend `x`."""
+        return self.weight * self.slope * np.exp(-np.asarray(x, dtype=float) / self.saturation)
+
+    # ---- constraints
+    def _index(self, channel) -> int:
+        return channel if isinstance(channel, int) else self.channels.index(channel)
+
+    def set_bounds(self, channel, lower: float | None = None, upper: float | None = None) -> np.ndarray:
+        """Change one channel's min/max spend and re-solve warm."""
+        i = self._index(channel)
+        if lower is not None: self.lower[i] = lower
+        if upper is not None: self.upper[i] = upper
+        return self.solve()
+
+    def set_budget(self, budget: float) -> np.ndarray:
+        """Change the total budget and re-solve warm."""
+        self.budget = float(budget)
+        return self.solve()
+
+    # ---- solve
+    def _spend_at(self, lam: float) -> np.ndarray:
+        k = self.weight * self.slope
+        with np.errstate(divide="ignore"):
+            x = self.saturation * np.log(k / lam)
+        return np.clip(x, self.lower, self.upper)
+
+    def solve(self) -> np.ndarray:
+        """Optimal spend per channel (also stored on `self.allocation`)."""
+        if np.any(self.lower > self.upper):
+            bad = [c for c, lo, hi in zip(self.channels, self.lower, self.upper) if lo > hi]
+            raise ValueError(f"min spend above max spend for: {', '.join(bad)}")
+        if not self.lower.sum() - _TOL_EUR <= self.budget <= self.upper.sum() + _TOL_EUR:
+            raise ValueError(
+                f"budget €{self.budget:,.0f} outside the feasible range "
+                f"€{self.lower.sum():,.0f}–€{self.upper.sum():,.0f} set by the channel limits"
+            )
+
+        # Σ x_i is piecewise-linear and decreasing in log λ, so Newton steps on t = log λ
+        # land exactly once the active set is right; bisection keeps them inside the bracket.
+        # A warm start from the previous λ usually needs one or two steps.
+        lo = np.log(max(self.marginal(self.upper).min(), 1e-300)) - 1.0
+        hi = np.log(max(self.marginal(self.lower).max(), 1e-300)) + 1.0
+        t = np.log(self._lam) if self._lam is not None and lo < np.log(self._lam) < hi else 0.5 * (lo + hi)
+
+        it = 0
+        for it in range(1, _MAX_ITER + 1):
+            x = self._spend_at(np.exp(t))
+            excess = x.sum() - self.budget
+            if abs(excess) <= _TOL_EUR:
+                break
+            if excess > 0:
+                lo = t
+            else:
+                hi = t
+            free = (x > self.lower) & (x < self.upper)
+            rate = self.saturation[free].sum()
+            t_next = t + excess / rate if rate > 0 else hi
+            t = t_next if lo < t_next < hi else 0.5 * (lo + hi)
+        self._lam = np.exp(t)
+        self.iterations = it
+
+        x = self._spend_at(self._lam)
+        # Close the last cents of bisection slack on a channel that still has room
+        gap = self.budget - x.sum()
+        free = np.flatnonzero((x - self.lower > 1e-9) & (self.upper - x > 1e-9))
+        if free.size:
+            j = free[0]
+            x[j] = np.clip(x[j] + gap, self.lower[j], self.upper[j])
+        self.allocation = x
+        return x
+
+    def summary(self, current=None) -> pd.DataFrame:
+        """Per-channel table of limits, allocation and expected conversions (vs. `current` spend)."""
+        x = self.solve() if self.allocation is None else self.allocation
+        out = pd.DataFrame({
+            "Channel": self.channels,
+            "Min (€)": self.lower,
+            "Max (€)": self.upper,
+            "Optimal (€)": x,
+            "Conversions": self.conversions(x),
+            "Marginal conv / €1k": self.marginal(x) / self.weight * 1000,
+        })
+        if current is not None:
+            current = np.asarray(current, dtype=float)
+            out.insert(3, "Current (€)", current)
+            out.insert(5, "Conversions (current)", self.conversions(current))
+        return out
+
+
+def optimizer_from_benchmarks(budgets: dict, lower: dict, upper: dict, objective: str = "conversions",
+                              funnel: dict | None = None, benchmarks: dict = BENCHMARKS,
+                              saturation: dict = SATURATION_EUR, cvr: float = GLOBAL_CVR) -> BudgetOptimizer:
+    """
+    Build a `BudgetOptimizer` for the Part 4 channels.
+
+    Low-spend slope = CVR / effective CPC (with the LI/YT CPC inflation), so the
+    curves agree with the deterministic simulation at small budgets.
+    `objective="sqls"` weights channels by `SQL_RATE_BY_FUNNEL` via `funnel`.
+    """
+    channels = list(budgets)
+    eff_cpc = np.array([
+        benchmarks[ch]["cpc"] * (CPC_INFLATE_FOR_UNDERPERF if ch in UNDERPERFORM_CLICK_CHANNELS else 1.0)
+        for ch in channels
+    ])
+    weight = None
+    if objective == "sqls":
+        if funnel is None:
+            raise ValueError("objective='sqls' needs a channel -> funnel mapping")
+        weight = [SQL_RATE_BY_FUNNEL[funnel[ch]] for ch in channels]
+    elif objective != "conversions":
+        raise ValueError(f"unknown objective {objective!r} (use 'conversions' or 'sqls')")
+    return BudgetOptimizer(
+        channels,
+        slope=cvr / eff_cpc,
+        saturation=[saturation[ch] for ch in channels],
+        lower=[lower[ch] for ch in channels],
+        upper=[upper[ch] for ch in channels],
+        budget=sum(budgets.values()),
+        weight=weight,
+    )
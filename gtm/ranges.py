@@ -0,0 +1,93 @@
+"""Parse benchmark range strings ('€6–9', '0.6–1.0%') into typed numeric columns."""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+MISSING_TOKENS = ("—", "-", "")
+RANGE_CACHE_SIZE = 4096      # distinct strings kept parsed
+UNITS = ["eur", "pct", "num"]
+
+_SPLIT = re.compile(r"[–-]")  # en-dash or hyphen
+
+
+class ParsedRange(NamedTuple):
+    low: float
+    mid: float
+    high: float
+    unit: str | None   # "eur" | "pct" | "num" | None when missing/unparseable
+
+
+_EMPTY = ParsedRange(np.nan, np.nan, np.nan, None)
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def _parse_text(s: str) -> ParsedRange:
+    s = s.strip()
+    if s in MISSING_TOKENS: return _EMPTY
+    unit = "eur" if "€" in s else "num"
+    s = s.replace("€", "").replace(",", "").replace(" ", "")
+    if s.endswith("%"):
+        unit = "pct"
+    s = s.replace("%", "")
+    parts = _SPLIT.split(s)
+    try:
+        if len(parts) == 1:
+            low = high = float(parts[0])
+        else:
+            low, high = float(parts[0]), float(parts[1])
+    except ValueError:
+        return _EMPTY
+    if unit == "pct":
+        low, high = low / 100.0, high / 100.0
+    return ParsedRange(low, (low + high) / 2.0, high, unit)
+
+
+def parse_range(txt) -> ParsedRange:
+    """Low/mid/high of a range like '€45–65' or '0.8–1.2%' (% => decimal). Missing -> NaNs, unit None."""
+    if txt is None or (isinstance(txt, float) and np.isnan(txt)):
+        return _EMPTY
+    return _parse_text(str(txt))
+
+
+def mid_range_num(txt: str) -> float | None:
+    """Return midpoint of a range like '€45–65' or '0.8–1.2%' (as numeric, % => decimal). '—' -> None."""
+    mid = parse_range(txt).mid
+    return None if np.isnan(mid) else mid
+
+
+def parse_range_column(values) -> pd.DataFrame:
+    """Parse a column of range strings into `low`/`mid`/`high` floats plus a categorical `unit`.
+
+    Distinct strings are parsed once (and stay in the LRU cache across calls);
+    the result is expanded back to full length with a single take().
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    parsed = [parse_range(u) for u in uniques] + [_EMPTY]   # code -1 -> missing
+    table = np.array([p[:3] for p in parsed], dtype=float)
+    units = np.array([p.unit for p in parsed], dtype=object)
+    return pd.DataFrame({
+        "low": table[codes, 0],
+        "mid": table[codes, 1],
+        "high": table[codes, 2],
+        "unit": pd.Categorical(units[codes], categories=UNITS),
+    })
+
+
+def parse_range_columns(df: pd.DataFrame, cols=("CPC", "CPM", "CTR")) -> pd.DataFrame:
+    """Return `df` with `<col>_low`, `<col>_mid`, `<col>_high` and `<col>_unit` added for each range column."""
+    out = df.copy()
+    for col in cols:
+        parsed = parse_range_column(out[col].to_numpy())
+        for part in ("low", "mid", "high"):
+            out[f"{col}_{part}"] = parsed[part].to_numpy()
+        out[f"{col}_unit"] = parsed["unit"].values
+    return out
+
+
+def parsed_columns(cols=("CPC", "CPM", "CTR")) -> list[str]:
+    """Names of the numeric helper columns added by `parse_range_columns`."""
+    return [f"{c}_{p}" for c in cols for p in ("low", "mid", "high", "unit")]
@@ -0,0 +1,178 @@
+"""Budget scenario sweeps: many spend levels × channel mixes in one vectorized batch."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from gtm.estimation import estimate_impr_clicks
+from gtm.ranges import parse_range_columns
+from gtm.simulation import simulate_matrix
+
+SWEEP_MIN_EUR = 5_000
+SWEEP_MAX_EUR = 500_000
+SWEEP_STEP_EUR = 1_000
+SWEEP_CACHE_SIZE = 64
+
+
+def budget_levels(start: float = SWEEP_MIN_EUR, stop: float = SWEEP_MAX_EUR, step: float = SWEEP_STEP_EUR) -> np.ndarray:
+    """Monthly budget levels from `start` to `stop` (inclusive)."""
+    return np.arange(start, stop + step / 2, step, dtype=float)
+
+
+def with_pct(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    total = out["Budget"].sum()
+    out["%Budget"] = (out["Budget"] / total * 100).round(1)
+    return out
+
+
+def scale_plan(df: pd.DataFrame, total_budget: float, base_total: float | None = None) -> pd.DataFrame:
+    """Scale a plan's `Budget` column to `total_budget`, keeping its mix (whole euros)."""
+    base_total = df["Budget"].sum() if base_total is None else base_total
+    out = df.copy()
+    out["Budget"] = (out["Budget"] * total_budget / base_total).round().astype(int)
+    return out
+
+
+def mix_shares(mix) -> np.ndarray:
+    """Normalise a budget split (dict values or array) into shares summing to 1."""
+    w = np.asarray(list(mix.values()) if isinstance(mix, dict) else mix, dtype=float)
+    return w / w.sum()
+
+
+def tofu_shift(budgets: dict, funnel: dict, pull: float = 0.20, to_mofu: float = 0.70,
+               mofu_split: dict | None = None, bofu_channel: str | None = None) -> dict:
+    """
+    The original fixed reallocation: pull `pull` of every TOFU budget, send
+    `to_mofu` of it to MOFU (split by `mofu_split`) and the rest to `bofu_channel`.
+    """
+    out = dict(budgets)
+    moved = sum(budgets[ch] * pull for ch in budgets if funnel[ch] == "TOFU")
+    for ch in budgets:
+        if funnel[ch] == "TOFU":
+            out[ch] -= budgets[ch] * pull
+    for ch, share in (mofu_split or {}).items():
+        out[ch] += moved * to_mofu * share
+    if bofu_channel is not None:
+        out[bofu_channel] += moved * (1 - to_mofu)
+    return out
+
+
+# -----------------------------
+# Result cache (keyed by a hash of the inputs)
+# -----------------------------
+_cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+cache_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()        # the cache and stats are shared by every session (thread)
+
+
+def _input_hash(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        if isinstance(p, pd.DataFrame):
+            h.update(pd.util.hash_pandas_object(p, index=False).to_numpy().tobytes())
+            h.update(repr(list(p.columns)).encode())
+        elif isinstance(p, np.ndarray):
+            h.update(np.ascontiguousarray(p).tobytes())
+            h.update(str(p.shape).encode())
+        else:
+            h.update(repr(p).encode())
+    return h.hexdigest()
+
+
+def _cached(key: str, compute) -> pd.DataFrame:
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return _cache[key]
+        cache_stats["misses"] += 1
+    # outside the lock: a long sweep must not stall other sessions' hits
+    result = compute()
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > SWEEP_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+# -----------------------------
+# Sweeps
+# -----------------------------
+def sweep_plan(plan: pd.DataFrame, levels, mixes: dict | None = None, group_col: str | None = None) -> pd.DataFrame:
+    """
+    Estimated impressions & clicks of a Part 2 plan at every budget level × mix.
+
+    `mixes` maps a name to per-row weights (defaults to the plan's own split).
+    All levels × mixes × rows go through `estimate_impr_clicks` as one flat
+    batch. Returns one row per (Mix, Budget[, group_col]).
+    """
+    levels = np.asarray(levels, dtype=float)
+    mixes = mixes or {"Plan": plan["Budget"].to_numpy()}
+    key = _input_hash("plan", plan, levels, {k: mix_shares(v).tolist() for k, v in mixes.items()}, group_col)
+
+    def compute() -> pd.DataFrame:
+        parsed = plan if "CPM_mid" in plan.columns else parse_range_columns(plan)
+        shares = np.stack([mix_shares(m) for m in mixes.values()])            # (M, R)
+        budget = levels[None, :, None] * shares[:, None, :]                    # (M, L, R)
+        reps = budget.shape[0] * budget.shape[1]
+        impr, clicks = estimate_impr_clicks(
+            budget.ravel(),
+            np.tile(parsed["CPM_mid"].to_numpy(), reps),
+            np.tile(parsed["CPC_mid"].to_numpy(), reps),
+            np.tile(parsed["CTR_mid"].to_numpy(), reps),
+        )
+        impr, clicks = impr.reshape(budget.shape), clicks.reshape(budget.shape)
+        names = np.array(list(mixes))
+        if group_col is None:
+            return pd.DataFrame({
+                "Mix": np.repeat(names, len(levels)),
+                "Budget": np.tile(levels, len(names)),
+                "Impressions": impr.sum(axis=2).ravel(),
+                "Clicks": clicks.sum(axis=2).ravel(),
+            })
+        codes, groups = pd.factorize(plan[group_col])
+        onehot = np.eye(len(groups))[codes]                                    # (R, G)
+        return pd.DataFrame({
+            "Mix": np.repeat(names, len(levels) * len(groups)),
+            "Budget": np.tile(np.repeat(levels, len(groups)), len(names)),
+            group_col: np.tile(groups, len(names) * len(levels)),
+            "Impressions": (impr @ onehot).ravel(),                            # (M, L, G)
+            "Clicks": (clicks @ onehot).ravel(),
+        })
+
+    return _cached(key, compute)
+
+
+def sweep_simulation(levels, mixes: dict, channels: list[str]) -> pd.DataFrame:
+    """
+    Part 4 simulation at every budget level × channel mix.
+
+    `mixes` maps a name to a `{channel: weight}` split. Every scenario runs
+    through `simulate_matrix` in one call; totals per scenario are returned.
+    """
+    levels = np.asarray(levels, dtype=float)
+    key = _input_hash("sim", levels, {k: mix_shares([m[ch] for ch in channels]).tolist() for k, m in mixes.items()},
+                      channels)
+
+    def compute() -> pd.DataFrame:
+        shares = np.stack([mix_shares([m[ch] for ch in channels]) for m in mixes.values()])  # (M, C)
+        spend = (levels[None, :, None] * shares[:, None, :]).reshape(-1, len(channels))     # (M·L, C)
+        sim = simulate_matrix(spend, channels)
+        conversions = sim["conversions"].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cpa = np.where(conversions > 0, spend.sum(axis=1) / conversions, np.nan)
+        return pd.DataFrame({
+            "Mix": np.repeat(list(mixes), len(levels)),
+            "Budget": np.tile(levels, len(mixes)),
+            "Impressions": sim["impressions"].sum(axis=1),
+            "Clicks": sim["clicks"].sum(axis=1),
+            "Conversions": conversions,
+            "SQLs": sim["sqls"].sum(axis=1),
+            "CPA (€)": cpa,
+        })
+
+    return _cached(key, compute)
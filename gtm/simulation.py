@@ -0,0 +1,254 @@
+"""Part 4 performance simulation: benchmarks, underperformance rules and Monte Carlo draws."""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from gtm.ranges import parse_range
+
+# -----------------------------
+# Plan & benchmarks
+# -----------------------------
+# Proposed monthly budgets per channel (aligned with Part 2 corrections)
+BASE_BUDGETS = {
+    "LinkedIn – Awareness": 6000,
+    "YouTube – Awareness": 2000,
+    "Google Search – Generic (MOFU)": 3000,
+    "Google Search – RLSA (MOFU)": 1000,
+    "LinkedIn – Retargeting (MOFU)": 2000,
+    "Google Search – Exact/Brand/Comp (BOFU)": 1000,
+}
+
+CHANNEL_FUNNEL = {
+    "LinkedIn – Awareness": "TOFU",
+    "YouTube – Awareness": "TOFU",
+    "Google Search – Generic (MOFU)": "MOFU",
+    "Google Search – RLSA (MOFU)": "MOFU",
+    "LinkedIn – Retargeting (MOFU)": "MOFU",
+    "Google Search – Exact/Brand/Comp (BOFU)": "BOFU",
+}
+
+# Base CPC/CPM midpoints (euros)
+BENCHMARKS = {
+    "LinkedIn – Awareness": {"cpc": 8.0, "cpm": 55.0},
+    "YouTube – Awareness": {"cpc": 3.5, "cpm": 13.0},
+    "Google Search – Generic (MOFU)": {"cpc": 5.8, "cpm": None},
+    "Google Search – RLSA (MOFU)": {"cpc": 4.8, "cpm": None},
+    "LinkedIn – Retargeting (MOFU)": {"cpc": 6.2, "cpm": 42.0},
+    "Google Search – Exact/Brand/Comp (BOFU)": {"cpc": 4.5, "cpm": None},
+}
+
+# Ranges behind the midpoints above (Part 2 benchmarks, centred on the Part 4 midpoints).
+# CTR only drives impressions on Search; CVR is centred on the 1% global rate.
+BENCHMARK_RANGES = {
+    "LinkedIn – Awareness":                    {"cpc": "€6.5–9.5", "cpm": "€45–65", "ctr": "0.6–1.2%", "cvr": "0.6–1.4%"},
+    "YouTube – Awareness":                     {"cpc": "€2.5–4.5", "cpm": "€10–16", "ctr": "0.4–0.7%", "cvr": "0.6–1.4%"},
+    "Google Search – Generic (MOFU)":          {"cpc": "€4.6–7",   "cpm": "—",      "ctr": "2.5–4.5%", "cvr": "0.6–1.4%"},
+    "Google Search – RLSA (MOFU)":             {"cpc": "€3.6–6",   "cpm": "—",      "ctr": "4.5–6.5%", "cvr": "0.6–1.4%"},
+    "LinkedIn – Retargeting (MOFU)":           {"cpc": "€4.9–7.5", "cpm": "€34–50", "ctr": "1.0–1.8%", "cvr": "0.6–1.4%"},
+    "Google Search – Exact/Brand/Comp (BOFU)": {"cpc": "€3–6",     "cpm": "—",      "ctr": "4–7%",     "cvr": "0.6–1.4%"},
+}
+
+# -----------------------------
+# Simulation rules
+# -----------------------------
+# Underperformance: only LinkedIn & YouTube (−40% clicks → higher effective CPC; +20% CPM)
+UNDERPERFORM_CLICK_CHANNELS = {
+    "LinkedIn – Awareness",
+    "LinkedIn – Retargeting (MOFU)",
+    "YouTube – Awareness",
+}
+CLICK_REDUCTION_FACTOR = 0.60            # 40% fewer clicks than naive expectation
+CPC_INFLATE_FOR_UNDERPERF = 1 / 0.60     # ≈ 1.6667, keeps Spend ≈ Clicks × CPC
+CPM_INFLATE_FOR_UNDERPERF = 1.20         # +20% CPM on LI/YT
+
+GLOBAL_CVR = 0.01   # 1% global conversion rate
+SQL_RATE = 0.30     # SQLs ≈ 30% of conversions
+
+# Search: derive impressions from assumed CTR (keep stable for intent)
+ASSUMED_SEARCH_CTR = {
+    "Google Search – Generic (MOFU)": 0.035,            # ~3.5% generic
+    "Google Search – RLSA (MOFU)": 0.055,               # ~5.5% exact/brand/comp & RLSA
+    "Google Search – Exact/Brand/Comp (BOFU)": 0.055,
+}
+# Highest-intent line always gets credited at least one conversion
+HIGH_INTENT_CHANNEL = "Google Search – Exact/Brand/Comp (BOFU)"
+
+MC_DRAWS = 100_000
+PERCENTILES = (10, 50, 90)
+
+
+# -----------------------------
+# Deterministic simulation (vectorized over scenarios)
+# -----------------------------
+def effective_rates(channels: list[str], benchmarks: dict = BENCHMARKS) -> tuple[np.ndarray, np.ndarray]:
+    """Effective CPC / CPM per channel after the LI/YT underperformance rules (NaN = not available)."""
+    cpc = np.array([benchmarks[ch]["cpc"] or np.nan for ch in channels], dtype=float)
+    cpm = np.array([benchmarks[ch]["cpm"] or np.nan for ch in channels], dtype=float)
+    underperf = np.array([ch in UNDERPERFORM_CLICK_CHANNELS for ch in channels])
+    cpc = np.where(underperf, cpc * CPC_INFLATE_FOR_UNDERPERF, cpc)
+    cpm = np.where(underperf, cpm * CPM_INFLATE_FOR_UNDERPERF, cpm)
+    return cpc, cpm
+
+
+def simulate_matrix(spend, channels: list[str], benchmarks: dict = BENCHMARKS, cvr: float = GLOBAL_CVR) -> dict:
+    """
+    Part 4 simulation rules for many scenarios at once.
+
+    `spend` is (scenarios, channels). Clicks = spend / effective CPC; impressions
+    from effective CPM, or from the assumed Search CTR; the global CVR is
+    apportioned by click share with the high-intent guarantee and drift fix.
+    Returns a dict of (scenarios, channels) arrays.
+    """
+    spend = np.atleast_2d(np.asarray(spend, dtype=float))
+    cpc, cpm = effective_rates(channels, benchmarks)
+    ctr = np.array([ASSUMED_SEARCH_CTR.get(ch, np.nan) for ch in channels])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        clicks_f = np.where(np.isnan(cpc), 0.0, spend / cpc)
+        impr_f = np.where(np.isnan(cpm), clicks_f / ctr, spend / (cpm / 1000.0))
+        ctr = np.where(np.isnan(cpm), ctr, np.where(impr_f > 0, clicks_f / impr_f, 0.0))
+    clicks = np.floor(clicks_f).astype(np.int64)
+    impressions = np.floor(np.nan_to_num(impr_f)).astype(np.int64)
+
+    # Force global CVR across the whole mix (distribute by click share)
+    total_clicks = np.maximum(clicks.sum(axis=1), 1)
+    total_conv = np.maximum(np.round(total_clicks * cvr), 1).astype(np.int64)
+    conversions = np.round(clicks / total_clicks[:, None] * total_conv[:, None]).astype(np.int64)
+
+    # Ensure at least 1 conversion in highest-intent Search Exact/Brand/Comp, then rebalance drift
+    if HIGH_INTENT_CHANNEL in channels:
+        e = channels.index(HIGH_INTENT_CHANNEL)
+        zero = conversions[:, e] == 0
+        conversions[zero, e] = 1
+        drift = total_conv - conversions.sum(axis=1)
+        rows = np.flatnonzero(zero & (drift != 0))
+        top = clicks[rows].argmax(axis=1)
+        conversions[rows, top] = np.maximum(conversions[rows, top] + drift[rows], 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cpa = np.where(conversions > 0, spend / conversions, np.nan)
+    return {
+        "spend": spend, "cpc": np.broadcast_to(cpc, spend.shape), "cpm": np.broadcast_to(cpm, spend.shape),
+        "impressions": impressions, "clicks": clicks, "ctr": ctr,
+        "conversions": conversions, "cpa": cpa,
+        "sqls": np.round(conversions * SQL_RATE).astype(np.int64),
+    }
+
+
+def simulate_performance(budgets: dict, benchmarks: dict = BENCHMARKS, cvr: float = GLOBAL_CVR) -> pd.DataFrame:
+    """Simulated monthly performance per channel for one `{channel: spend}` plan (Part 4 table)."""
+    channels = list(budgets)
+    sim = {k: v[0] for k, v in simulate_matrix([list(budgets.values())], channels, benchmarks, cvr).items()}
+    df = pd.DataFrame({
+        "Channel": channels,
+        "Spend (€)": np.round(sim["spend"], 2),
+        "CPC (€)": np.round(sim["cpc"], 2),   # NaN = not bought on CPC
+        "CPM (€)": np.round(sim["cpm"], 2),   # NaN = no CPM benchmark (Search)
+        "Impressions": sim["impressions"],
+        "Clicks": sim["clicks"],
+        "CTR": sim["ctr"],  # decimal
+    })
+    df["Click Share"] = df["Clicks"] / max(df["Clicks"].sum(), 1)
+    df["Conversions"] = sim["conversions"]
+    df["CPA (€)"] = (df["Spend (€)"] / df["Conversions"]).where(df["Conversions"] > 0)
+    df["SQLs"] = sim["sqls"]
+    return df
+
+
+# -----------------------------
+# Monte Carlo
+# -----------------------------
+def _range_arrays(channels: list[str], ranges: dict, metric: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    parsed = [parse_range(ranges[ch][metric]) for ch in channels]
+    low, mid, high = (np.array([p[i] for p in parsed], dtype=float) for i in range(3))
+    return low, mid, high
+
+
+def _sample(rng: np.random.Generator, low, mid, high, n: int) -> np.ndarray:
+    """Triangular draws (mode = midpoint) shaped (n, channels); NaN where the range is missing.
+
+    Inverse-CDF on one uniform batch — a few times faster than Generator.triangular
+    and happy with degenerate (low == high) ranges.
+    """
+    width = high - low
+    with np.errstate(invalid="ignore", divide="ignore"):
+        split = np.where(width > 0, (mid - low) / width, 0.5)
+    u = rng.random((n, len(mid)))
+    left = low + np.sqrt(u * width * (mid - low))
+    right = high - np.sqrt((1.0 - u) * width * (high - mid))
+    return np.where(u < split, left, right)
+
+
+def _quantiles(x: np.ndarray) -> np.ndarray:
+    # inverted_cdf picks observed values, so inf CPAs (0 conversions) never get interpolated into NaN
+    return np.percentile(x, PERCENTILES, axis=0, method="inverted_cdf")
+
+
+def monte_carlo(budgets: dict, n_draws: int = MC_DRAWS, seed=None,
+                ranges: dict = BENCHMARK_RANGES) -> pd.DataFrame:
+    """
+    Simulate `n_draws` months per channel in one NumPy batch.
+
+    CPC, CPM, CTR and CVR are drawn from the benchmark ranges; the LI/YT
+    underperformance rules apply to every draw; conversions and SQLs are
+    binomial on the drawn clicks. Returns P10/P50/P90 of conversions, CPA
+    and SQLs per channel plus a "Total" row.
+    """
+    rng = np.random.default_rng(seed)
+    channels = list(budgets)
+    spend = np.array([budgets[ch] for ch in channels], dtype=float)
+
+    cpc = _sample(rng, *_range_arrays(channels, ranges, "cpc"), n_draws)
+    cpm = _sample(rng, *_range_arrays(channels, ranges, "cpm"), n_draws)
+    ctr = _sample(rng, *_range_arrays(channels, ranges, "ctr"), n_draws)
+    cvr = _sample(rng, *_range_arrays(channels, ranges, "cvr"), n_draws)
+
+    underperf = np.array([ch in UNDERPERFORM_CLICK_CHANNELS for ch in channels])
+    cpc = np.where(underperf, cpc * CPC_INFLATE_FOR_UNDERPERF, cpc)
+    cpm = np.where(underperf, cpm * CPM_INFLATE_FOR_UNDERPERF, cpm)
+
+    clicks = np.floor(np.nan_to_num(spend / cpc))
+    impressions = np.where(np.isnan(cpm), clicks / ctr, spend / (cpm / 1000.0))
+    conversions = rng.binomial(clicks.astype(np.int64), np.nan_to_num(cvr))
+    sqls = rng.binomial(conversions, SQL_RATE)
+
+    # Channel columns + a Total column per draw
+    conversions = np.column_stack([conversions, conversions.sum(axis=1)])
+    sqls = np.column_stack([sqls, sqls.sum(axis=1)])
+    impressions = np.column_stack([impressions, np.nansum(impressions, axis=1)])
+    total_spend = np.append(spend, spend.sum())
+    with np.errstate(divide="ignore"):
+        cpa = np.where(conversions > 0, total_spend / conversions, np.inf)
+
+    out = pd.DataFrame({"Channel": channels + ["Total"], "Spend (€)": total_spend})
+    for name, values in (("Conversions", conversions), ("CPA (€)", cpa), ("SQLs", sqls),
+                         ("Impressions", impressions)):
+        for p, q in zip(PERCENTILES, _quantiles(values)):
+            out[f"{name} P{p}"] = q
+    return out
+
+
+def _run_scenario(args) -> pd.DataFrame:
+    name, budgets, n_draws, seed, ranges = args
+    return monte_carlo(budgets, n_draws=n_draws, seed=seed, ranges=ranges).assign(Scenario=name)
+
+
+def monte_carlo_scenarios(scenarios: dict, n_draws: int = MC_DRAWS, seed=None,
+                          ranges: dict = BENCHMARK_RANGES, processes: int | None = None) -> pd.DataFrame:
+    """
+    Run `monte_carlo` for several `{name: budgets}` scenarios.
+
+    With `processes` > 1 the scenarios are spread over a process pool; each
+    scenario gets an independent child seed, so results do not depend on
+    the number of workers.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(scenarios))
+    jobs = [(name, b, n_draws, s, ranges) for (name, b), s in zip(scenarios.items(), seeds)]
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            frames = list(pool.map(_run_scenario, jobs))
+    else:
+        frames = [_run_scenario(job) for job in jobs]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,134 @@
+"""
+Server-side table windows: filter, sort and page a frame without sending all of it to the browser.
+
+`st.dataframe` serializes the whole frame to Arrow on every run. A TableIndex
+keeps the frame on the server and hands out one page at a time; sort orders
+(one permutation per column and direction) and filter masks are computed once
+per frame and reused while paging.
+
+    index = table_index(df)               # memoized per frame (identity, then content hash)
+    view = index.window("linkedin", sort="Spend (€)", ascending=False, page=0)
+    view.rows                             # at most PAGE_ROWS rows
+"""
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.chartdata import fingerprint
+
+PAGE_ROWS = 50          # rows sent per page
+TABLE_CACHE_SIZE = 16   # frames kept indexed per process
+FILTER_CACHE_SIZE = 8   # filter masks kept per frame
+
+
+class Window(NamedTuple):
+    rows: pd.DataFrame  # the visible page, original index kept
+    first: int          # 1-based position of the first row within the matches (0 if none)
+    matched: int        # rows left after the filter
+    total: int          # rows in the frame
+    page: int           # 0-based, clamped to the last page
+    pages: int
+
+
+class TableIndex:
+    """One frame kept server-side, with memoized sort orders and filter masks; safe to share between sessions (threads)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._orders: dict[tuple, np.ndarray] = {}
+        self._text: dict[int, pd.Series] = {}   # column position -> lower-cased text, built on first use
+        self._masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def order(self, column, ascending: bool = True) -> np.ndarray:
+        """Row positions sorted by `column` (stable, missing values last)."""
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.df[column].reset_index(drop=True)
+            try:
+                ranked = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+            except TypeError:   # mixed types, e.g. numbers with a "—" placeholder
+                ranked = values.astype(str).sort_values(ascending=ascending, kind="stable")
+            self._orders[key] = ranked.index.to_numpy()
+        return self._orders[key]
+
+    def mask(self, query: str) -> np.ndarray:
+        """
+        Rows where any column's text contains `query` (case-insensitive). Numeric columns are
+        only searched when the query has a digit: turning them into text is most of the cost.
+        """
+        query = query.strip().lower()
+        with self._lock:
+            hit = self._masks.get(query)
+            if hit is not None:
+                self._masks.move_to_end(query)
+                return hit
+        # outside the lock: a slow scan must not stall other sessions' hits
+        digits = any(ch.isdigit() for ch in query)
+        hit = np.zeros(len(self.df), dtype=bool)
+        for i in range(self.df.shape[1]):
+            values = self.df.iloc[:, i]
+            if not digits and pd.api.types.is_numeric_dtype(values):
+                continue
+            if i not in self._text:
+                self._text[i] = values.astype(str).str.lower()
+            hit |= self._text[i].str.contains(query, regex=False).to_numpy(dtype=bool, na_value=False)
+        with self._lock:
+            self._masks[query] = hit
+            while len(self._masks) > FILTER_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        return hit
+
+    def window(self, query: str = "", sort=None, ascending: bool = True, page: int = 0,
+               page_rows: int = PAGE_ROWS) -> Window:
+        """Page `page` of the rows matching `query`, in `sort` order (frame order if None)."""
+        positions = self.order(sort, ascending) if sort is not None else np.arange(len(self.df))
+        if query.strip():
+            positions = positions[self.mask(query)[positions]]
+        pages = max(math.ceil(len(positions) / page_rows), 1)
+        page = min(max(page, 0), pages - 1)
+        start = page * page_rows
+        rows = self.df.iloc[positions[start:start + page_rows]]
+        return Window(rows, start + 1 if len(rows) else 0, len(positions), len(self.df), page, pages)
+
+
+# -----------------------------
+# Per-frame memo
+# -----------------------------
+_cache: "OrderedDict[str, TableIndex]" = OrderedDict()
+_last: dict[int, tuple] = {}    # id(frame) -> (weakref to it, fingerprint)
+_lock = threading.Lock()        # both dicts are shared by every session (thread)
+
+
+def table_index(df: pd.DataFrame) -> TableIndex:
+    """
+    The TableIndex for `df`. The same frame object (e.g. a fragment rerun while paging) is
+    found by identity; an equal frame rebuilt on a full rerun by its content hash.
+    """
+    with _lock:
+        seen = _last.get(id(df))
+    key = seen[1] if seen is not None and seen[0]() is df else None
+    if key is None:
+        key = fingerprint(df)   # outside the lock: hashing a large frame must not stall other sessions
+        with _lock:
+            _last[id(df)] = (weakref.ref(df), key)
+            for k in [k for k, (ref, _) in _last.items() if ref() is None]:
+                del _last[k]
+    with _lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+        index = _cache[key] = TableIndex(df)
+        while len(_cache) > TABLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,174 @@
+"""
+Account tiering: the Part 1 ICP tier table compiled into one vectorized lookup.
+
+Each row of the tier table is a rule (tier, industries, company-size bands,
+regions, behavioral use case); the first rule an account matches sets its tier
+and use case, accounts matching none get DEFAULT_TIER. `TierEngine` compiles
+the rules once per input:
+
+    size        every rule's size bounds become the breaks of one IntervalIndex of
+                elementary bands; each account's band is one searchsorted
+    industry,   matched on the column's distinct values only (case-insensitive),
+    region      then carried to the rows by their categorical codes
+
+and a small (industry x band x region) table holds the first matching rule for
+every combination. Tiering a frame is then a single gather, whatever its length.
+
+    engine = TierEngine(rules_from_frame(ICP_TIERS))
+    engine.assign(accounts)               # tier + use_case, categorical
+"""
+
+import re
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.ranges import parse_range
+
+DEFAULT_TIER = "C"
+DEFAULT_USE_CASE = "Outside ICP tiers (nurture)"
+ANY_REGION = ("National", "Nationwide", "Any", "")
+
+# The ICP tiers shown in Part 1; "Company Size" and "Region" are read by rules_from_frame
+ICP_TIERS = pd.DataFrame([
+    {"Tier": "A", "Industry": "Banking/Financial Services", "Company Size": "1,000–9,999", "Region": "US Northeast", "Key Roles": "CHRO, Compliance Director", "Behavioral Use Case": "Policy adherence, audit-ready behaviors"},
+    {"Tier": "A", "Industry": "Healthcare", "Company Size": "1,000–9,999", "Region": "Midwest", "Key Roles": "CHRO, L&D Director", "Behavioral Use Case": "Faster onboarding; procedure fidelity"},
+    {"Tier": "A", "Industry": "Manufacturing / HSE", "Company Size": "1,000–9,999", "Region": "Midwest", "Key Roles": "HSE, Ops VP", "Behavioral Use Case": "Safety incident reduction; SOP adherence"},
+    {"Tier": "A", "Industry": "Tech / IT", "Company Size": "1,000–9,999", "Region": "West Coast", "Key Roles": "L&D, CHRO", "Behavioral Use Case": "Digital skill adoption; secure behaviors"},
+    {"Tier": "B", "Industry": "FMCG / Retail", "Company Size": "500–999 or 10,000+", "Region": "National", "Key Roles": "HR, Ops, Sales Enablement", "Behavioral Use Case": "Frontline consistency; CX behaviors"},
+    {"Tier": "B", "Industry": "Education / Public Sector", "Company Size": "500–999 or 10,000+", "Region": "National", "Key Roles": "HR, Compliance", "Behavioral Use Case": "Culture/DEI adoption; policy reinforcement"},
+])
+
+
+class TierRule(NamedTuple):
+    tier: str
+    use_case: str
+    industries: tuple = ()     # empty = any industry
+    sizes: tuple = ()          # (low, high) employee bounds, high exclusive; empty = any size
+    regions: tuple = ()        # empty = any region
+
+
+class TierError(ValueError):
+    """A tier table that cannot be compiled (unreadable size band, missing column)."""
+
+
+def parse_sizes(text: str) -> tuple:
+    """'1,000–9,999' -> ((1000, 10000),); '500–999 or 10,000+' -> ((500, 1000), (10000, inf))."""
+    bands = []
+    for part in re.split(r"\s+or\s+|\s*;\s*", str(text).strip()):
+        if not part:
+            continue
+        if part.endswith("+"):
+            low = parse_range(part[:-1]).low
+            if np.isnan(low):
+                raise TierError(f"unreadable company size {text!r}")
+            bands.append((low, np.inf))
+            continue
+        r = parse_range(part)
+        if np.isnan(r.low):
+            raise TierError(f"unreadable company size {text!r}")
+        bands.append((r.low, r.high + 1))      # "1,000–9,999" includes 9,999
+    return tuple(bands)
+
+
+def rules_from_frame(tiers: pd.DataFrame) -> list[TierRule]:
+    """One rule per row of a tier table (Tier, Industry, Company Size, Region, Behavioral Use Case), in order."""
+    missing = [c for c in ("Tier", "Industry", "Company Size", "Region", "Behavioral Use Case") if c not in tiers]
+    if missing:
+        raise TierError(f"tier table: missing column(s): {', '.join(missing)}")
+    return [
+        TierRule(
+            tier=str(row["Tier"]),
+            use_case=str(row["Behavioral Use Case"]),
+            industries=(str(row["Industry"]),),
+            sizes=parse_sizes(row["Company Size"]),
+            regions=() if str(row["Region"]).strip() in ANY_REGION else (str(row["Region"]),),
+        )
+        for _, row in tiers.iterrows()
+    ]
+
+
+def _codes(values) -> tuple[np.ndarray, pd.Index]:
+    """Categorical codes (-1 = missing) and the distinct values, without re-hashing a categorical column."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, uniques = pd.factorize(values)
+    return codes, pd.Index(uniques)
+
+
+def _folded(values) -> np.ndarray:
+    return np.array([str(v).strip().casefold() for v in values], dtype=object)
+
+
+class TierEngine:
+    """A rule list compiled for vectorized assignment; the first matching rule wins."""
+
+    def __init__(self, rules, default: tuple[str, str] = (DEFAULT_TIER, DEFAULT_USE_CASE)):
+        self.rules = list(rules)
+        self.default = default
+        breaks = sorted({0.0, np.inf} | {float(b) for r in self.rules for band in r.sizes for b in band})
+        self.bands = pd.IntervalIndex.from_breaks(breaks, closed="left")
+        # rule x band (+1 slot for sizes outside every band or missing)
+        self._size_ok = np.array([
+            [not r.sizes or any(lo <= iv.left and iv.right <= hi for lo, hi in r.sizes) for iv in self.bands]
+            + [not r.sizes]
+            for r in self.rules
+        ], dtype=bool).reshape(len(self.rules), len(self.bands) + 1)
+        self.tiers = pd.Index(sorted({r.tier for r in self.rules} | {default[0]}))
+        self.use_cases = pd.Index(list(dict.fromkeys([r.use_case for r in self.rules] + [default[1]])))
+        # rule index -> tier / use-case code; the extra last entry is the default
+        self._tier_code = self.tiers.get_indexer([r.tier for r in self.rules] + [default[0]])
+        self._use_case_code = self.use_cases.get_indexer([r.use_case for r in self.rules] + [default[1]])
+
+    def _value_ok(self, values: pd.Index, attr: str) -> np.ndarray:
+        """rule x distinct value (+1 slot for missing): does the value satisfy the rule's list?"""
+        folded = _folded(values)
+        ok = np.ones((len(self.rules), len(values) + 1), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            wanted = getattr(rule, attr)
+            if wanted:
+                ok[i, :-1] = np.isin(folded, _folded(wanted))
+                ok[i, -1] = False
+        return ok
+
+    def band_of(self, employees) -> np.ndarray:
+        """
+        Elementary band per account; len(bands) (the last slot) for missing or negative sizes.
+        The bands are sorted and left-closed, so this is a searchsorted on their right ends
+        (same result as `bands.get_indexer`, without building an interval tree).
+        """
+        x = np.asarray(employees, dtype=float)
+        band = np.searchsorted(self.bands.right.to_numpy(), x, side="right")   # NaN sorts last
+        band[x < self.bands.left[0]] = len(self.bands)
+        return band
+
+    def first_rule(self, industry: pd.Series, employees, region: pd.Series) -> np.ndarray:
+        """Index of the first matching rule per account (len(rules) = no match)."""
+        ind_codes, ind_values = _codes(industry)
+        reg_codes, reg_values = _codes(region)
+        band = self.band_of(employees)
+        match = (self._value_ok(ind_values, "industries")[:, :, None, None]
+                 & self._size_ok[:, None, :, None]
+                 & self._value_ok(reg_values, "regions")[:, None, None, :])
+        table = np.where(match.any(axis=0), match.argmax(axis=0), len(self.rules)).astype(np.int16)
+        return table[ind_codes, band, reg_codes]     # code -1 picks each axis' last (missing) slot
+
+    def assign(self, df: pd.DataFrame, industry: str = "industry", employees: str = "employees",
+               region: str = "region") -> pd.DataFrame:
+        """`tier` and `use_case` (categoricals) for every row of `df`, in one pass."""
+        rule = self.first_rule(df[industry], df[employees], df[region])
+        return pd.DataFrame({
+            "tier": pd.Categorical.from_codes(self._tier_code[rule], self.tiers),
+            "use_case": pd.Categorical.from_codes(self._use_case_code[rule], self.use_cases),
+        }, index=df.index)
+
+
+ICP_ENGINE = TierEngine(rules_from_frame(ICP_TIERS))
+
+
+def tier_counts(tiered: pd.DataFrame) -> pd.DataFrame:
+    """Accounts per tier and use case with their share, in tier order."""
+    counts = tiered.groupby(["tier", "use_case"], observed=True).size().rename("accounts").reset_index()
+    counts["share"] = counts["accounts"] / max(len(tiered), 1)
+    return counts.sort_values(["tier", "accounts"], ascending=[True, False], ignore_index=True)
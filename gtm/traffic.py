@@ -0,0 +1,322 @@
+"""
+Session validation: the Part 3 GA4 / GTM rules run over exported event logs.
+
+Event logs (CSV or Parquet, one row per event) are streamed in batches and
+folded into one row per session; every rule is then a column operation over
+the session table:
+
+    SHORT_SESSION   session shorter than MIN_SESSION_S (10 s)
+    NO_ENGAGEMENT   no scroll past MIN_SCROLL_PCT and fewer than MIN_PAGEVIEWS pageviews
+    FREE_EMAIL      submitted email on a free mail domain (gtm.emails)
+    INVALID_EMAIL   submitted email that is not an address, or on a disposable domain
+    HONEYPOT        hidden form field filled in
+    BLOCKLISTED     IP or device on a blocklist (gtm.blocklist; only when one is passed)
+
+Each rule has a weight; the bot score is their noisy-OR (1 - prod(1 - w)) and
+sessions at or above BOT_THRESHOLD are filtered. Memory follows the number of
+sessions, not the number of events. Each session keeps its landing URL (first
+page_location) for UTM attribution in `gtm.utm`.
+"""
+
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gtm.emails import classify_emails
+from gtm.ingest import DATA_DIR, IngestError, epoch_seconds
+from gtm.utm import sample_landing_urls
+
+TRAFFIC_DIR = DATA_DIR / "traffic"
+TRAFFIC_PATTERNS = ("*.csv", "*.csv.gz", "*.parquet")
+BATCH_ROWS = 1_000_000
+COMPACT_ROWS = 2_000_000     # merge per-batch session partials once they pass this many rows
+
+MIN_SESSION_S = 10
+MIN_SCROLL_PCT = 50
+MIN_PAGEVIEWS = 2
+BOT_THRESHOLD = 0.5
+
+# bit -> (reason code, weight)
+REASONS = {
+    1: ("SHORT_SESSION", 0.50),
+    2: ("NO_ENGAGEMENT", 0.40),
+    4: ("FREE_EMAIL", 0.50),
+    8: ("INVALID_EMAIL", 0.60),
+    16: ("HONEYPOT", 0.95),
+    32: ("BLOCKLISTED", 0.90),
+}
+SHORT_SESSION, NO_ENGAGEMENT, FREE_EMAIL, INVALID_EMAIL, HONEYPOT, BLOCKLISTED = REASONS
+
+# Canonical column -> names used by GA4 / GTM exports (first match wins); only the first three are required
+EVENT_COLUMNS = {
+    "session_id": ("session_id", "ga_session_id", "sessionId"),
+    "timestamp": ("timestamp", "event_timestamp", "event_time"),
+    "event_name": ("event_name", "event"),
+    "engagement_ms": ("engagement_time_msec", "engagement_ms"),
+    "scroll_pct": ("percent_scrolled", "scroll_pct", "scroll_depth"),
+    "email": ("email", "form_email"),
+    "honeypot": ("honeypot", "hp_field", "website_url"),
+    "ip": ("ip", "ip_address", "client_ip"),
+    "device_id": ("device_id", "device.advertising_id"),
+    "landing": ("page_location", "landing_page", "page_url"),
+    "user_pseudo_id": ("user_pseudo_id",),
+}
+REQUIRED = ("session_id", "timestamp", "event_name")
+# GA4's ga_session_id is only unique per user: sessions from it are keyed on "<user_pseudo_id>.<ga_session_id>"
+PER_USER_SESSION_ID = "ga_session_id"
+
+# session aggregate -> how partials from different batches combine
+SESSION_AGG = {
+    "start": "min", "end": "max", "events": "sum", "pageviews": "sum",
+    "engagement_ms": "sum", "max_scroll": "max", "email": "last", "honeypot": "max",
+    "ip": "last", "device_id": "last", "landing": "first",
+}
+
+
+class TrafficReport(NamedTuple):
+    files: int
+    events: int
+    sessions: int
+    seconds: float
+    errors: tuple = ()
+
+
+# -----------------------------
+# Reading (streaming batches)
+# -----------------------------
+def traffic_files(traffic_dir=TRAFFIC_DIR) -> list[Path]:
+    traffic_dir = Path(traffic_dir)
+    return sorted({p for pattern in TRAFFIC_PATTERNS for p in traffic_dir.glob(pattern)})
+
+
+def _resolve(names, path) -> dict:
+    """Canonical name -> column in this file; raises `IngestError` if a required column is missing."""
+    names = set(names)
+    cols = {k: next((a for a in aliases if a in names), None) for k, aliases in EVENT_COLUMNS.items()}
+    missing = [k for k in REQUIRED if cols[k] is None]
+    if missing:
+        raise IngestError(f"{Path(path).name}: missing column(s): {', '.join(missing)}")
+    if cols["session_id"] != PER_USER_SESSION_ID:
+        cols["user_pseudo_id"] = None
+    return {k: v for k, v in cols.items() if v is not None}
+
+
+def normalize_events(events: pd.DataFrame, source: str = "events") -> pd.DataFrame:
+    """Select and rename an in-memory event frame to the canonical columns."""
+    cols = _resolve(events.columns, source)
+    return events[list(cols.values())].rename(columns={v: k for k, v in cols.items()})
+
+
+def read_events(path, batch_rows: int = BATCH_ROWS):
+    """Iterate one event log as batches with canonical column names."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        cols = _resolve(pf.schema_arrow.names, path)
+        rename = {v: k for k, v in cols.items()}
+        for batch in pf.iter_batches(batch_size=batch_rows, columns=list(rename)):
+            yield batch.to_pandas().rename(columns=rename)
+    else:
+        cols = _resolve(pd.read_csv(path, nrows=0).columns, path)
+        rename = {v: k for k, v in cols.items()}
+        text = [c for k, c in cols.items() if k in ("session_id", "event_name", "email", "honeypot", "ip", "device_id", "landing",
+                                                 "user_pseudo_id")]
+        with pd.read_csv(path, usecols=list(rename), dtype=dict.fromkeys(text, "string"),
+                         chunksize=batch_rows) as reader:
+            for chunk in reader:
+                yield chunk.rename(columns=rename)
+
+
+def _seconds(ts: pd.Series) -> np.ndarray:
+    """Event time in epoch seconds; numeric times may be seconds, milliseconds or (GA4) microseconds."""
+    if pd.api.types.is_numeric_dtype(ts):
+        return epoch_seconds(ts.to_numpy(dtype=float, na_value=np.nan))
+    return pd.to_datetime(ts, errors="coerce", utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+
+
+def _honeypot_filled(honeypot: pd.Series) -> np.ndarray:
+    """Numeric / boolean fields are filled when non-zero; text fields unless blank, "false" or a zero ("0", "0.0")."""
+    if pd.api.types.is_bool_dtype(honeypot) or pd.api.types.is_numeric_dtype(honeypot):
+        return (honeypot.notna() & (honeypot != 0)).to_numpy(dtype=bool, na_value=False)
+    text = honeypot.astype("string").str.strip().str.lower().fillna("")
+    zero = (pd.to_numeric(text, errors="coerce") == 0).to_numpy(dtype=bool, na_value=False)
+    return ~(text.isin(["", "false"]).to_numpy() | zero)
+
+
+def session_partials(events: pd.DataFrame) -> pd.DataFrame:
+    """One batch of events -> one row per session (combinable with `SESSION_AGG`)."""
+    n = len(events)
+    ts = _seconds(events["timestamp"])
+    honeypot = events["honeypot"] if "honeypot" in events else pd.Series(pd.NA, index=events.index, dtype="string")
+    session_id = events["session_id"]
+    if "user_pseudo_id" in events:
+        session_id = events["user_pseudo_id"].astype("string") + "." + session_id.astype("string")
+    df = pd.DataFrame({
+        "session_id": session_id.to_numpy(),
+        "start": ts,
+        "end": ts,
+        "events": np.ones(n, dtype=np.int32),
+        "pageviews": (events["event_name"] == "page_view").to_numpy(dtype=np.int32, na_value=0),
+        "engagement_ms": events["engagement_ms"].fillna(0).to_numpy(dtype=float) if "engagement_ms" in events else 0.0,
+        "max_scroll": events["scroll_pct"].to_numpy(dtype=float, na_value=np.nan) if "scroll_pct" in events else np.nan,
+        "email": events["email"].to_numpy(dtype=object, na_value=None) if "email" in events else None,
+        "honeypot": _honeypot_filled(honeypot),
+        "ip": events["ip"].to_numpy(dtype=object, na_value=None) if "ip" in events else None,
+        "device_id": events["device_id"].to_numpy(dtype=object, na_value=None) if "device_id" in events else None,
+        "landing": events["landing"].to_numpy(dtype=object, na_value=None) if "landing" in events else None,
+    })
+    return df.groupby("session_id", sort=False).agg(SESSION_AGG)
+
+
+def _combine(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).groupby(level=0, sort=False).agg(SESSION_AGG)
+
+
+def build_sessions(paths, batch_rows: int = BATCH_ROWS) -> tuple[pd.DataFrame, TrafficReport]:
+    """Stream every event log into one session table; unreadable files are reported and skipped."""
+    t0 = time.perf_counter()
+    parts, events, errors = [], 0, []
+    for path in paths:
+        file_parts, file_events = [], 0
+        try:
+            for batch in read_events(path, batch_rows):
+                file_parts.append(session_partials(batch))
+                file_events += len(batch)
+                if sum(map(len, file_parts)) > COMPACT_ROWS:
+                    file_parts = [_combine(file_parts)]
+        except (IngestError, OSError, ValueError, pd.errors.ParserError) as e:
+            errors.append(str(e) if isinstance(e, IngestError) else f"{Path(path).name}: {e}")
+            continue
+        events += file_events
+        parts += file_parts
+        if sum(map(len, parts)) > COMPACT_ROWS:
+            parts = [_combine(parts)]
+    sessions = _combine(parts) if parts else pd.DataFrame(columns=list(SESSION_AGG))
+    sessions.index.name = "session_id"
+    return sessions, TrafficReport(len(paths), events, len(sessions), time.perf_counter() - t0, tuple(errors))
+
+
+# -----------------------------
+# Rules + score
+# -----------------------------
+def _email_flags(email: pd.Series, domains=None) -> np.ndarray:
+    category = classify_emails(email, *(domains or ()))["category"]
+    return (np.where(category == "free", FREE_EMAIL, 0)
+            | np.where(category.isin(["invalid", "disposable"]), INVALID_EMAIL, 0))
+
+
+def score_sessions(sessions: pd.DataFrame, threshold: float = BOT_THRESHOLD, blocklist=None,
+                   domains=None) -> pd.DataFrame:
+    """
+    Apply every rule column-wise; adds duration, reasons (bitmask), bot_score and status.
+    With a `gtm.blocklist.Blocklist`, sessions whose IP or device is listed get BLOCKLISTED
+    and a `blocklist` column naming the list. `domains` is the (free, disposable) pair from
+    `gtm.emails.domain_sets` (built-in lists only if None).
+    """
+    duration = np.maximum(
+        (sessions["end"] - sessions["start"]).to_numpy(dtype=float),
+        sessions["engagement_ms"].to_numpy(dtype=float) / 1000,
+    )
+    scroll = np.nan_to_num(sessions["max_scroll"].to_numpy(dtype=float))
+    pageviews = sessions["pageviews"].to_numpy()
+
+    reasons = (
+        np.where(duration < MIN_SESSION_S, SHORT_SESSION, 0)
+        | np.where((scroll < MIN_SCROLL_PCT) & (pageviews < MIN_PAGEVIEWS), NO_ENGAGEMENT, 0)
+        | _email_flags(sessions["email"], domains)
+        | np.where(sessions["honeypot"].to_numpy(dtype=bool), HONEYPOT, 0)
+    ).astype(np.int8)
+    listed = None
+    if blocklist is not None:
+        hit = blocklist.lookup(ips=sessions["ip"], device_ids=sessions["device_id"])
+        listed = blocklist.labels(hit)
+        reasons |= np.where(hit >= 0, BLOCKLISTED, 0).astype(np.int8)
+
+    # noisy-OR of the triggered rule weights
+    log_keep = sum(np.where(reasons & bit, np.log1p(-w), 0.0) for bit, (_, w) in REASONS.items())
+    score = 1 - np.exp(log_keep)
+    out = sessions.assign(duration_s=duration, reasons=reasons, bot_score=np.round(score, 3))
+    if listed is not None:
+        out["blocklist"] = listed
+    out["status"] = pd.Categorical(np.where(score >= threshold, "filtered", "clean"), categories=["clean", "filtered"])
+    return out
+
+
+def reason_labels(reasons) -> pd.Series:
+    """Bitmask -> "SHORT_SESSION, HONEYPOT" (labels built once per distinct mask)."""
+    reasons = pd.Series(reasons)
+    labels = {m: ", ".join(code for bit, (code, _) in REASONS.items() if m & bit) or "—" for m in reasons.unique()}
+    return reasons.map(labels)
+
+
+def reason_counts(scored: pd.DataFrame) -> pd.DataFrame:
+    """Sessions triggering each rule, split by final status."""
+    masks = scored["reasons"].to_numpy()
+    filtered = (scored["status"] == "filtered").to_numpy()
+    return pd.DataFrame([
+        {"Reason": code, "Filtered": int((hit := (masks & bit) > 0)[filtered].sum()), "Clean": int(hit[~filtered].sum())}
+        for bit, (code, _) in REASONS.items()
+    ])
+
+
+def daily_status(scored: pd.DataFrame) -> pd.DataFrame:
+    """Sessions per day (UTC, by session start) and status."""
+    day = pd.to_datetime(scored["start"].to_numpy(dtype=float), unit="s").floor("D")
+    return (scored.groupby([day, scored["status"]], observed=False).size()
+                  .rename_axis(["Day", "Status"]).reset_index(name="Sessions"))
+
+
+def score_logs(paths, batch_rows: int = BATCH_ROWS, threshold: float = BOT_THRESHOLD,
+               blocklist=None, domains=None) -> tuple[pd.DataFrame, TrafficReport]:
+    sessions, report = build_sessions(paths, batch_rows)
+    return score_sessions(sessions, threshold, blocklist, domains), report
+
+
+# -----------------------------
+# Sample traffic (no logs yet / benchmarks)
+# -----------------------------
+def sample_events(n_sessions: int = 20_000, bot_share: float = 0.25, seed: int = 0,
+                  start: str = "2025-01-06") -> pd.DataFrame:
+    """Synthetic GA4-style event log: humans browse and scroll, bots bounce or fill the honeypot."""
+    rng = np.random.default_rng(seed)
+    bot = rng.random(n_sessions) < bot_share
+    n_events = np.where(bot, rng.integers(1, 3, n_sessions), rng.integers(2, 12, n_sessions))
+    sid = np.repeat(np.arange(n_sessions), n_events)
+    first = np.repeat(np.cumsum(n_events) - n_events, n_events)
+    step = np.arange(len(sid)) - first
+
+    t0 = pd.Timestamp(start).value // 1000 + rng.integers(0, 28 * 86_400, n_sessions) * 1_000_000
+    gap = np.where(bot[sid], rng.uniform(0.1, 3, len(sid)), rng.uniform(5, 60, len(sid))) * 1_000_000
+    elapsed = np.cumsum(gap)
+    ts = t0[sid] + (elapsed - elapsed[first]).astype(np.int64)
+
+    names = np.where(step == 0, "page_view", rng.choice(["page_view", "scroll", "user_engagement", "click"], len(sid)))
+    scroll = np.where(names == "scroll", np.where(bot[sid], rng.uniform(0, 30, len(sid)), rng.uniform(40, 100, len(sid))), np.nan)
+    last = step == n_events[sid] - 1
+    submits = last & (rng.random(len(sid)) < np.where(bot[sid], 0.3, 0.05))
+    names = np.where(submits, "form_submit", names)
+    domains = np.where(bot[sid], rng.choice(["gmail.com", "mailinator", "x.y"], len(sid)),
+                       rng.choice(["acme-health.com", "globex.com", "initech.io", "gmail.com"], len(sid), p=[.4, .3, .2, .1]))
+    email = np.where(submits, np.char.add(np.char.add("user", sid.astype(str)), np.char.add("@", domains)), None)
+    honeypot = np.where(submits & bot[sid] & (rng.random(len(sid)) < 0.5), "http://spam.example", None)
+    # bots come from a few hosting ranges (documentation blocks), humans from anywhere
+    host = np.where(bot, rng.choice([0xCB007100, 0xC6336400, 0xC0000200], n_sessions) + rng.integers(1, 255, n_sessions),
+                    rng.integers(0x01000000, 0xDF000000, n_sessions))
+    ip = pd.Series(host).map(lambda a: f"{a >> 24}.{a >> 16 & 255}.{a >> 8 & 255}.{a & 255}").to_numpy()
+    return pd.DataFrame({
+        "session_id": pd.Series(sid).map("s{:07d}".format),
+        "event_timestamp": ts,
+        "event_name": names,
+        "engagement_time_msec": np.where(names == "user_engagement", gap / 1000, np.nan),
+        "percent_scrolled": scroll,
+        "email": email,
+        "honeypot": honeypot,
+        "ip_address": ip[sid],
+        "page_location": np.where(step == 0, sample_landing_urls(n_sessions, seed)[sid], None),
+    })
@@ -0,0 +1,262 @@
+"""
+UTM attribution: session landing URLs -> plan channel and funnel stage.
+
+The Part 1 "UTM taxonomy" tags every paid link with
+
+    utm_source    linkedin | google | youtube
+    utm_medium    paid_social | cpc | video              (SOURCE_MEDIUMS)
+    utm_campaign  <funnel>_<type>[_<free text>]          e.g. tofu_awareness_hr-leads, mofu_rlsa, bofu_brand_nl
+
+(source, medium) gives the platform, (platform, type) one of the six plan
+channels in `gtm.channels` (CAMPAIGN_TYPES), and the funnel token has to agree
+with that channel's stage.
+
+Millions of landing URLs are a few thousand distinct URLs and a few hundred
+distinct tags: URLs are factorized, the utm_* values are cut out of the
+distinct URLs with one Arrow regex pass per parameter, and every distinct
+(source, medium, campaign) tag is decoded and resolved once in Python (memoized
+across calls). Sessions get categorical codes back by indexing.
+
+A landing URL without utm_* parameters is "untagged" (direct, organic or Google
+Ads auto-tagging). A tag that does not resolve to a plan channel is "invalid"
+and is reported per distinct tag with its sessions -- it is never counted as
+Google. Reason bits:
+
+    MISSING_TAG       only some of utm_source / utm_medium / utm_campaign are set
+    UNKNOWN_SOURCE    (source, medium) is not in SOURCE_MEDIUMS
+    BAD_CAMPAIGN      utm_campaign is not <funnel>_<type>... or the platform runs no such type
+    FUNNEL_MISMATCH   funnel token disagrees with the channel's stage (channel kept, stage from the channel)
+    NOT_LOWERCASE     values not lowercase; GA4 reports "LinkedIn" and "linkedin" apart (channel kept)
+    BAD_ENCODING      percent-encoding that is not UTF-8
+
+    resolved = resolve_urls(sessions["landing"])
+    resolved.sessions     # channel / funnel / status categoricals and reasons, one row per URL
+    resolved.tags         # one row per distinct tag: sessions, channel, status, reasons
+"""
+
+import time
+from functools import lru_cache
+from typing import NamedTuple
+from urllib.parse import unquote_plus
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from gtm.channels import CHANNEL_PLATFORM
+from gtm.simulation import CHANNEL_FUNNEL
+
+UTM_PARAMS = ("source", "medium", "campaign")
+CHANNELS = list(CHANNEL_PLATFORM)
+FUNNELS = ("TOFU", "MOFU", "BOFU")
+STATUSES = ("resolved", "untagged", "invalid")
+RESOLVED, UNTAGGED, INVALID = range(len(STATUSES))
+
+# (utm_source, utm_medium) -> platform
+SOURCE_MEDIUMS = {
+    ("linkedin", "paid_social"): "LinkedIn",
+    ("linkedin", "cpc"): "LinkedIn",
+    ("google", "cpc"): "Google",
+    ("google", "video"): "YouTube",       # YouTube ads bought through Google Ads
+    ("youtube", "video"): "YouTube",
+    ("youtube", "cpv"): "YouTube",
+}
+
+# platform -> campaign type token -> plan channel
+CAMPAIGN_TYPES = {
+    "LinkedIn": {
+        "awareness": "LinkedIn – Awareness",
+        "retargeting": "LinkedIn – Retargeting (MOFU)",
+    },
+    "YouTube": {
+        "awareness": "YouTube – Awareness",
+    },
+    "Google": {
+        "generic": "Google Search – Generic (MOFU)",
+        "dsa": "Google Search – Generic (MOFU)",
+        "rlsa": "Google Search – RLSA (MOFU)",
+        "brand": "Google Search – Exact/Brand/Comp (BOFU)",
+        "exact": "Google Search – Exact/Brand/Comp (BOFU)",
+        "comp": "Google Search – Exact/Brand/Comp (BOFU)",
+    },
+}
+
+REASONS = {
+    1: "MISSING_TAG",
+    2: "UNKNOWN_SOURCE",
+    4: "BAD_CAMPAIGN",
+    8: "FUNNEL_MISMATCH",
+    16: "NOT_LOWERCASE",
+    32: "BAD_ENCODING",
+}
+MISSING_TAG, UNKNOWN_SOURCE, BAD_CAMPAIGN, FUNNEL_MISMATCH, NOT_LOWERCASE, BAD_ENCODING = REASONS
+
+_CHANNEL_IDX = {ch: i for i, ch in enumerate(CHANNELS)}
+_FUNNEL_CODE = np.array([FUNNELS.index(CHANNEL_FUNNEL[ch]) for ch in CHANNELS] + [-1], dtype=np.int8)
+_PATTERNS = {k: rf"[?&]utm_{k}=(?P<value>[^&#]*)" for k in UTM_PARAMS}
+
+
+class UtmResolution(NamedTuple):
+    sessions: pd.DataFrame    # per input URL: channel, funnel, status (categoricals), reasons (bitmask)
+    tags: pd.DataFrame        # per distinct tag: source, medium, campaign, sessions, channel, status, reasons
+    urls: int                 # distinct landing URLs
+    seconds: float
+
+
+# -----------------------------
+# One tag (memoized)
+# -----------------------------
+def _decode(value: str | None) -> tuple[str, int]:
+    """Percent-decoded value and the reason bits it raises on its own."""
+    if value is None:
+        return "", 0
+    text = unquote_plus(value, errors="replace")
+    return text.strip(), (BAD_ENCODING if "\ufffd" in text else 0) | (NOT_LOWERCASE if text != text.lower() else 0)
+
+
+@lru_cache(maxsize=65536)
+def resolve_tag(source: str | None, medium: str | None, campaign: str | None) -> tuple[int, int, int]:
+    """
+    (channel index into CHANNELS or -1, status, reasons) for one raw, still
+    percent-encoded tag; None is a parameter the URL does not carry.
+    """
+    if source is None and medium is None and campaign is None:
+        return -1, UNTAGGED, 0
+    (source, r1), (medium, r2), (campaign, r3) = _decode(source), _decode(medium), _decode(campaign)
+    reasons = r1 | r2 | r3
+    source, medium, campaign = source.lower(), medium.lower(), campaign.lower()
+    if not (source and medium and campaign):
+        reasons |= MISSING_TAG
+
+    platform = SOURCE_MEDIUMS.get((source, medium))
+    if platform is None and source and medium:
+        reasons |= UNKNOWN_SOURCE
+    funnel, _, rest = campaign.partition("_")
+    kind = rest.partition("_")[0]
+    channel = CAMPAIGN_TYPES.get(platform, {}).get(kind) if funnel.upper() in FUNNELS else None
+    if campaign and (funnel.upper() not in FUNNELS or (platform is not None and channel is None)):
+        reasons |= BAD_CAMPAIGN
+    if channel is None:
+        return -1, INVALID, reasons
+    if CHANNEL_FUNNEL[channel] != funnel.upper():
+        reasons |= FUNNEL_MISMATCH
+    return _CHANNEL_IDX[channel], RESOLVED, reasons
+
+
+# -----------------------------
+# Landing URLs (vectorized)
+# -----------------------------
+def utm_tags(urls) -> pd.DataFrame:
+    """Raw utm_source / utm_medium / utm_campaign of each URL (<NA> where the URL does not carry it)."""
+    arr = pa.array(pd.Series(urls, dtype="string"), type=pa.large_string())
+    return pd.DataFrame({
+        k: pd.Series(pc.struct_field(pc.extract_regex(arr, pattern), [0]).to_pandas(), dtype="string")
+        for k, pattern in _PATTERNS.items()
+    })
+
+
+def resolve_urls(urls) -> UtmResolution:
+    """Resolve every landing URL (missing URLs count as untagged); work follows the distinct URLs and tags."""
+    t0 = time.perf_counter()
+    urls = pd.Series(urls, dtype="string").fillna("")
+    url_codes, distinct = pd.factorize(urls)
+    raw = utm_tags(distinct)
+
+    # distinct URLs -> distinct tags (a tag is the triple of per-parameter codes, -1 = absent)
+    key = np.zeros(len(raw), dtype=np.int64)
+    for k in UTM_PARAMS:
+        codes, values = pd.factorize(raw[k])
+        key = key * (len(values) + 1) + codes + 1
+    tag_of_url, keys = pd.factorize(key)
+    _, first = np.unique(tag_of_url, return_index=True)
+    tags = raw.iloc[first].reset_index(drop=True).astype(object)
+    tags = tags.where(tags.notna(), None)
+
+    resolved = np.array([resolve_tag(*t) for t in tags.itertuples(index=False, name=None)],
+                        dtype=np.int64).reshape(-1, 3)
+    channel, status, reasons = resolved.T
+    tag = tag_of_url[url_codes]
+    sessions = pd.DataFrame({
+        "channel": pd.Categorical.from_codes(channel[tag], categories=CHANNELS),
+        "funnel": pd.Categorical.from_codes(_FUNNEL_CODE[channel[tag]], categories=FUNNELS),
+        "status": pd.Categorical.from_codes(status[tag], categories=STATUSES),
+        "reasons": reasons[tag].astype(np.int8),
+    }, index=urls.index)
+
+    decoded = tags.map(lambda v: _decode(v)[0] if v is not None else None)
+    tags = decoded.assign(
+        sessions=np.bincount(tag, minlength=len(tags)),
+        channel=pd.Categorical.from_codes(channel, categories=CHANNELS),
+        status=pd.Categorical.from_codes(status, categories=STATUSES),
+        reasons=reasons.astype(np.int8),
+    ).sort_values("sessions", ascending=False, ignore_index=True)
+    return UtmResolution(sessions, tags, len(distinct), time.perf_counter() - t0)
+
+
+# -----------------------------
+# Reports
+# -----------------------------
+def tag_reason_labels(reasons) -> pd.Series:
+    """Bitmask -> "UNKNOWN_SOURCE, NOT_LOWERCASE" (labels built once per distinct mask)."""
+    reasons = pd.Series(reasons)
+    labels = {m: ", ".join(code for bit, code in REASONS.items() if m & bit) or "—" for m in reasons.unique()}
+    return reasons.map(labels)
+
+
+def tag_issues(resolution: UtmResolution) -> pd.DataFrame:
+    """Distinct tags that are invalid or off-convention, with the sessions they carry."""
+    tags = resolution.tags
+    issues = tags[tags["reasons"] != 0]
+    return issues.assign(reasons=tag_reason_labels(issues["reasons"]).to_numpy())
+
+
+def attribution(sessions: pd.DataFrame, by=None) -> pd.DataFrame:
+    """Sessions per plan channel (with its funnel stage), optionally split by another column."""
+    keys = [sessions["channel"], sessions["funnel"]] + ([sessions[by]] if by else [])
+    counts = sessions.groupby(keys, observed=True).size()
+    names = ["Channel", "Funnel"] + ([by.title()] if by else [])
+    return counts.rename_axis(names).reset_index(name="Sessions")
+
+
+# -----------------------------
+# Sample tags (no logs yet / benchmarks)
+# -----------------------------
+# (utm query string, relative weight); the misses are typical hand-built links
+SAMPLE_TAGS = [
+    ("", 30),
+    ("gclid=EAIaIQobChMI", 6),
+    ("utm_source=linkedin&utm_medium=paid_social&utm_campaign=tofu_awareness_hr-leads", 14),
+    ("utm_source=linkedin&utm_medium=paid_social&utm_campaign=tofu_awareness_compliance", 8),
+    ("utm_source=youtube&utm_medium=video&utm_campaign=tofu_awareness_shorts", 5),
+    ("utm_source=google&utm_medium=video&utm_campaign=tofu_awareness_instream", 2),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=mofu_generic_serious-games", 9),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=mofu_dsa", 3),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=mofu_rlsa_site-visitors", 4),
+    ("utm_source=linkedin&utm_medium=paid_social&utm_campaign=mofu_retargeting_conversation", 5),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=bofu_brand", 4),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=bofu_comp_nl", 2),
+    ("utm_source=LinkedIn&utm_medium=Paid_Social&utm_campaign=TOFU_Awareness_HR-Leads", 2),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=tofu_rlsa_site-visitors", 1),
+    ("utm_source=linkedin&utm_medium=social&utm_campaign=tofu_awareness_hr-leads", 2),
+    ("utm_source=facebook&utm_medium=paid_social&utm_campaign=tofu_awareness_lookalike", 1),
+    ("utm_source=google&utm_medium=cpc&utm_campaign=q3+brand+push", 1),
+    ("utm_source=linkedin&utm_campaign=mofu_retargeting_webinar", 1),
+    ("utm_source=newsletter&utm_medium=email&utm_campaign=mofu_webinar%E9", 1),
+]
+SAMPLE_PAGES = ("https://www.ranj.com/", "https://www.ranj.com/serious-games", "https://www.ranj.com/demo",
+                "https://www.ranj.com/blog/compliance-training")
+
+
+def sample_landing_urls(n: int, seed: int = 0) -> np.ndarray:
+    """Synthetic landing URLs: SAMPLE_TAGS on a few pages, auto-tagged links with a unique gclid."""
+    rng = np.random.default_rng(seed)
+    weights = np.array([w for _, w in SAMPLE_TAGS], dtype=float)
+    tag = rng.choice(len(SAMPLE_TAGS), n, p=weights / weights.sum())
+    page = rng.integers(0, len(SAMPLE_PAGES), n)
+    queries = np.array([q for q, _ in SAMPLE_TAGS], dtype=object)
+    pages = np.array(SAMPLE_PAGES, dtype=object)
+    urls = np.where(queries[tag] == "", pages[page], pages[page] + "?" + queries[tag])
+    gclid = queries[tag] == SAMPLE_TAGS[1][0]
+    urls[gclid] = urls[gclid] + pd.Series(rng.integers(0, 1 << 40, int(gclid.sum()))).map("{:x}".format).to_numpy()
+    return urls
@@ -1,37 +1,25 @@
-import os, sys, re
+import os, sys
 import pandas as pd
-import altair as alt
 import streamlit as st
 
-# Make root helpers importable
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from app import card_start, card_end, kpi_chip, inject_google_css
-
-# ✅ Use global page config from app.py; just inject CSS here
-inject_google_css()
+# Make root helpers importable (once: the page body reruns on every interaction)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+from ui import altair_chart, card_start, card_end, kpi_chip, lazy_tabs, page_setup, paged_table
 
+from gtm.accounts import FACETS, FacetIndex, cached_index
+from gtm.chartdata import fit
+from gtm.ingest import file_key, find_table, load_with_fallback, reports_frame
+from gtm.keywords import cached_clusters, keyword_files
+from gtm.tiering import ICP_TIERS
 
+page_setup()
 
 
 st.title("Part 1 – Research & Prep (Behavior Change Focus)")
 
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-
-# ---------- Utilities ----------
-@st.cache_data
-def load_csv(path: str, fallback_df: pd.DataFrame) -> pd.DataFrame:
-    try:
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            return df
-        return fallback_df.copy()
-    except Exception:
-        return fallback_df.copy()
-
-def df_exists(name: str) -> bool:
-    return os.path.exists(os.path.join(DATA_DIR, name))
-
 # ---------- Fallback (mock) data for non-market blocks ----------
 channel_fallback = pd.DataFrame({
     "channel": ["LinkedIn","Google Search","YouTube","Bing Search"],
@@ -58,10 +46,15 @@ competitors_fallback = pd.DataFrame({
     "gap":["Customization depth","Gamification depth","Behavior-change proof","Custom simulations","US presence nascent; references to adapt"],
 })
 
-# Load CSVs for non-market blocks if present
-channel_df = load_csv(os.path.join(DATA_DIR, "channel_reach.csv"), channel_fallback)
-icp_df = load_csv(os.path.join(DATA_DIR, "icp_mock.csv"), icp_fallback)
-competitors_df = load_csv(os.path.join(DATA_DIR, "competitors.csv"), competitors_fallback)
+# Load data/ tables (CSV / Parquet / Arrow) if present; cache follows file mtime + size
+channel_df, channel_report = load_with_fallback("channel_reach", channel_fallback)
+icp_df, icp_report = load_with_fallback("icp_mock", icp_fallback)
+competitors_df, competitors_report = load_with_fallback("competitors", competitors_fallback)
+load_reports = [channel_report, icp_report, competitors_report]
+
+for r in load_reports:
+    if r.error:
+        st.warning(f"Could not load `{r.path}`: {r.error}. Showing built-in data instead.")
 
 # =========================
 # Real market data (from sources you shared)
@@ -101,20 +94,84 @@ budget_growth_df = pd.DataFrame({
     "Avg_Company_Training_Budget_MUSD": [AVG_BUDGET_PREV_M, AVG_BUDGET_CURR_M]
 })
 
-# ---------- Tabs ----------
-tab_a, tab_b, tab_c, tab_d, tab_e = st.tabs([
-    "Market Research",
-    "Channel Reach",
-    "ICP Explorer",
-    "Competitors",
-    "What We Need"
-])
+# ---------- Account universe (fragment: a filter change reruns only this block) ----------
+@st.fragment
+def account_explorer(index: FacetIndex):
+    st.subheader("🔎 Account Universe")
+    # counts next to each option: what picking it would give with the other filters as they are
+    selection = {facet: st.session_state.get(f"accounts_{facet}", []) for facet in FACETS}
+    facets = list(FACETS.items())
+    for row in (facets[:3], facets[3:]):
+        for col, (facet, label) in zip(st.columns(len(row)), row):
+            counts = index.facet_counts(facet, selection)
+            col.multiselect(label, index.values[facet], key=f"accounts_{facet}", placeholder="All",
+                            format_func=lambda v, counts=counts: f"{v} ({counts[v]:,})")
+
+    mask = index.select(selection)
+    matched = index.count(mask)
+    tier_a = index.count(mask & index.bitmaps["tier"][index.values["tier"].index("A")]) if "A" in index.values["tier"] else 0
+    k1, k2, k3 = st.columns(3)
+    with k1: kpi_chip("Accounts", f"{matched:,}")
+    with k2: kpi_chip("Of universe", f"{matched / max(index.n, 1):.1%}")
+    with k3: kpi_chip("Tier A", f"{tier_a:,}", "green")
+
+    # tier counts under the current filters (tier x use case, from the bitmaps)
+    import altair as alt
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar().encode(
+            x=alt.X("accounts:Q", title="Accounts (log scale)", scale=alt.Scale(type="log")),
+            y=alt.Y("use_case:N", title=None, sort=alt.EncodingSortField("tier")),
+            color=alt.Color("tier:N", title="Tier", scale=alt.Scale(domain=["A", "B", "C"],
+                                                                     range=["#34a853", "#4285f4", "#adb5bd"])),
+            tooltip=["tier", "use_case", alt.Tooltip("accounts:Q", format=",")]
+        ).properties(height=220, title="Accounts per tier and behavioral use case"),
+        index.cross_counts("tier", "use_case", mask),
+    )
+    paged_table(index.df if matched == index.n else index.frame(mask), "account_matches", hide_index=True)
+
+# ---------- ICP picker (fragment: a selection reruns only this block) ----------
+@st.fragment
+def icp_picker(tiers_df: pd.DataFrame, persona_df: pd.DataFrame):
+    st.subheader("🎯 Explore ICP by Industry & Role")
+    selected_industry = st.selectbox("Select Industry", sorted(tiers_df["Industry"].unique()))
+    selected_role = st.selectbox("Select Role", sorted(persona_df["Role"].unique()))
+
+    # Filter logic
+    ind_row = tiers_df[tiers_df["Industry"] == selected_industry].iloc[0]
+    role_row = persona_df[persona_df["Role"] == selected_role].iloc[0]
+
+    # Display cards
+    st.markdown("### Selected Industry")
+    st.markdown(f"""
+    <div class="g-card">
+    <h4>{ind_row['Industry']}</h4>
+    <ul>
+      <li><b>Tier:</b> {ind_row['Tier']}</li>
+      <li><b>Company Size:</b> {ind_row['Company Size']}</li>
+      <li><b>Region:</b> {ind_row['Region']}</li>
+      <li><b>Key Roles:</b> {ind_row['Key Roles']}</li>
+      <li><b>Behavioral Use Case:</b> {ind_row['Behavioral Use Case']}</li>
+    </ul>
+    </div>
+    """, unsafe_allow_html=True)
 
+    st.markdown("### Selected Role")
+    st.markdown(f"""
+    <div class="g-card">
+    <h4>{role_row['Role']}</h4>
+    <ul>
+      <li><b>Decision Power:</b> {role_row['Decision Power']}</li>
+      <li><b>Behavior KPI:</b> {role_row['Behavior KPI']}</li>
+      <li><b>Proof Needed:</b> {role_row['Proof Needed']}</li>
+    </ul>
+    </div>
+    """, unsafe_allow_html=True)
 
 # =======================
 # A) MARKET RESEARCH
 # =======================
-with tab_a:
+def market_tab():
+    import altair as alt
     card_start("US & Global Market Snapshot (Behavior Outcomes Lens)", "Grounded in third-party data and tied to measurable behavior change")
 
     # KPI chips (behavior-oriented labeling)
@@ -130,13 +187,14 @@ with tab_a:
     col_top_left, col_top_right = st.columns([1.2, 1])
     with col_top_left:
         st.subheader("Regional Share (NA vs Rest)")
-        st.altair_chart(
-            alt.Chart(region_split_df).mark_arc(outerRadius=120).encode(
+        altair_chart(
+            lambda df: alt.Chart(fit(df, "Regional Share", category="Region", value="SharePct"))
+            .mark_arc(outerRadius=120).encode(
                 theta="SharePct:Q",
                 color=alt.Color("Region:N", legend=alt.Legend(title="Region")),
                 tooltip=["Region","SharePct"]
             ).properties(height=320),
-            use_container_width=True
+            region_split_df,
         )
 
     # ---- Behavior-focused regional narrative
@@ -173,13 +231,15 @@ with tab_a:
         "2024": [1207, 1420, 826, 722],
     })
     melted = per_learner_by_size.melt(id_vars="CompanySize", var_name="Year", value_name="USD_per_learner")
-    perchart = alt.Chart(melted).mark_bar().encode(
-        x=alt.X("CompanySize:N", title=None),
-        y=alt.Y("USD_per_learner:Q", title="USD per employee (behavioral enablement)"),
-        color=alt.Color("Year:N", legend=alt.Legend(title="Year")),
-        tooltip=["CompanySize","Year","USD_per_learner"]
-    ).properties(height=340)
-    st.altair_chart(perchart, use_container_width=True)
+    def perchart(df):
+        df = fit(df, "Investment per Employee by Size", category="CompanySize", value="USD_per_learner", by="Year")
+        return alt.Chart(df).mark_bar().encode(
+            x=alt.X("CompanySize:N", title=None),
+            y=alt.Y("USD_per_learner:Q", title="USD per employee (behavioral enablement)"),
+            color=alt.Color("Year:N", legend=alt.Legend(title="Year")),
+            tooltip=["CompanySize","Year","USD_per_learner"]
+        ).properties(height=340)
+    altair_chart(perchart, melted)
     st.markdown("""
 **Behavioral takeaway:** Smaller and midsize companies invest **more per employee** than very large enterprises — ideal for validating **behavior deltas** (pre/post) such as **time-to-competence** and **adherence**. Overall investment rose to **~$1,200** per employee in 2024.
 """)
@@ -206,21 +266,15 @@ with tab_a:
 # =======================
 # B) CHANNEL REACH
 # =======================
-with tab_b:
+def channel_tab():
     card_start("Channel Reach & Role (to Drive Behavior Change)", "Audience potential, CPC ranges, and how each channel contributes to behavior outcomes")
     st.caption("Note: Reach/CPCs are indicative; replace with platform-estimated numbers for final client deck.")
 
-    # --- Deep-dive tabs for LinkedIn, Google Search & YouTube ---
-    sub_li, sub_g, sub_y = st.tabs([
-        "LinkedIn (Your Audience Estimate)",
-        "Google Search (Keyword Planner)",
-        "YouTube (Video Reach)"
-    ])
-
     # --------------------------------
     # LINKEDIN (from your screenshots)
     # --------------------------------
-    with sub_li:
+    def linkedin_subtab():
+        import altair as alt
         st.caption("Source: Your LinkedIn Campaign Manager estimates (United States).")
 
         li_total_us = 270_000_000        # All US members
@@ -236,13 +290,14 @@ with tab_b:
         li_function_share["Est_Audience"] = (li_function_share["SharePct"]/100.0) * li_icp_est
 
         st.subheader("LinkedIn ICP Breakdown by Function")
-        st.altair_chart(
-            alt.Chart(li_function_share).mark_bar().encode(
+        altair_chart(
+            lambda df: alt.Chart(fit(df, "LinkedIn ICP by Function", category="Function", value="Est_Audience"))
+            .mark_bar().encode(
                 x=alt.X("Function:N", title=None),
                 y=alt.Y("Est_Audience:Q", title="Estimated Audience"),
                 tooltip=["Function","SharePct","Est_Audience"]
             ).properties(height=330),
-            use_container_width=True
+            li_function_share,
         )
 
         st.dataframe(li_function_share, use_container_width=True)
@@ -262,7 +317,8 @@ with tab_b:
     # --------------------------------
     # GOOGLE SEARCH (Keyword Planner)
     # --------------------------------
-    with sub_g:
+    def google_subtab():
+        import altair as alt
         st.caption("Source: Google Ads Keyword Planner (US targeting). Currency in GBP as exported.")
 
         google_clusters = pd.DataFrame([
@@ -282,23 +338,39 @@ with tab_b:
             },
         ])
 
+        # --- Keyword Planner exports in data/keywords/ replace the hand-built clusters
+        exports = keyword_files()
+        if exports:
+            clustered, errors = cached_clusters(tuple(file_key(p) for p in exports))
+            for error in errors:
+                st.warning(f"Skipped a keyword export: {error}")
+            if len(clustered):
+                google_clusters = clustered
+                st.caption(f"{int(clustered['Keywords'].sum()):,} keywords from {len(exports) - len(errors)} export(s) "
+                           f"in {len(clustered):,} clusters (MinHash/LSH on word stems).")
+        else:
+            st.caption("Drop Keyword Planner exports (CSV) into `data/keywords/` to cluster your own keyword lists.")
+
         st.subheader("Google Search Keyword Clusters")
-        st.altair_chart(
-            alt.Chart(google_clusters).mark_bar().encode(
+        altair_chart(
+            lambda df: alt.Chart(fit(df, "Google Keyword Clusters", category="Cluster", value="Avg_Monthly_Searches",
+                                     sum_columns=["Keywords"]))
+            .mark_bar().encode(
                 x=alt.X("Cluster:N", title=None),
                 y=alt.Y("Avg_Monthly_Searches:Q", title="Avg Monthly Searches"),
-                tooltip=list(google_clusters.columns)
+                tooltip=list(df.columns)
             ).properties(height=330),
-            use_container_width=True
+            google_clusters,
         )
 
-        st.dataframe(google_clusters, use_container_width=True)
+        paged_table(google_clusters, "google_clusters")
         st.write("**Use case:** Capture **high-intent** queries and route to **behavioral proof assets** (case studies showing incident reduction, time-to-competence, first-time-right).")
 
     # -------------------------------
     # YOUTUBE (benchmarked reach)
     # -------------------------------
-    with sub_y:
+    def youtube_subtab():
+        import altair as alt
         st.caption("Benchmarks for US. Narrowed ICP = HR/L&D/Compliance/Ops interests & in-market segments.")
 
         yt_df = pd.DataFrame([
@@ -308,13 +380,13 @@ with tab_b:
         ])
 
         st.subheader("YouTube Estimated Reach")
-        st.altair_chart(
-            alt.Chart(yt_df).mark_bar().encode(
+        altair_chart(
+            lambda df: alt.Chart(fit(df, "YouTube Estimated Reach", category="Segment", value="Reach_est")).mark_bar().encode(
                 x=alt.X("Segment:N", title=None),
                 y=alt.Y("Reach_est:Q", title="Estimated Reach"),
                 tooltip=["Segment","Reach_est"]
             ).properties(height=330),
-            use_container_width=True
+            yt_df,
         )
 
         st.dataframe(yt_df, use_container_width=True)
@@ -323,26 +395,40 @@ with tab_b:
         kpi_chip("Benchmark CPM", "$10–15", "green")
         st.write("**Best use:** TOFU awareness that **shows behavior in action** (decision branches, consequences), paired with **remarketing** to BOFU demo offers.")
 
+    # --- Deep-dive tabs for LinkedIn, Google Search & YouTube (only the open one runs) ---
+    lazy_tabs({
+        "LinkedIn (Your Audience Estimate)": linkedin_subtab,
+        "Google Search (Keyword Planner)": google_subtab,
+        "YouTube (Video Reach)": youtube_subtab,
+    }, key="research_channel_tab")
+
     card_end()
 
 
 # =======================
 # C) ICP EXPLORER
 # =======================
-with tab_c:
+def icp_tab():
     card_start("ICP Explorer", "Explore ideal customer profiles by tier, role, and region (behavior-first)")
 
     # --- Tiered ICP view ---
     st.subheader("ICP Tiers (Behavior Use Cases)")
-    icp_df = pd.DataFrame([
-        {"Tier": "A", "Industry": "Banking/Financial Services", "Company Size": "1,000–9,999", "Region": "US Northeast", "Key Roles": "CHRO, Compliance Director", "Behavioral Use Case": "Policy adherence, audit-ready behaviors"},
-        {"Tier": "A", "Industry": "Healthcare", "Company Size": "1,000–9,999", "Region": "Midwest", "Key Roles": "CHRO, L&D Director", "Behavioral Use Case": "Faster onboarding; procedure fidelity"},
-        {"Tier": "A", "Industry": "Manufacturing / HSE", "Company Size": "1,000–9,999", "Region": "Midwest", "Key Roles": "HSE, Ops VP", "Behavioral Use Case": "Safety incident reduction; SOP adherence"},
-        {"Tier": "A", "Industry": "Tech / IT", "Company Size": "1,000–9,999", "Region": "West Coast", "Key Roles": "L&D, CHRO", "Behavioral Use Case": "Digital skill adoption; secure behaviors"},
-        {"Tier": "B", "Industry": "FMCG / Retail", "Company Size": "500–999 or 10,000+", "Region": "National", "Key Roles": "HR, Ops, Sales Enablement", "Behavioral Use Case": "Frontline consistency; CX behaviors"},
-        {"Tier": "B", "Industry": "Education / Public Sector", "Company Size": "500–999 or 10,000+", "Region": "National", "Key Roles": "HR, Compliance", "Behavioral Use Case": "Culture/DEI adoption; policy reinforcement"},
-    ])
-    st.dataframe(icp_df, use_container_width=True)
+    tiers_df = ICP_TIERS    # also the rules accounts are tiered by (gtm/tiering.py)
+    paged_table(tiers_df, "icp_tiers")
+
+    st.divider()
+
+    # --- Account universe: data/accounts.* when present, else a mock US universe
+    accounts_path = find_table("accounts")
+    index, error = cached_index(file_key(accounts_path) if accounts_path else None)
+    if error:
+        st.warning(f"Could not load `{accounts_path}`: {error}. Showing the mock account universe instead.")
+    elif accounts_path is None:
+        st.caption(f"Mock universe of {index.n:,} US accounts. Drop an account list (industry, employees, region, "
+                   "tier, role) into `data/accounts.csv` / `.parquet` to explore your own.")
+    account_explorer(index)
+    with st.expander(f"ICP segments (`data/icp_mock`, {icp_report.source})"):
+        paged_table(icp_df, "icp_segments", hide_index=True)
 
     st.divider()
 
@@ -369,40 +455,7 @@ with tab_c:
     st.dataframe(persona_df, use_container_width=True)
 
     # --- Interactive filter widget ---
-    st.subheader("🎯 Explore ICP by Industry & Role")
-    selected_industry = st.selectbox("Select Industry", sorted(icp_df["Industry"].unique()))
-    selected_role = st.selectbox("Select Role", sorted(persona_df["Role"].unique()))
-
-    # Filter logic
-    ind_row = icp_df[icp_df["Industry"] == selected_industry].iloc[0]
-    role_row = persona_df[persona_df["Role"] == selected_role].iloc[0]
-
-    # Display cards
-    st.markdown("### Selected Industry")
-    st.markdown(f"""
-    <div class="g-card">
-    <h4>{ind_row['Industry']}</h4>
-    <ul>
-      <li><b>Tier:</b> {ind_row['Tier']}</li>
-      <li><b>Company Size:</b> {ind_row['Company Size']}</li>
-      <li><b>Region:</b> {ind_row['Region']}</li>
-      <li><b>Key Roles:</b> {ind_row['Key Roles']}</li>
-      <li><b>Behavioral Use Case:</b> {ind_row['Behavioral Use Case']}</li>
-    </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("### Selected Role")
-    st.markdown(f"""
-    <div class="g-card">
-    <h4>{role_row['Role']}</h4>
-    <ul>
-      <li><b>Decision Power:</b> {role_row['Decision Power']}</li>
-      <li><b>Behavior KPI:</b> {role_row['Behavior KPI']}</li>
-      <li><b>Proof Needed:</b> {role_row['Proof Needed']}</li>
-    </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    icp_picker(tiers_df, persona_df)
 
     st.divider()
 
@@ -422,7 +475,8 @@ with tab_c:
 # =======================
 # D) COMPETITORS
 # =======================
-with tab_d:
+def competitors_tab():
+    import altair as alt
     card_start("Competitors Landscape", "Direct & indirect competitors in the US (behavior impact vs content delivery)")
 
     st.subheader("Competitive Positioning Matrix")
@@ -435,17 +489,18 @@ with tab_d:
         {"Company": "Docebo", "Type": "Enterprise LMS", "Engagement": 5, "Presence": 8},
     ])
 
-    chart = alt.Chart(competitors_df).mark_circle(size=300).encode(
-        x=alt.X("Engagement:Q", scale=alt.Scale(domain=[0,10])),
-        y=alt.Y("Presence:Q", scale=alt.Scale(domain=[0,10])),
-        color=alt.Color("Type:N", legend=alt.Legend(title="Type")),
-        tooltip=["Company","Type","Engagement","Presence"]
-    ).properties(height=400)
-
-    st.altair_chart(chart, use_container_width=True)
+    altair_chart(
+        lambda df: alt.Chart(fit(df, "Competitive Positioning")).mark_circle(size=300).encode(
+            x=alt.X("Engagement:Q", scale=alt.Scale(domain=[0,10])),
+            y=alt.Y("Presence:Q", scale=alt.Scale(domain=[0,10])),
+            color=alt.Color("Type:N", legend=alt.Legend(title="Type")),
+            tooltip=["Company","Type","Engagement","Presence"]
+        ).properties(height=400),
+        competitors_df,
+    )
 
     st.subheader("Competitor Overview Table")
-    st.dataframe(competitors_df, use_container_width=True)
+    paged_table(competitors_df, "competitors")
 
     with st.expander("ℹ️ Scoring Methodology (Click to expand)"):
         st.markdown("""
@@ -475,7 +530,7 @@ with tab_d:
     # =======================
 # E) WHAT WE NEED
 # =======================
-with tab_e:
+def needs_tab():
     card_start("What We Need Before Launching Paid Strategy", "Checklist to ensure data, targeting, and creative foundations are in place")
 
     st.markdown("""
@@ -502,3 +557,18 @@ with tab_e:
     st.info("✅ Once this foundation is in place, campaigns can launch with reduced risk of wasted spend, ensuring early learnings are reliable and scalable.")
 
     card_end()
+
+
+# ---------- Tabs (lazy: only the open tab is built and sent) ----------
+# Tabs with charts import altair themselves, so the cold import waits for the first chart
+lazy_tabs({
+    "Market Research": market_tab,
+    "Channel Reach": channel_tab,
+    "ICP Explorer": icp_tab,
+    "Competitors": competitors_tab,
+    "What We Need": needs_tab,
+}, key="research_tab")
+
+with st.expander("Data sources (load report)"):
+    st.dataframe(reports_frame(load_reports), use_container_width=True, hide_index=True)
+    st.caption("`file` = read from `data/` (cached until the file changes), `fallback` = built-in data.")
@@ -1,67 +1,33 @@
-import os, sys, re
+import os, sys
 import pandas as pd
-import altair as alt
 import streamlit as st
 
-# Make root helpers importable
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from app import card_start, card_end, kpi_chip, inject_google_css
+# Make root helpers importable (once: the page body reruns on every interaction)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+from ui import altair_chart, card_start, card_end, kpi_chip, page_setup, paged_table
+from gtm.channels import parent_channel
+from gtm.chartdata import fit
+from gtm.estimation import estimate_frame
+from gtm.ranges import parse_range_columns, parsed_columns
+from gtm.scenarios import (
+    SWEEP_MIN_EUR, SWEEP_MAX_EUR, SWEEP_STEP_EUR, budget_levels, scale_plan, sweep_plan, with_pct,
+)
 
-# ✅ Use global page config from app.py; just inject CSS here
-inject_google_css()
+page_setup()
 
 
 st.title("Part 2 – Paid Marketing Strategy (Behavior Change Launch)")
 
 # -----------------------------
-# Helpers for estimation
+# Helpers for charts
 # -----------------------------
-def _mid_range_num(txt: str) -> float | None:
-    """Return midpoint of a range like '€45–65' or '0.8–1.2%' (as numeric, % => decimal). '—' -> None."""
-    if txt is None: return None
-    s = str(txt).strip()
-    if s in ("—", "-", ""): return None
-    s = s.replace("€", "").replace(",", "").replace(" ", "")
-    # Extract percents, note % handling after numbers found
-    pct = s.endswith("%")
-    s = s.replace("%", "")
-    parts = re.split(r"[–-]", s)  # split on en-dash or hyphen
-    try:
-        if len(parts) == 1:
-            val = float(parts[0])
-        else:
-            val = (float(parts[0]) + float(parts[1])) / 2.0
-        if pct:
-            val = val / 100.0
-        return val
-    except Exception:
-        return None
-
-def estimate_row_impr_clicks(budget_eur: float, cpm_txt: str, cpc_txt: str, ctr_txt: str) -> tuple[float, float]:
-    """
-    Estimate impressions & clicks for a single line using whatever is available:
-    - If CPM present -> Impr = budget / (CPM/1000); if CTR present -> Clicks = Impr * CTR
-    - Else if CPC present -> Clicks = budget / CPC; if CTR present -> Impr = Clicks / CTR
-    - Else fallback zeros
-    """
-    cpm = _mid_range_num(cpm_txt)
-    cpc = _mid_range_num(cpc_txt)
-    ctr = _mid_range_num(ctr_txt)
-
-    impr = 0.0
-    clicks = 0.0
-
-    if cpm:  # we can get impressions
-        impr = budget_eur / (cpm / 1000.0)
-        if ctr:
-            clicks = impr * ctr
-    elif cpc:  # no CPM, but CPC given
-        clicks = budget_eur / cpc
-        if ctr and ctr > 0:
-            impr = clicks / ctr
-    return impr, clicks
-
+# altair is imported where charts are built, not at page import (cold import is the slowest step);
+# slices past the top few are folded into "Other" before the data goes into the spec
 def donut_chart(df, field, value_field, title):
+    import altair as alt
+    df = fit(df, title, category=field, value=value_field)
     chart = alt.Chart(df).mark_arc(innerRadius=70).encode(
         theta=alt.Theta(f"{value_field}:Q"),
         color=alt.Color(f"{field}:N", legend=alt.Legend(title=field)),
@@ -70,15 +36,14 @@ def donut_chart(df, field, value_field, title):
     return chart
 
 # -----------------------------
-# 1) PAID MEDIA CHANNEL SCENARIOS
+# Plan data (shared by sections 1–2)
 # -----------------------------
-card_start("1) Budget Overview by Channel & Funnel", "Two investment scenarios with clear funnel roles")
-
 # IMPORTANT: Corrections applied
 # - LinkedIn Retargeting moved to MOFU (engagement/capture)
 # - BOFU is Google Search (Exact/Branded/Competitor) to hit high intent
 
-scenario_15k = pd.DataFrame([
+# Base mix (€15K / month); every other budget level keeps these proportions
+base_plan = pd.DataFrame([
     {"Funnel": "TOFU (Create Demand)", "Channel": "LinkedIn (Awareness)", "Budget": 6000},
     {"Funnel": "TOFU (Create Demand)", "Channel": "YouTube (Awareness)",   "Budget": 2000},
 
@@ -89,140 +54,156 @@ scenario_15k = pd.DataFrame([
     {"Funnel": "BOFU (Convert High Intent)", "Channel": "Google Search – Exact/Branded/Competitor", "Budget": 1000},
 ])
 
-scenario_30k = pd.DataFrame([
-    {"Funnel": "TOFU (Create Demand)", "Channel": "LinkedIn (Awareness)", "Budget": 12000},
-    {"Funnel": "TOFU (Create Demand)", "Channel": "YouTube (Awareness)",   "Budget": 4000},
-
-    {"Funnel": "MOFU (Capture/Engage)", "Channel": "Google Search – Text Ads (Generic)", "Budget": 6000},
-    {"Funnel": "MOFU (Capture/Engage)", "Channel": "Google Search – RLSA (Retargeting)", "Budget": 2000},
-    {"Funnel": "MOFU (Capture/Engage)", "Channel": "LinkedIn (Retargeting: Text/Conversation)", "Budget": 4000},
-
-    {"Funnel": "BOFU (Convert High Intent)", "Channel": "Google Search – Exact/Branded/Competitor", "Budget": 2000},
-])
-
-def with_pct(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    total = out["Budget"].sum()
-    out["%Budget"] = (out["Budget"] / total * 100).round(1)
-    return out
-
-scenario_map = {
-    "€15K / month": with_pct(scenario_15k),
-    "€30K / month": with_pct(scenario_30k),
-}
-
-sel = st.radio("Select scenario", list(scenario_map.keys()), horizontal=True)
-df_sel = scenario_map[sel]
-total_budget = int(df_sel["Budget"].sum())
-
-# Dynamic ratio by funnel
-ratio_df = df_sel.groupby("Funnel", as_index=False)["Budget"].sum()
-ratio_df["Pct"] = (ratio_df["Budget"] / ratio_df["Budget"].sum() * 100).round(0)
-ratio_str = " • ".join([f"{r['Funnel'].split(' ')[0]}: {int(r['Pct'])}%" for _, r in ratio_df.iterrows()])
-
-c1, c2, c3 = st.columns([1,1,1])
-with c1: kpi_chip("Total Budget", f"€{total_budget:,}")
-with c2: kpi_chip("Create / Capture / Convert", ratio_str, "yellow")
-with c3: kpi_chip("Primary Channels", "LinkedIn • Google • YouTube", "green")
-
-st.dataframe(df_sel, use_container_width=True)
-
-
-# --- NEW: Donut for budget share by channel ---
-# Normalize channels to parent (LinkedIn / Google / YouTube)
-def parent_channel(name: str) -> str:
-    if "LinkedIn" in name: return "LinkedIn"
-    if "YouTube" in name: return "YouTube"
-    return "Google"
-
-budget_by_channel = (
-    df_sel.assign(Parent=df_sel["Channel"].map(parent_channel))
-         .groupby("Parent", as_index=False)["Budget"].sum()
-)
-st.altair_chart(
-    donut_chart(budget_by_channel, "Parent", "Budget", "Budget Share by Channel"),
-    use_container_width=True
-)
-
-st.caption("**Changes applied:** LinkedIn retargeting now **MOFU**; **BOFU** focuses on **Search Exact/Branded** for highest intent conversion.")
-
-card_end()
-
-# -----------------------------
-# 2) OVERVIEW – CAMPAIGN TYPES (formats split + Google retargeting)
-# -----------------------------
-card_start("2) Campaign Type Overview", "Formats, segmentation, and estimated delivery metrics")
-
-overview_df = pd.DataFrame([
-    # TOFU
-    {"Channel":"LinkedIn","Funnel Stage":"TOFU","Campaign Type":"LinkedIn Awareness","Format / Ad Type":"Thought Leadership Posts",
-     "Segmentation":"Job Titles + Industry + Company Size (1k–10k, 10k+)",
-     "Budget":3000,"CPC":"€6–9","CPM":"€40–60","CTR":"0.6–1.0%"},
-    {"Channel":"LinkedIn","Funnel Stage":"TOFU","Campaign Type":"LinkedIn Awareness","Format / Ad Type":"Video Ads",
-     "Segmentation":"Same as above",
-     "Budget":3000,"CPC":"€6–9","CPM":"€45–65","CTR":"0.8–1.2%"},
-    {"Channel":"YouTube","Funnel Stage":"TOFU","Campaign Type":"YouTube Awareness","Format / Ad Type":"Shorts / In-stream",
-     "Segmentation":"Affinity & professional interests (HR/L&D/Compliance)",
-     "Budget":2000,"CPC":"—","CPM":"€10–15","CTR":"0.4–0.7%"},
-    # MOFU
-    {"Channel":"Google","Funnel Stage":"MOFU","Campaign Type":"Google Search","Format / Ad Type":"Text Ads (Generic)",
-     "Segmentation":"KWs: serious games, simulation training, gamified learning",
-     "Budget":3000,"CPC":"€3–7","CPM":"—","CTR":"3–5%"},
-    {"Channel":"Google","Funnel Stage":"MOFU","Campaign Type":"Google Search (Retargeting)","Format / Ad Type":"RLSA (Search audiences)",
-     "Segmentation":"Site visitors + YouTube/LinkedIn engagers",
-     "Budget":1000,"CPC":"€3–6","CPM":"—","CTR":"4–6%"},
-    {"Channel":"LinkedIn","Funnel Stage":"MOFU","Campaign Type":"LinkedIn Retargeting","Format / Ad Type":"Text/Conversation Ads",
-     "Segmentation":"Website visitors & video viewers (90 days)",
-     "Budget":2000,"CPC":"€5–8","CPM":"€30–50","CTR":"1.0–1.8%"},
-    # BOFU
-    {"Channel":"Google","Funnel Stage":"BOFU","Campaign Type":"Google Search","Format / Ad Type":"Exact/Branded/Competitor",
-     "Segmentation":"Exact brand + competitors; high-intent",
-     "Budget":1000,"CPC":"€3–6","CPM":"—","CTR":"5–8%"},
-])
-
-# Scale budgets for 30k scenario
-if "€30K" in sel:
-    overview_df = overview_df.copy()
-    overview_df["Budget"] = (overview_df["Budget"] * 2).astype(int)
-
-# Estimate impressions & clicks per row
-est_rows = []
-for _, r in overview_df.iterrows():
-    impr, clicks = estimate_row_impr_clicks(
-        budget_eur=float(r["Budget"]),
-        cpm_txt=r["CPM"],
-        cpc_txt=r["CPC"],
-        ctr_txt=r["CTR"],
+BASE_TOTAL = int(base_plan["Budget"].sum())
+
+@st.cache_data
+def load_overview() -> pd.DataFrame:
+    # Benchmark ranges are parsed once here into numeric CPC/CPM/CTR _low/_mid/_high columns
+    plan = pd.DataFrame([
+        # TOFU
+        {"Channel":"LinkedIn","Funnel Stage":"TOFU","Campaign Type":"LinkedIn Awareness","Format / Ad Type":"Thought Leadership Posts",
+         "Segmentation":"Job Titles + Industry + Company Size (1k–10k, 10k+)",
+         "Budget":3000,"CPC":"€6–9","CPM":"€40–60","CTR":"0.6–1.0%"},
+        {"Channel":"LinkedIn","Funnel Stage":"TOFU","Campaign Type":"LinkedIn Awareness","Format / Ad Type":"Video Ads",
+         "Segmentation":"Same as above",
+         "Budget":3000,"CPC":"€6–9","CPM":"€45–65","CTR":"0.8–1.2%"},
+        {"Channel":"YouTube","Funnel Stage":"TOFU","Campaign Type":"YouTube Awareness","Format / Ad Type":"Shorts / In-stream",
+         "Segmentation":"Affinity & professional interests (HR/L&D/Compliance)",
+         "Budget":2000,"CPC":"—","CPM":"€10–15","CTR":"0.4–0.7%"},
+        # MOFU
+        {"Channel":"Google","Funnel Stage":"MOFU","Campaign Type":"Google Search","Format / Ad Type":"Text Ads (Generic)",
+         "Segmentation":"KWs: serious games, simulation training, gamified learning",
+         "Budget":3000,"CPC":"€3–7","CPM":"—","CTR":"3–5%"},
+        {"Channel":"Google","Funnel Stage":"MOFU","Campaign Type":"Google Search (Retargeting)","Format / Ad Type":"RLSA (Search audiences)",
+         "Segmentation":"Site visitors + YouTube/LinkedIn engagers",
+         "Budget":1000,"CPC":"€3–6","CPM":"—","CTR":"4–6%"},
+        {"Channel":"LinkedIn","Funnel Stage":"MOFU","Campaign Type":"LinkedIn Retargeting","Format / Ad Type":"Text/Conversation Ads",
+         "Segmentation":"Website visitors & video viewers (90 days)",
+         "Budget":2000,"CPC":"€5–8","CPM":"€30–50","CTR":"1.0–1.8%"},
+        # BOFU
+        {"Channel":"Google","Funnel Stage":"BOFU","Campaign Type":"Google Search","Format / Ad Type":"Exact/Branded/Competitor",
+         "Segmentation":"Exact brand + competitors; high-intent",
+         "Budget":1000,"CPC":"€3–6","CPM":"—","CTR":"5–8%"},
+    ])
+    return parse_range_columns(plan)
+
+# Funnel / parent-channel totals are grouped once for the base mix; every budget level keeps
+# the mix, so a slider move only rescales O(groups) rows
+@st.cache_resource
+def plan_rollups() -> dict:
+    mix = base_plan.assign(funnel=base_plan["Funnel"].str.split(" ").str[0],
+                           parent=base_plan["Channel"].map(parent_channel), spend=base_plan["Budget"])
+    est = estimate_frame(load_overview())
+    overview = est.assign(parent=est["Campaign Type"].map(parent_channel), spend=est["Budget"],
+                          impressions=est["Impressions_est"], clicks=est["Clicks_est"])
+    return {
+        "funnel": mix.groupby("funnel", sort=False, as_index=False)["spend"].sum(),
+        "parent": mix.groupby("parent", sort=False, as_index=False)["spend"].sum(),
+        "overview_parent": overview.groupby("parent", sort=False, as_index=False)[["spend", "impressions", "clicks"]].sum(),
+    }
+
+# Sections 1–2 follow the budget slider; as a fragment, moving it reruns only these two cards
+@st.fragment
+def budget_sections():
+    # -----------------------------
+    # 1) PAID MEDIA CHANNEL SCENARIOS
+    # -----------------------------
+    card_start("1) Budget Overview by Channel & Funnel", "Any monthly investment level with clear funnel roles")
+
+    total_sel = st.slider(
+        "Monthly budget (€)", SWEEP_MIN_EUR, SWEEP_MAX_EUR, BASE_TOTAL, step=SWEEP_STEP_EUR, format="€%d",
     )
-    est_rows.append({"Impressions_est": impr, "Clicks_est": clicks})
-est_df = pd.DataFrame(est_rows)
-overview_df = pd.concat([overview_df.reset_index(drop=True), est_df], axis=1)
-
-# Human-readable columns
-display_df = overview_df.copy()
-display_df["Clicks (est)"] = display_df["Clicks_est"].round().astype(int)
-display_df["Impressions (est)"] = display_df["Impressions_est"].round().astype(int)
-display_df = display_df.drop(columns=["Clicks_est","Impressions_est"])
-
-st.dataframe(display_df, use_container_width=True)
-st.caption("Benchmarks are directional (based on LinkedIn screenshots + research). Replace with live platform estimates before launch.")
-
-# --- NEW: Donuts for estimated impressions & clicks by channel ---
-by_channel = overview_df.groupby("Channel", as_index=False)[["Impressions_est","Clicks_est","Budget"]].sum()
-
-c1, c2 = st.columns(2)
-with c1:
-    st.altair_chart(
-        donut_chart(by_channel.rename(columns={"Impressions_est":"Impressions"}), "Channel", "Impressions", "Est. Impressions by Channel"),
-        use_container_width=True
-    )
-with c2:
-    st.altair_chart(
-        donut_chart(by_channel.rename(columns={"Clicks_est":"Clicks"}), "Channel", "Clicks", "Est. Clicks by Channel"),
-        use_container_width=True
+    df_sel = with_pct(scale_plan(base_plan, total_sel))
+    total_budget = int(df_sel["Budget"].sum())
+
+    rollups = plan_rollups()
+    scale = total_sel / BASE_TOTAL
+
+    # Dynamic ratio by funnel (shares do not change with the level)
+    ratio_df = rollups["funnel"]
+    pct = (ratio_df["spend"] / ratio_df["spend"].sum() * 100).round(0)
+    ratio_str = " • ".join(f"{f}: {int(p)}%" for f, p in zip(ratio_df["funnel"], pct))
+
+    c1, c2, c3 = st.columns([1,1,1])
+    with c1: kpi_chip("Total Budget", f"€{total_budget:,}")
+    with c2: kpi_chip("Create / Capture / Convert", ratio_str, "yellow")
+    with c3: kpi_chip("Primary Channels", "LinkedIn • Google • YouTube", "green")
+
+    paged_table(df_sel, "budget_plan")
+
+
+    # --- NEW: Donut for budget share by channel ---
+    # Normalize channels to parent (LinkedIn / Google / YouTube)
+    budget_by_channel = pd.DataFrame({
+        "Parent": rollups["parent"]["parent"],
+        "Budget": (rollups["parent"]["spend"] * scale).round(),
+    })
+    altair_chart(donut_chart, budget_by_channel, "Parent", "Budget", "Budget Share by Channel")
+
+    st.caption("**Changes applied:** LinkedIn retargeting now **MOFU**; **BOFU** focuses on **Search Exact/Branded** for highest intent conversion.")
+
+    card_end()
+
+    # -----------------------------
+    # 2) OVERVIEW – CAMPAIGN TYPES (formats split + Google retargeting)
+    # -----------------------------
+    card_start("2) Campaign Type Overview", "Formats, segmentation, and estimated delivery metrics")
+
+    overview_df = load_overview()
+
+    # Scale budgets to the selected level (same mix)
+    base_overview_df = overview_df
+    if total_sel != BASE_TOTAL:
+        overview_df = scale_plan(overview_df, total_sel, base_total=BASE_TOTAL)
+
+    # Estimate impressions & clicks for all rows at once (CPM first, CPC fallback)
+    overview_df = estimate_frame(overview_df.reset_index(drop=True))
+
+    # Human-readable columns
+    display_df = overview_df.copy()
+    display_df["Clicks (est)"] = display_df["Clicks_est"].round().astype(int)
+    display_df["Impressions (est)"] = display_df["Impressions_est"].round().astype(int)
+    display_df = display_df.drop(columns=["Clicks_est","Impressions_est"] + parsed_columns())
+
+    paged_table(display_df, "campaign_overview")
+    st.caption("Benchmarks are directional (based on LinkedIn screenshots + research). Replace with live platform estimates before launch.")
+
+    # --- NEW: Donuts for estimated impressions & clicks by channel ---
+    # estimates are linear in budget: rescale the base rollup instead of regrouping the rows
+    parent = rollups["overview_parent"]
+    by_channel = pd.DataFrame({
+        "Channel": parent["parent"],
+        "Impressions_est": parent["impressions"] * scale,
+        "Clicks_est": parent["clicks"] * scale,
+        "Budget": (parent["spend"] * scale).round(),
+    })
+
+    c1, c2 = st.columns(2)
+    with c1:
+        altair_chart(donut_chart, by_channel.rename(columns={"Impressions_est":"Impressions"}), "Channel", "Impressions", "Est. Impressions by Channel")
+    with c2:
+        altair_chart(donut_chart, by_channel.rename(columns={"Clicks_est":"Clicks"}), "Channel", "Clicks", "Est. Clicks by Channel")
+
+    import altair as alt
+
+    # --- Spend curve: every budget level of this mix in one vectorized sweep (cached by input hash)
+    st.subheader("Spend Curve (€5K – €500K)")
+    curve = sweep_plan(base_overview_df, budget_levels(), group_col="Channel")
+    altair_chart(
+        lambda df, budget: alt.Chart(df).mark_line().encode(
+            x=alt.X("Budget:Q", title="Monthly budget (€)"),
+            y=alt.Y("Clicks:Q", title="Est. clicks"),
+            color=alt.Color("Channel:N"),
+            tooltip=["Budget", "Channel", alt.Tooltip("Clicks:Q", format=",.0f"), alt.Tooltip("Impressions:Q", format=",.0f")]
+        ).properties(height=300)
+        + alt.Chart(pd.DataFrame({"Budget": [budget]})).mark_rule(strokeDash=[4, 4]).encode(x="Budget:Q"),
+        curve, total_sel,
     )
+    st.caption("Benchmark CPC/CPM/CTR midpoints scale linearly with spend; use Part 4 for diminishing returns.")
 
-card_end()
+    card_end()
+
+budget_sections()
 
 # -----------------------------
 # 3) CONTENT FRAMEWORK (formats separated)
@@ -270,7 +251,7 @@ content_df = pd.DataFrame([
      "AD DESTINATION":"Demo LP","Links to Visuals":"—","KPIs":"CVR, CPA, SQO rate"},
 ])
 
-st.dataframe(content_df, use_container_width=True)
+paged_table(content_df, "content_plan")
 st.info("Narrative: **Create** demand with LI/YouTube, **Capture** with Google + LinkedIn retargeting, **Convert** with high-intent exact/branded search. Measure pre/post **behavior deltas** (adherence, incidents, time-to-competence).")
 
 card_end()
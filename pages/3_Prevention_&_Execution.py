@@ -1,14 +1,33 @@
-import os, sys, re
+import os, sys
 import pandas as pd
-import altair as alt
 import streamlit as st
 
-# Make root helpers importable
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from app import card_start, card_end, kpi_chip, inject_google_css
+# Make root helpers importable (once: the page body reruns on every interaction)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+from ui import altair_chart, card_start, card_end, kpi_chip, page_setup, paged_table
+from gtm.anomaly import (
+    Z_THRESHOLD, bot_bursts, detect, minute_series, monitoring_files, read_monitoring_files, sample_minutes,
+)
+from gtm.blocklist import BlocklistWatcher
+from gtm.chartdata import fit
+from gtm.clickfraud import (
+    EXCLUDE_MIN_FLAGGED, PLACEMENT_MAX_INVALID, RAPID_CLICKS, RAPID_WINDOW_S, REPEAT_WINDOW_S, cached_scan,
+    click_files,
+)
+from gtm.emails import (
+    classify_emails, classify_leads, domain_list_files, domain_sets, flagged_domains, lead_files, lead_quality,
+    sample_leads,
+)
+from gtm.ingest import file_key
+from gtm.traffic import (
+    BOT_THRESHOLD, daily_status, normalize_events, reason_counts, reason_labels, sample_events, score_logs,
+    score_sessions, session_partials, traffic_files,
+)
+from gtm.utm import STATUSES, attribution, resolve_urls, tag_issues
 
-# ✅ Use global page config from app.py; just inject CSS here
-inject_google_css()
+page_setup()
 
 
 
@@ -50,6 +69,314 @@ st.markdown("""
 
 card_end()
 
+# =======================
+# Traffic validation: the rules above, run on session logs
+# =======================
+# GA4 / GTM event exports in data/traffic/ (re-scored when a file or an extra domain list changes);
+# sample traffic otherwise. Only summaries are cached: the scored session table can run to millions of rows.
+@st.cache_data(show_spinner="Scoring sessions…")
+def load_traffic(keys: tuple, blocklist_version: tuple, _blocklist, domain_keys: tuple) -> dict:
+    domains = domain_sets()
+    if keys:
+        scored, report = score_logs([k[0] for k in keys], blocklist=_blocklist, domains=domains)
+        errors = report.errors
+    else:
+        scored = score_sessions(session_partials(normalize_events(sample_events())), blocklist=_blocklist,
+                                domains=domains)
+        errors = ()
+    worst = scored[scored["status"] == "filtered"].nlargest(200, "bot_score")
+    utm = resolve_urls(scored["landing"])
+    return {
+        "sessions": len(scored),
+        "filtered": int((scored["status"] == "filtered").sum()),
+        "daily": daily_status(scored),
+        "reasons": reason_counts(scored),
+        "worst": worst.assign(reasons=reason_labels(worst["reasons"]).to_numpy())[
+            ["duration_s", "pageviews", "max_scroll", "email", "ip", "bot_score", "reasons"]
+            + (["blocklist"] if "blocklist" in worst else [])].reset_index(),
+        "errors": errors,
+        "utm_status": utm.sessions["status"].value_counts().reindex(list(STATUSES), fill_value=0).to_dict(),
+        "utm_channels": attribution(utm.sessions.assign(traffic=scored["status"].to_numpy()), by="traffic"),
+        "utm_issues": tag_issues(utm),
+        "utm_urls": utm.urls,
+    }
+
+# IP / device blocklists in data/blocklists/: the watcher lives for the server process and
+# rebuilds the index only when a list file changes (each run just stats the files)
+@st.cache_resource
+def blocklist_watcher() -> BlocklistWatcher:
+    return BlocklistWatcher()
+
+blocklist = blocklist_watcher().current()
+traffic_paths = traffic_files()
+domain_keys = tuple(file_key(p) for p in domain_list_files())
+traffic = load_traffic(tuple(file_key(p) for p in traffic_paths), blocklist.report, blocklist, domain_keys)
+
+card_start("🔎 Traffic Validation — Clean vs. Filtered", "The GA4/GTM validation rules above, scored per session")
+if not traffic_paths:
+    st.caption("Sample traffic. Drop GA4/GTM event exports (CSV or Parquet) into `data/traffic/` to score your own sessions.")
+for err in traffic["errors"]:
+    st.warning(err)
+bl = blocklist.report
+if bl.lists:
+    st.caption(f"Blocklists ({', '.join(bl.lists)}): {bl.v4_ranges:,} IPv4 and {bl.v6_ranges:,} IPv6 ranges, "
+               f"{bl.devices:,} device IDs. Edits in `data/blocklists/` are picked up on the next run.")
+
+clean = traffic["sessions"] - traffic["filtered"]
+t1, t2, t3 = st.columns(3)
+with t1: kpi_chip("Sessions", f"{traffic['sessions']:,}")
+with t2: kpi_chip("Clean", f"{clean:,}", "green")
+with t3: kpi_chip("Filtered", f"{traffic['filtered'] / max(traffic['sessions'], 1):.1%}", "red")
+
+import altair as alt  # deferred: only needed once the charts are built
+
+v1, v2 = st.columns([1.4, 1])
+with v1:
+    # long histories are binned into multi-day bars before they go into the spec
+    altair_chart(
+        lambda df: alt.Chart(fit(df, "Sessions per day", x="Day", y="Sessions", by="Status", bins=True)).mark_bar().encode(
+            x=alt.X("Day:T", title=None),
+            y=alt.Y("Sessions:Q"),
+            color=alt.Color("Status:N", scale=alt.Scale(domain=["clean", "filtered"], range=["#34a853", "#ea4335"])),
+            tooltip=["Day:T", "Status", "Sessions"]
+        ).properties(height=260, title="Sessions per day"),
+        traffic["daily"],
+    )
+with v2:
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar().encode(
+            x=alt.X("Filtered:Q", title="Filtered sessions"),
+            y=alt.Y("Reason:N", title=None, sort="-x"),
+            tooltip=["Reason", "Filtered", "Clean"]
+        ).properties(height=260, title="Why sessions were filtered"),
+        traffic["reasons"],
+    )
+st.caption(
+    f"Bot score = noisy-OR of the triggered rule weights; sessions scoring ≥ {BOT_THRESHOLD:.1f} are filtered. "
+    "A session can trigger several rules."
+)
+with st.expander("Highest-scoring filtered sessions"):
+    paged_table(traffic["worst"], "worst_sessions", hide_index=True)
+
+card_end()
+
+# Landing-URL UTM tags -> the Part 4 plan channels (gtm.utm); tags off the taxonomy are listed, not guessed
+card_start("🏷️ UTM Attribution — Sessions by Plan Channel", "Landing-page utm_source / utm_medium / utm_campaign, same sessions as above")
+utm_status = traffic["utm_status"]
+u1, u2, u3 = st.columns(3)
+with u1: kpi_chip("Attributed", f"{utm_status['resolved']:,}", "green")
+with u2: kpi_chip("Untagged", f"{utm_status['untagged']:,}")
+with u3: kpi_chip("Invalid tags", f"{utm_status['invalid']:,}", "red")
+
+a1, a2 = st.columns([1.4, 1])
+with a1:
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar().encode(
+            x=alt.X("Sessions:Q"),
+            y=alt.Y("Channel:N", title=None, sort=list(dict.fromkeys(df["Channel"]))),
+            color=alt.Color("Traffic:N", scale=alt.Scale(domain=["clean", "filtered"], range=["#34a853", "#ea4335"])),
+            tooltip=["Channel", "Funnel", "Traffic", "Sessions"]
+        ).properties(height=260, title="Sessions per plan channel"),
+        traffic["utm_channels"],
+    )
+with a2:
+    st.markdown("**Invalid / off-convention tags**")
+    paged_table(traffic["utm_issues"], "utm_issues", hide_index=True)
+st.caption(
+    f"{traffic['utm_urls']:,} distinct landing URLs. Tags follow `utm_campaign=<funnel>_<type>[_…]` "
+    "(e.g. `mofu_rlsa_site-visitors`); FUNNEL_MISMATCH and NOT_LOWERCASE tags still count for their channel, "
+    "invalid tags count for none."
+)
+
+card_end()
+
+# =======================
+# Lead email quality: "exclusion of free/invalid email domains" over the CRM / form-fill history
+# =======================
+# CRM / form exports in data/leads/ (re-classified when a file or an extra domain list changes);
+# a sample history otherwise
+@st.cache_data(show_spinner="Classifying lead emails…")
+def load_leads(keys: tuple, domain_keys: tuple) -> dict:
+    free, disposable = domain_sets()
+    if keys:
+        classified, errors = classify_leads([k[0] for k in keys], free, disposable)
+    else:
+        classified, errors = classify_emails(sample_leads(), free, disposable), []
+    return {
+        "breakdown": lead_quality(classified),
+        "domains": flagged_domains(classified),
+        "leads": len(classified),
+        "distinct": int(classified["normalized"].nunique()),
+        "errors": errors,
+    }
+
+lead_paths = lead_files()
+leads = load_leads(tuple(file_key(p) for p in lead_paths), domain_keys)
+
+card_start("📧 Lead Email Quality", "Business email required: how much of the lead history would pass")
+if not lead_paths:
+    st.caption("Sample form-fill history. Drop CRM or form exports with an email column (CSV or Parquet) "
+               "into `data/leads/` to check your own leads.")
+for err in leads["errors"]:
+    st.warning(err)
+
+breakdown = leads["breakdown"]
+share = breakdown.set_index("Category")["Share"]
+l1, l2, l3, l4 = st.columns(4)
+with l1: kpi_chip("Leads", f"{leads['leads']:,}")
+with l2: kpi_chip("Business email", f"{share['business'] + share['role']:.1%}", "green")
+with l3: kpi_chip("Free / disposable", f"{share['free'] + share['disposable']:.1%}", "red")
+with l4: kpi_chip("Invalid / empty", f"{share['invalid'] + share['missing']:.1%}", "red")
+
+q1, q2 = st.columns([1, 1])
+with q1:
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar().encode(
+            x=alt.X("Leads:Q"),
+            y=alt.Y("Category:N", title=None, sort=list(df["Category"])),
+            color=alt.Color("Category:N", legend=None, scale=alt.Scale(
+                domain=["missing", "invalid", "disposable", "free", "role", "business"],
+                range=["#adb5bd", "#ea4335", "#fa7b17", "#fbbc04", "#4285f4", "#34a853"])),
+            tooltip=["Category", "Leads", "Distinct", alt.Tooltip("Share:Q", format=".1%")]
+        ).properties(height=240, title="Leads by email category"),
+        breakdown,
+    )
+with q2:
+    st.markdown("**Top free / disposable domains**")
+    paged_table(leads["domains"], "lead_domains", hide_index=True)
+st.caption(
+    f"{leads['distinct']:,} distinct addresses after normalisation (case, whitespace, +tags, Gmail dots). "
+    "Role inboxes (info@, sales@ …) on business domains pass but rarely reach a decision maker."
+)
+
+card_end()
+
+# =======================
+# Traffic anomalies: "GA4 anomaly detection" over per-minute sessions / clicks / conversions
+# =======================
+# Per-minute monitoring exports in data/monitoring/ (timestamp, channel, sessions/clicks/conversions);
+# a Phase 1 sample with injected bot bursts otherwise. The chart series are cut to hourly bins.
+@st.cache_data(show_spinner="Scanning traffic for anomalies…")
+def load_anomalies(keys: tuple) -> dict:
+    minutes, errors = read_monitoring_files([k[0] for k in keys])
+    sample = minutes is None
+    series = minute_series(sample_minutes()[0] if sample else minutes)
+    windows = detect(series)
+    origin = pd.to_datetime(series.minutes[0] * 60, unit="s") if len(series.minutes) else pd.Timestamp(0)
+    binned = pd.DataFrame(series.values, columns=pd.MultiIndex.from_tuples(series.labels, names=["Channel", "Metric"]),
+                          index=pd.to_datetime(series.minutes * 60, unit="s")).resample("1h").sum()
+    return {
+        "windows": windows,
+        "bursts": bot_bursts(windows),
+        "series": len(series.labels),
+        "points": series.values.size,
+        "origin": origin,
+        "chart": binned.stack(["Channel", "Metric"]).rename("Value").rename_axis(["Time", "Channel", "Metric"]).reset_index(),
+        "sample": sample,
+        "errors": errors,
+    }
+
+anomalies = load_anomalies(tuple(file_key(p) for p in monitoring_files()))
+
+card_start("📈 Traffic Anomalies — Phase 1 Monitoring",
+           "Per-minute sessions, clicks and conversions per channel against seasonal baselines")
+if anomalies["sample"]:
+    st.caption("Sample Phase 1 traffic with injected bot bursts. Drop per-minute exports (timestamp, channel, "
+               "sessions / clicks / conversions) into `data/monitoring/` to scan your own.")
+for err in anomalies["errors"]:
+    st.warning(err)
+
+a1, a2, a3 = st.columns(3)
+with a1: kpi_chip("Series monitored", f"{anomalies['series']:,}")
+with a2: kpi_chip("Flagged windows", f"{len(anomalies['windows']):,}")
+with a3: kpi_chip("Bot bursts", f"{anomalies['bursts'][['channel', 'start']].drop_duplicates().shape[0]:,}", "red")
+
+# channel picker as a fragment: switching channels redraws only this chart
+@st.fragment
+def anomaly_chart(chart: pd.DataFrame, windows: pd.DataFrame):
+    channel = st.selectbox("Channel", sorted(chart["Channel"].unique()))
+
+    def build(series, flagged):
+        hourly = fit(series, "Traffic anomalies", x="Time", y="Value", by="Metric")
+        lines = alt.Chart(hourly).mark_line(strokeWidth=1).encode(
+            x=alt.X("Time:T", title=None),
+            y=alt.Y("Value:Q", title="Per hour"),
+            color=alt.Color("Metric:N", scale=alt.Scale(domain=["sessions", "clicks", "conversions"],
+                                                         range=["#4285f4", "#fbbc04", "#34a853"])),
+            tooltip=["Time:T", "Metric", "Value"]
+        )
+        shade = alt.Chart(flagged).mark_rect(color="#ea4335", opacity=0.25).encode(
+            x="start:T", x2="end:T", tooltip=["metric", "start:T", "end:T", "minutes", "peak_z"]
+        )
+        return (shade + lines).properties(height=260)
+
+    altair_chart(build, chart[chart["Channel"] == channel], windows[windows["channel"] == channel])
+
+anomaly_chart(anomalies["chart"], anomalies["windows"])
+st.caption(
+    f"Each series is scored against its hour-of-day baseline (robust EWMA); minutes with z ≥ {Z_THRESHOLD:.0f} "
+    "are merged into the shaded windows. Bot bursts = sessions or clicks spiking with no matching rise in conversions."
+)
+with st.expander("Flagged windows"):
+    paged_table(anomalies["windows"], "anomaly_windows", hide_index=True)
+
+card_end()
+
+# =======================
+# Click-fraud scan: the "Lunio / TrafficGuard" layer, run locally over click logs
+# =======================
+# Click logs in data/clicks/ (landing sessions from data/traffic/ when they carry IPs); sample clicks
+# otherwise. cached_scan is a process-wide memo, so Part 4 reuses the same scan.
+click_paths = click_files()
+scan = cached_scan(tuple(file_key(p) for p in click_paths), tuple(file_key(p) for p in traffic_paths))
+exclusions = scan.exclusions
+
+card_start("🧹 Click-Fraud Scan — Exclusion List", "Sliding-window click counters per IP, device and placement")
+if not click_paths:
+    st.caption("Sample click log with bot bursts. Drop click logs (timestamp, ip, and optionally device_id, "
+               "ad_id, placement, channel, cost) into `data/clicks/` to scan your own.")
+for err in scan.errors:
+    st.warning(err)
+
+kinds = exclusions["kind"].value_counts()
+c1, c2, c3, c4 = st.columns(4)
+with c1: kpi_chip("Clicks scanned", f"{scan.clicks:,}")
+with c2: kpi_chip("Flagged", f"{scan.flagged / max(scan.clicks, 1):.1%}", "red")
+with c3: kpi_chip("IPs / devices excluded", f"{kinds.get('ip', 0):,} / {kinds.get('device', 0):,}", "red")
+with c4: kpi_chip("Placements excluded", f"{kinds.get('placement', 0):,}", "red")
+
+f1, f2 = st.columns([1, 1])
+with f1:
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar(color="#ea4335").encode(
+            x=alt.X("clicks:Q", title="Flagged clicks"),
+            y=alt.Y("reason:N", title=None, sort="-x"),
+            tooltip=["reason", "clicks"]
+        ).properties(height=200, title="Why clicks were flagged"),
+        scan.reasons,
+    )
+with f2:
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar(color="#fa7b17").encode(
+            x=alt.X("excluded_share:Q", title="Excluded clicks", axis=alt.Axis(format="%")),
+            y=alt.Y("channel:N", title=None, sort="-x"),
+            tooltip=["channel", "clicks", "excluded", alt.Tooltip("excluded_cost:Q", format=",.0f")]
+        ).properties(height=200, title="Excluded share per channel"),
+        scan.channels,
+    )
+st.caption(
+    f"A click is flagged for ≥ {RAPID_CLICKS} clicks from one IP or device within {RAPID_WINDOW_S} s, the same "
+    f"viewer clicking the same ad again within {REPEAT_WINDOW_S // 60} min, or repeated clicks that never land a "
+    f"session. IPs and devices with ≥ {EXCLUDE_MIN_FLAGGED} flagged clicks and placements with "
+    f"≥ {PLACEMENT_MAX_INVALID:.0%} flagged clicks are excluded; Part 4 can take these clicks out of its numbers."
+)
+with st.expander(f"Exclusion list ({len(exclusions):,})"):
+    paged_table(exclusions, "click_exclusions", hide_index=True)
+    st.download_button("Download exclusion list (CSV)", exclusions.to_csv(index=False).encode(),
+                       "click_exclusions.csv", "text/csv")
+
+card_end()
+
 # =======================
 # 2) EXECUTION PLAN – TIMELINE
 # =======================
@@ -67,17 +394,35 @@ timeline_data = pd.DataFrame([
     {"Phase": "Phase 3 — Expand", "Start": 4, "End": 8, "Label": "Month 2+"},
 ])
 
-timeline_chart = alt.Chart(timeline_data).mark_bar().encode(
-    x=alt.X("Start:Q", title=None),
-    x2="End:Q",
-    y=alt.Y("Phase:N", title=None),
-    tooltip=["Phase", "Label"]
-).properties(
-    width=700,
-    height=200
-)
+# Phase 1 monitoring: bot bursts found above, placed on the timeline (weeks since monitoring began)
+bursts = anomalies["bursts"].drop_duplicates(["channel", "start"])
+burst_data = pd.DataFrame({
+    "Phase": "Phase 1 — Validate",
+    "Week": (bursts["start"] - anomalies["origin"]).dt.total_seconds() / (7 * 86400),
+    "Channel": bursts["channel"],
+    "Start": bursts["start"],
+    "Minutes": bursts["minutes"],
+})
+
+
+def timeline_chart(phases, marks):
+    bars = alt.Chart(phases).mark_bar().encode(
+        x=alt.X("Start:Q", title=None),
+        x2="End:Q",
+        y=alt.Y("Phase:N", title=None),
+        tooltip=["Phase", "Label"]
+    ).properties(
+        width=700,
+        height=200
+    )
+    ticks = alt.Chart(marks).mark_tick(color="#ea4335", thickness=2, size=28).encode(
+        x="Week:Q", y="Phase:N", tooltip=["Channel", "Start:T", "Minutes"]
+    )
+    return bars + ticks
+
 
-st.altair_chart(timeline_chart, use_container_width=True)
+altair_chart(timeline_chart, timeline_data, burst_data)
+st.caption("Red ticks: bot bursts flagged by the anomaly monitor during Phase 1.")
 
 
 # ---- Horizontal timeline (Phase 1 → Phase 2 → Phase 3)
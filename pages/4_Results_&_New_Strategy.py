@@ -1,18 +1,27 @@
 # pages/4_Performance_Review.py
 
-import altair as alt
-import os, sys, re
+import os, sys
 import pandas as pd
-import altair as alt
-from math import floor
 import streamlit as st
 
-# Make root helpers importable
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from app import card_start, card_end, kpi_chip, inject_google_css
+# Make root helpers importable (once: the page body reruns on every interaction)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+from ui import altair_chart, card_start, card_end, kpi_chip, page_setup, paged_table
+from gtm.simulation import (
+    BASE_BUDGETS, GLOBAL_CVR, MC_DRAWS, CHANNEL_FUNNEL, monte_carlo, simulate_performance,
+)
+from gtm.chartdata import fit
+from gtm.clickfraud import apply_exclusions, cached_scan, click_files
+from gtm.exports import actuals_performance, export_files, ingest_exports, reports_frame
+from gtm.ingest import file_key
+from gtm.negatives import cached_negatives, list_files, report_files
+from gtm.optimizer import optimizer_from_benchmarks
+from gtm.scenarios import SWEEP_MIN_EUR, SWEEP_MAX_EUR, SWEEP_STEP_EUR, budget_levels, sweep_simulation, tofu_shift
+from gtm.traffic import traffic_files
 
-# ✅ Use global page config from app.py; just inject CSS here
-inject_google_css()
+page_setup()
 
 
 st.title("Part 4 – Performance Review (Simulated)")
@@ -24,105 +33,51 @@ st.caption(
     "Simulated results based on the proposed plan. "
     "Assumes LinkedIn/YouTube underperform on clicks (−40%) and global CVR = 1.0%."
 )
-scenario = st.radio("Select budget scenario", ["€15K / month", "€30K / month"], horizontal=True, index=0)
-
-# Proposed monthly budgets per channel (aligned with Part 2 corrections)
-base_budgets = {
-    "LinkedIn – Awareness": 6000,
-    "YouTube – Awareness": 2000,
-    "Google Search – Generic (MOFU)": 3000,
-    "Google Search – RLSA (MOFU)": 1000,
-    "LinkedIn – Retargeting (MOFU)": 2000,
-    "Google Search – Exact/Brand/Comp (BOFU)": 1000,
-}
-scale = 2 if "€30K" in scenario else 1
-budgets = {k: v * scale for k, v in base_budgets.items()}
-
-# -----------------------------
-# Benchmarks & simulation rules
-# -----------------------------
-# Base CPC/CPM midpoints (euros)
-benchmarks = {
-    "LinkedIn – Awareness": {"cpc": 8.0, "cpm": 55.0},
-    "YouTube – Awareness": {"cpc": 3.5, "cpm": 13.0},
-    "Google Search – Generic (MOFU)": {"cpc": 5.8, "cpm": None},
-    "Google Search – RLSA (MOFU)": {"cpc": 4.8, "cpm": None},
-    "LinkedIn – Retargeting (MOFU)": {"cpc": 6.2, "cpm": 42.0},
-    "Google Search – Exact/Brand/Comp (BOFU)": {"cpc": 4.5, "cpm": None},
-}
-
-# Underperformance: only LinkedIn & YouTube (−40% clicks → higher effective CPC; +20% CPM)
-UNDERPERFORM_CLICK_CHANNELS = {
-    "LinkedIn – Awareness",
-    "LinkedIn – Retargeting (MOFU)",
-    "YouTube – Awareness",
-}
-CLICK_REDUCTION_FACTOR = 0.60            # 40% fewer clicks than naive expectation
-CPC_INFLATE_FOR_UNDERPERF = 1 / 0.60     # ≈ 1.6667, keeps Spend ≈ Clicks × CPC
-CPM_INFLATE_FOR_UNDERPERF = 1.20         # +20% CPM on LI/YT
+BASE_TOTAL = sum(BASE_BUDGETS.values())
+total_sel = st.slider(
+    "Monthly budget (€)", SWEEP_MIN_EUR, SWEEP_MAX_EUR, BASE_TOTAL, step=SWEEP_STEP_EUR, format="€%d",
+)
 
-GLOBAL_CVR = 0.01   # 1% global conversion rate
+scale = total_sel / BASE_TOTAL
+budgets = {k: v * scale for k, v in BASE_BUDGETS.items()}
 
 # -----------------------------
 # Build simulated performance
 # -----------------------------
-rows = []
-for ch, spend in budgets.items():
-    base_cpc = benchmarks[ch]["cpc"]
-    base_cpm = benchmarks[ch]["cpm"]
-
-    # Apply underperformance adjustments to LI & YT (not to Google Search)
-    if ch in UNDERPERFORM_CLICK_CHANNELS:
-        eff_cpc = base_cpc * CPC_INFLATE_FOR_UNDERPERF if base_cpc else None
-        eff_cpm = base_cpm * CPM_INFLATE_FOR_UNDERPERF if base_cpm else None
-    else:
-        eff_cpc = base_cpc
-        eff_cpm = base_cpm
-
-    # Compute clicks from spend and effective CPC (Spend ≈ Clicks × CPC)
-    clicks = (spend / eff_cpc) if eff_cpc else 0
-
-    # Impressions:
-    if eff_cpm:  # LI/YT (CPM known)
-        impressions = spend / (eff_cpm / 1000.0)
-        ctr = (clicks / impressions) if impressions > 0 else 0.0
-    else:
-        # Search: derive impressions from assumed CTR (keep stable for intent)
-        assumed_ctr = 0.035 if "Generic" in ch else 0.055  # ~3.5% generic, ~5.5% exact/brand/comp
-        impressions = clicks / assumed_ctr if assumed_ctr > 0 else 0
-        ctr = assumed_ctr
-
-    rows.append({
-        "Channel": ch,
-        "Spend (€)": round(spend, 2),
-        "CPC (€)": round(eff_cpc, 2) if eff_cpc else "—",
-        "CPM (€)": round(eff_cpm, 2) if eff_cpm else "—",
-        "Impressions": int(impressions),
-        "Clicks": int(clicks),
-        "CTR": ctr,  # decimal
-    })
-
-df = pd.DataFrame(rows)
-
-# Force global CVR across the whole mix (distribute by click share)
-total_clicks = max(df["Clicks"].sum(), 1)
-total_conversions = max(int(round(total_clicks * GLOBAL_CVR)), 1)
-df["Click Share"] = df["Clicks"] / total_clicks
-df["Conversions"] = (df["Click Share"] * total_conversions).round().astype(int)
-
-# Ensure at least 1 conversion in highest-intent Search Exact/Brand/Comp
-if df.loc[df["Channel"].str.contains("Exact/Brand/Comp"), "Conversions"].sum() == 0:
-    idx = df.index[df["Channel"].str.contains("Exact/Brand/Comp")][0]
-    df.at[idx, "Conversions"] = 1
-    # Rebalance if rounding drift
-    drift = total_conversions - df["Conversions"].sum()
-    if drift != 0:
-        idx_top = df["Clicks"].idxmax()
-        df.at[idx_top, "Conversions"] = max(df.at[idx_top, "Conversions"] + drift, 0)
-
-# CPA & SQLs (SQLs ≈ 30% of conversions)
-df["CPA (€)"] = df.apply(lambda r: (r["Spend (€)"] / r["Conversions"]) if r["Conversions"] > 0 else None, axis=1)
-df["SQLs"] = (df["Conversions"] * 0.30).round().astype(int)
+# Rules live in gtm.simulation: LI/YT click underperformance & CPM inflation, Search impressions
+# from assumed CTR, global CVR apportioned by click share (≥1 on Exact/Brand/Comp)
+df = simulate_performance(budgets)
+
+# Actuals: Google Ads / LinkedIn / YouTube exports in data/exports/, streamed in chunks
+# (re-read only when a file's mtime or size changes)
+# into a fact store; the page only reads its per-channel and per-week rollups
+@st.cache_data(show_spinner="Streaming ad-platform exports…")
+def load_actuals(keys: tuple) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    store, reports = ingest_exports([k[0] for k in keys])
+    return actuals_performance(store), reports_frame(reports), store.rollup("week")
+
+export_paths = export_files()
+actuals = export_paths and st.radio(
+    "Data source", ["Simulated", "Actuals (ad-platform exports)"], horizontal=True,
+) != "Simulated"
+if actuals:
+    df, export_report, weekly = load_actuals(tuple(file_key(p) for p in export_paths))
+    if export_report["error"].notna().any():
+        st.warning("Some exports could not be read: " + "; ".join(export_report["error"].dropna()))
+    with st.expander(f"Exports ({len(export_paths)} file(s), {int(export_report['rows'].sum()):,} rows)"):
+        paged_table(export_report, "export_report", hide_index=True)
+        st.caption("Unmapped rows: campaigns no channel rule in gtm.exports matched (not in the totals). "
+                   "SQLs are estimated from conversions.")
+
+# Part 3's click-fraud scan (the same process-wide memo that page uses): each channel loses its
+# excluded share of clicks; spend stays, so CPC rises and the spend on those clicks shows as Wasted (€)
+excluded = st.toggle("🧹 Apply click-fraud exclusions (Part 3)",
+                     help="Takes invalid clicks (flagged IPs / devices, excluded placements) out of Clicks, CPC and CTR")
+if excluded:
+    scan = cached_scan(tuple(file_key(p) for p in click_files()), tuple(file_key(p) for p in traffic_files()))
+    df = apply_exclusions(df, scan.channels)
+    st.caption(f"{int(df['Invalid clicks'].sum()):,} invalid clicks excluded; "
+               f"€{df['Wasted (€)'].sum():,.0f} of spend went to them.")
 
 # -----------------------------
 # KPI chips
@@ -131,41 +86,129 @@ k1, k2, k3, k4 = st.columns(4)
 with k1: kpi_chip("Spend (month)", f"€{int(df['Spend (€)'].sum()):,}")
 with k2: kpi_chip("Impressions", f"{int(df['Impressions'].sum()):,}")
 with k3: kpi_chip("Clicks", f"{int(df['Clicks'].sum()):,}")
-with k4: kpi_chip("Global CVR", f"{GLOBAL_CVR*100:.1f}%", "yellow")
+if actuals:
+    with k4: kpi_chip("CVR", f"{df['Conversions'].sum() / max(df['Clicks'].sum(), 1) * 100:.2f}%", "yellow")
+else:
+    with k4: kpi_chip("Global CVR", f"{GLOBAL_CVR*100:.1f}%", "yellow")
 
 # =======================
 # 1) Simulated Performance Stats
 # =======================
-card_start("1) Simulated Performance (Weeks 1–4)", "LI/YT click underperformance (−40%); CPM inflated; CVR fixed at 1%")
+if actuals:
+    card_start("1) Actual Performance (ad-platform exports)", "Campaigns mapped to the six plan channels")
+else:
+    card_start("1) Simulated Performance (Weeks 1–4)", "LI/YT click underperformance (−40%); CPM inflated; CVR fixed at 1%")
 display_cols = ["Channel","Spend (€)","CPC (€)","CPM (€)","Impressions","Clicks","CTR","Conversions","CPA (€)","SQLs"]
+if excluded:
+    display_cols[6:6] = ["Invalid clicks", "Wasted (€)"]
 df_display = df.copy()
 df_display["CTR"] = (df_display["CTR"] * 100).round(2).astype(str) + "%"
+for col in ("CPC (€)", "CPM (€)"):
+    df_display[col] = df_display[col].apply(lambda x: x if pd.notnull(x) else "—")
 df_display["CPA (€)"] = df_display["CPA (€)"].apply(lambda x: f"€{x:,.0f}" if pd.notnull(x) else "—")
-st.dataframe(df_display[display_cols], use_container_width=True)
+paged_table(df_display[display_cols], "channel_results")
+
+# Quick visuals (altair imported here, after the KPIs and table are on screen)
+import altair as alt
 
-# Quick visuals
 c1, c2 = st.columns(2)
 with c1:
     st.subheader("Impressions by Channel")
-    st.altair_chart(
-        alt.Chart(df).mark_bar().encode(
+    altair_chart(
+        lambda df: alt.Chart(fit(df, "Impressions by Channel", category="Channel", value="Impressions")).mark_bar().encode(
             x=alt.X("Channel:N", title=None),
             y=alt.Y("Impressions:Q"),
             tooltip=["Channel","Impressions"]
         ).properties(height=320),
-        use_container_width=True
+        df[["Channel", "Impressions"]],
     )
 with c2:
     st.subheader("Clicks by Channel")
-    st.altair_chart(
-        alt.Chart(df).mark_bar().encode(
+    altair_chart(
+        lambda df: alt.Chart(fit(df, "Clicks by Channel", category="Channel", value="Clicks")).mark_bar().encode(
             x=alt.X("Channel:N", title=None),
             y=alt.Y("Clicks:Q"),
             tooltip=["Channel","Clicks"]
         ).properties(height=320),
-        use_container_width=True
+        df[["Channel", "Clicks"]],
+    )
+
+if actuals and len(weekly) > 1:
+    st.subheader("Weekly Spend & Conversions")
+    weekly_long = weekly.rename(columns={"week": "Week", "spend": "Spend (€)", "conversions": "Conversions"}).melt(
+        id_vars="Week", value_vars=["Spend (€)", "Conversions"], var_name="Metric")
+    altair_chart(
+        lambda df: alt.Chart(fit(df, "Weekly Spend & Conversions", x="Week", y="value", by="Metric"))
+        .mark_line(point=True).encode(
+            x=alt.X("Week:T", title="Week starting"),
+            y=alt.Y("value:Q", title=None),
+            tooltip=["Week:T", "Metric", alt.Tooltip("value:Q", format=",.0f")]
+        ).properties(height=160).facet(row=alt.Row("Metric:N", title=None)).resolve_scale(y="independent"),
+        weekly_long,
     )
 
+# Spend curve: the same simulation rules at every level from €5K to €500K, one vectorized batch
+st.subheader("Spend Curve (€5K – €500K)")
+mixes = {
+    "Plan": BASE_BUDGETS,
+    "Plan + 20% TOFU shift": tofu_shift(
+        BASE_BUDGETS, CHANNEL_FUNNEL, pull=0.20, to_mofu=0.70,
+        mofu_split={"Google Search – Generic (MOFU)": 0.6, "LinkedIn – Retargeting (MOFU)": 0.4},
+        bofu_channel="Google Search – Exact/Brand/Comp (BOFU)",
+    ),
+}
+curve = sweep_simulation(budget_levels(), mixes, list(BASE_BUDGETS))
+curve_long = curve.melt(id_vars=["Mix", "Budget"], value_vars=["Conversions", "SQLs"], var_name="Metric")
+altair_chart(
+    lambda df, budget: alt.Chart(df).mark_line().encode(
+        x=alt.X("Budget:Q", title="Monthly budget (€)"),
+        y=alt.Y("value:Q", title=None),
+        color=alt.Color("Mix:N"),
+        strokeDash=alt.StrokeDash("Metric:N"),
+        tooltip=["Mix", "Budget", "Metric", "value"]
+    ).properties(height=300)
+    + alt.Chart(pd.DataFrame({"Budget": [budget]})).mark_rule(strokeDash=[4, 4]).encode(x="Budget:Q"),
+    curve_long, total_sel,
+)
+
+# Monte Carlo mode: distributions instead of a single deterministic outcome
+@st.cache_data(show_spinner=False)
+def run_monte_carlo(budgets: dict, n_draws: int) -> pd.DataFrame:
+    return monte_carlo(budgets, n_draws=n_draws, seed=42)
+
+# Fragment: flipping the toggle reruns only this block, not the whole page
+@st.fragment
+def monte_carlo_card(budgets: dict):
+    if st.toggle("🎲 Monte Carlo mode (P10 / P50 / P90)", help="Samples CPC, CPM, CTR and CVR from the benchmark ranges"):
+        mc = run_monte_carlo(budgets, MC_DRAWS)
+        st.caption(f"{MC_DRAWS:,} simulated months per channel; CPC/CPM/CTR/CVR drawn from benchmark ranges, same LI/YT underperformance rules.")
+
+        mc_display = mc[["Channel"]].copy()
+        for metric, fmt in (("Conversions", "{:,.0f}"), ("CPA (€)", "€{:,.0f}"), ("SQLs", "{:,.0f}")):
+            lo, mid, hi = (mc[f"{metric} P{p}"] for p in (10, 50, 90))
+            mc_display[metric] = [
+                f"{fmt.format(m)}  ({fmt.format(l)} – {fmt.format(h)})".replace("€inf", "—")
+                for l, m, h in zip(lo, mid, hi)
+            ]
+        st.dataframe(mc_display, use_container_width=True)
+        st.caption("Values are P50 (P10 – P90). CPA shows — when a percentile has zero conversions.")
+
+        mc_chart = mc[mc["Channel"] != "Total"]
+        altair_chart(
+            lambda df: alt.Chart(df).mark_rule(strokeWidth=3).encode(
+                x=alt.X("Channel:N", title=None),
+                y=alt.Y("Conversions P10:Q", title="Conversions (P10–P90)"),
+                y2="Conversions P90:Q",
+                tooltip=["Channel", "Conversions P10", "Conversions P50", "Conversions P90"]
+            ) + alt.Chart(df).mark_point(filled=True, size=80).encode(
+                x="Channel:N",
+                y="Conversions P50:Q",
+            ),
+            mc_chart,
+        )
+
+monte_carlo_card(budgets)
+
 # =======================
 # 2) Insight Card (Positives) + Optimization Card
 # =======================
@@ -198,69 +241,158 @@ with c_right:
     """)
     card_end()
 
+# Negative keywords vs search-term reports (data/search_terms/, data/negatives/; samples otherwise).
+# Fragment: the toggle reruns only this block; the scan is a process-wide memo per set of files
+@st.fragment
+def negatives_card():
+    if not st.toggle("🚫 Check negative keywords against search terms",
+                     help="Spend, clicks and conversions each negative keyword would have blocked, per funnel stage"):
+        return
+    reports, lists = report_files(), list_files()
+    scan = cached_negatives(tuple(file_key(p) for p in reports), tuple(file_key(p) for p in lists))
+    for error in scan.errors:
+        st.warning(f"Skipped: {error}")
+    if not reports or not lists:
+        st.caption("Sample " + " and ".join(
+            [w for w, files in (("search-term report", reports), ("negative list", lists)) if not files]) +
+            ". Drop Google Ads search-term reports into `data/search_terms/` and negative lists "
+            "(`.txt` in Ads Editor notation or `.csv`) into `data/negatives/`.")
+    st.caption(f"{scan.negatives:,} negatives × {scan.search_terms:,} distinct search terms "
+               f"({scan.rows:,} report rows) in {scan.seconds:.1f}s.")
+
+    funnels = scan.funnels
+    cols = st.columns(max(len(funnels), 1))
+    for col, (_, f) in zip(cols, funnels.iterrows()):
+        with col:
+            kpi_chip(f"{f['funnel']} spend blocked",
+                     f"€{f['blocked_spend']:,.0f} ({(f['blocked_share'] if pd.notnull(f['blocked_share']) else 0) * 100:.1f}%)",
+                     "green" if f["blocked_conversions"] == 0 else "yellow")
+
+    top = scan.blocked.groupby("negative", sort=False)["spend"].sum().nlargest(15).index
+    altair_chart(
+        lambda df: alt.Chart(df).mark_bar().encode(
+            x=alt.X("spend:Q", title="Spend blocked (€)", stack=True),
+            y=alt.Y("negative:N", title=None, sort="-x"),
+            color=alt.Color("funnel:N", title="Funnel"),
+            tooltip=["negative", "match", "funnel", "terms", alt.Tooltip("clicks:Q", format=","),
+                     alt.Tooltip("spend:Q", format=",.2f"), "conversions"]
+        ).properties(height=320, title="Spend each negative would have blocked (top 15)"),
+        scan.blocked[scan.blocked["negative"].isin(top)][["negative", "match", "funnel", "terms", "clicks", "spend", "conversions"]],
+    )
+    paged_table(scan.blocked.rename(columns={
+        "list": "List", "negative": "Negative", "match": "Match", "funnel": "Funnel", "terms": "Search terms",
+        "impressions": "Impressions", "clicks": "Clicks", "spend": "Spend (€)", "conversions": "Conversions",
+    }), "negatives_blocked", hide_index=True)
+    st.caption("A term hit by several negatives counts for each of them here; the chips count it once. "
+               "Negatives that block converting terms are worth a second look.")
+    with st.expander(f"Blocked search terms ({len(scan.terms):,})"):
+        paged_table(scan.terms, "negatives_terms", hide_index=True)
+
+negatives_card()
+
 # =======================
 # 3) Budget Shift to Highest Intent (MOFU & BOFU)
 # =======================
-st.divider()
-card_start("3) Budget Shift to Highest Intent (MOFU & BOFU)", "Reallocate for efficiency while keeping awareness on")
-
-# Before (current)
-before_df = pd.DataFrame([
-    {"Funnel":"TOFU","Channel Group":"LinkedIn Awareness","Budget (€)": budgets["LinkedIn – Awareness"]},
-    {"Funnel":"TOFU","Channel Group":"YouTube Awareness","Budget (€)": budgets["YouTube – Awareness"]},
-    {"Funnel":"MOFU","Channel Group":"Google Search – Generic","Budget (€)": budgets["Google Search – Generic (MOFU)"]},
-    {"Funnel":"MOFU","Channel Group":"Google Search – RLSA","Budget (€)": budgets["Google Search – RLSA (MOFU)"]},
-    {"Funnel":"MOFU","Channel Group":"LinkedIn Retargeting","Budget (€)": budgets["LinkedIn – Retargeting (MOFU)"]},
-    {"Funnel":"BOFU","Channel Group":"Google Search – Exact/Brand/Comp","Budget (€)": budgets["Google Search – Exact/Brand/Comp (BOFU)"]},
-])
-
-# After (proposed shift): pull 20% from TOFU and split to MOFU/BOFU (70/30)
-pull = 0.20
-li_shift = budgets["LinkedIn – Awareness"] * pull
-yt_shift = budgets["YouTube – Awareness"] * pull
-after_budgets = budgets.copy()
-after_budgets["LinkedIn – Awareness"] -= li_shift
-after_budgets["YouTube – Awareness"] -= yt_shift
-add_mofu = (li_shift + yt_shift) * 0.70
-add_bofu = (li_shift + yt_shift) * 0.30
-# distribute to MOFU (Search Generic + LI Retargeting) & BOFU (Exact/Brand/Comp)
-after_budgets["Google Search – Generic (MOFU)"] += add_mofu * 0.6
-after_budgets["LinkedIn – Retargeting (MOFU)"] += add_mofu * 0.4
-after_budgets["Google Search – Exact/Brand/Comp (BOFU)"] += add_bofu
-
-after_df = pd.DataFrame([
-    {"Funnel":"TOFU","Channel Group":"LinkedIn Awareness","Budget (€)": after_budgets["LinkedIn – Awareness"]},
-    {"Funnel":"TOFU","Channel Group":"YouTube Awareness","Budget (€)": after_budgets["YouTube – Awareness"]},
-    {"Funnel":"MOFU","Channel Group":"Google Search – Generic","Budget (€)": after_budgets["Google Search – Generic (MOFU)"]},
-    {"Funnel":"MOFU","Channel Group":"Google Search – RLSA","Budget (€)": after_budgets["Google Search – RLSA (MOFU)"]},
-    {"Funnel":"MOFU","Channel Group":"LinkedIn Retargeting","Budget (€)": after_budgets["LinkedIn – Retargeting (MOFU)"]},
-    {"Funnel":"BOFU","Channel Group":"Google Search – Exact/Brand/Comp","Budget (€)": after_budgets["Google Search – Exact/Brand/Comp (BOFU)"]},
-])
-
-st.markdown("**Before → After (20% reallocation from TOFU to MOFU/BOFU)**")
-bb1, bb2 = st.columns(2)
-with bb1:
-    st.write("**Before**")
-    st.dataframe(before_df, use_container_width=True)
-with bb2:
-    st.write("**After**")
-    st.dataframe(after_df, use_container_width=True)
-
-st.altair_chart(
-    alt.Chart(pd.concat([before_df.assign(View="Before"), after_df.assign(View="After")]))
-      .mark_bar()
-      .encode(
-          x=alt.X("Channel Group:N", title=None),
-          y=alt.Y("Budget (€):Q"),
-          color=alt.Color("View:N"),
-          column=alt.Column("Funnel:N")
-      ).properties(height=300),
-    use_container_width=True
-)
+CHANNEL_GROUPS = {
+    "LinkedIn – Awareness": "LinkedIn Awareness",
+    "YouTube – Awareness": "YouTube Awareness",
+    "Google Search – Generic (MOFU)": "Google Search – Generic",
+    "Google Search – RLSA (MOFU)": "Google Search – RLSA",
+    "LinkedIn – Retargeting (MOFU)": "LinkedIn Retargeting",
+    "Google Search – Exact/Brand/Comp (BOFU)": "Google Search – Exact/Brand/Comp",
+}
 
-st.info(
-    "We’ll keep awareness **on**, but reallocate ~20% to **MOFU/BOFU** (Search + LI Retargeting) "
-    "to reduce **CPC/CPA** and increase **SQLs** over the next 2–4 weeks."
-)
+def budget_frame(b: dict) -> pd.DataFrame:
+    return pd.DataFrame([
+        {"Funnel": CHANNEL_FUNNEL[ch], "Channel Group": CHANNEL_GROUPS[ch], "Budget (€)": round(v)}
+        for ch, v in b.items()
+    ])
+
+# Section 3 as a fragment: changing the objective or a limit reruns only this card
+@st.fragment
+def budget_shift_card(budgets: dict):
+    st.divider()
+    card_start("3) Budget Shift to Highest Intent (MOFU & BOFU)", "Reallocate for efficiency while keeping awareness on")
+
+    # Before (current)
+    before_df = budget_frame(budgets)
+
+    # After (optimizer): equalise marginal returns on diminishing-returns curves within per-channel limits
+    objective = st.radio("Optimise for", ["Conversions", "SQLs"], horizontal=True)
+    MIN_SHARE, MAX_SHARE = 0.50, 2.50   # default limits vs. current spend (keeps awareness on)
+
+    with st.expander("Channel spend limits (€ / month)"):
+        limits_df = st.data_editor(
+            pd.DataFrame({
+                "Channel": list(budgets),
+                "Min (€)": [round(v * MIN_SHARE) for v in budgets.values()],
+                "Max (€)": [round(v * MAX_SHARE) for v in budgets.values()],
+            }),
+            # one key for every budget level: the defaults follow the slider, edited limits are kept
+            disabled=["Channel"], hide_index=True, use_container_width=True, key="budget_limits",
+        )
+    # Cleared cells mean "no limit"
+    lower = dict(zip(limits_df["Channel"], limits_df["Min (€)"].astype(float).fillna(0.0)))
+    upper = dict(zip(limits_df["Channel"], limits_df["Max (€)"].astype(float).fillna(float(sum(budgets.values())))))
+
+    # Keep one solver per objective across reruns: a limit edit or a slider move re-solves warm
+    # from the previous optimum (bounds and total budget change together, then one solve)
+    opt_key = f"budget_optimizer::{objective}"
+    opt = st.session_state.get(opt_key)
+    total = float(sum(budgets.values()))
+    try:
+        if opt is None:
+            opt = optimizer_from_benchmarks(budgets, lower, upper, objective=objective.lower(), funnel=CHANNEL_FUNNEL)
+            opt.solve()
+            st.session_state[opt_key] = opt
+        else:
+            new_lower = [lower[ch] for ch in opt.channels]
+            new_upper = [upper[ch] for ch in opt.channels]
+            if opt.budget != total or list(opt.lower) != new_lower or list(opt.upper) != new_upper:
+                opt.lower[:], opt.upper[:] = new_lower, new_upper
+                opt.set_budget(total)
+        after_budgets = dict(zip(opt.channels, opt.allocation))
+    except ValueError as e:
+        st.error(f"Optimizer: {e}. Showing the current split.")
+        st.session_state.pop(opt_key, None)
+        opt, after_budgets = None, dict(budgets)
+
+    after_df = budget_frame(after_budgets)
+    shift_pct = sum(abs(after_budgets[ch] - budgets[ch]) for ch in budgets) / 2 / sum(budgets.values()) * 100
+
+    st.markdown(f"**Before → After ({shift_pct:.0f}% reallocated to the highest marginal {objective})**")
+    bb1, bb2 = st.columns(2)
+    with bb1:
+        st.write("**Before**")
+        st.dataframe(before_df, use_container_width=True)
+    with bb2:
+        st.write("**After**")
+        st.dataframe(after_df, use_container_width=True)
+
+    altair_chart(
+        lambda df: alt.Chart(df)
+          .mark_bar()
+          .encode(
+              x=alt.X("Channel Group:N", title=None),
+              y=alt.Y("Budget (€):Q"),
+              color=alt.Color("View:N"),
+              column=alt.Column("Funnel:N")
+          ).properties(height=300),
+        pd.concat([before_df.assign(View="Before"), after_df.assign(View="After")]),
+    )
+
+    if opt is not None:
+        weight = opt.weight
+        before_val = (opt.conversions(list(budgets.values())) * weight).sum()
+        after_val = (opt.conversions(opt.allocation) * weight).sum()
+        with st.expander("Optimizer details (response curves & marginal returns)"):
+            st.dataframe(opt.summary(current=list(budgets.values())).round(2), use_container_width=True)
+            st.caption(f"Solved in {opt.iterations} iteration(s). Curves: conversions = slope × saturation × (1 − e^(−spend/saturation)).")
+        st.info(
+            f"We keep awareness **on** (limits above), and reallocate ~{shift_pct:.0f}% toward the channels with the highest "
+            f"marginal **{objective}** — expected {objective} {before_val:.1f} → **{after_val:.1f}** per month on the response curves."
+        )
+
+    card_end()
 
-card_end()
+budget_shift_card(budgets)
@@ -0,0 +1,183 @@
+"""
+Shared UI helpers for the app and its pages.
+
+Importing this module has no side effects (no page config, no output), so
+pages can import it on every run; `app.py` is only the home page.
+"""
+
+import streamlit as st
+
+PAGE_CONFIG = {
+    "page_title": "Dapper Case Study – &ranj US Go-To-Market",
+    "layout": "centered",
+}
+
+# -----------------------------
+# ✅ Global CSS (Google / Material feel)
+# -----------------------------
+GOOGLE_MATERIAL_CSS = """
+<style>
+:root {
+  --g-primary: #1A73E8;
+  --g-green:   #34A853;
+  --g-yellow:  #FBBC05;
+  --g-red:     #EA4335;
+  --g-text:    #202124;
+  --g-muted:   #5F6368;
+  --g-bg:      #FFFFFF;
+  --g-bg2:     #F8F9FA;
+  --g-border:  #E0E0E0;
+  --g-shadow:  0 1px 2px rgba(0,0,0,0.06), 0 2px 6px rgba(0,0,0,0.06);
+  --radius:    12px;
+  --pad:       16px;
+}
+
+.block-container { padding-top: 1.2rem; }
+h1,h2,h3 { color: var(--g-text); letter-spacing: -0.2px; }
+
+.g-card {
+  background: var(--g-bg);
+  border: 1px solid var(--g-border);
+  border-radius: var(--radius);
+  padding: var(--pad);
+  box-shadow: var(--g-shadow);
+  margin-bottom: 12px;
+}
+
+.kpi {
+  display: inline-flex; 
+  align-items: center; 
+  gap: 8px;
+  padding: 10px 14px; 
+  border-radius: 999px;
+  border: 1px solid var(--g-border); 
+  background: var(--g-bg);
+  box-shadow: 0 1px 2px rgba(0,0,0,0.04);
+  font-weight: 600; 
+  color: var(--g-text);
+}
+.kpi .dot { 
+  width: 10px; 
+  height: 10px; 
+  border-radius: 50%; 
+  background: var(--g-primary); 
+}
+
+.stTabs [data-baseweb="tab-list"] { gap: 8px; }
+.stTabs [data-baseweb="tab"] {
+  background: var(--g-bg);
+  border: 1px solid var(--g-border);
+  border-radius: 999px;
+  padding: 8px 14px;
+  color: var(--g-muted);
+}
+.stTabs [aria-selected="true"] {
+  border-color: var(--g-primary) !important;
+  color: var(--g-primary) !important;
+}
+
+.stButton > button {
+  border-radius: 8px !important;
+  border: 1px solid var(--g-border) !important;
+  box-shadow: var(--g-shadow) !important;
+}
+
+.stAlert { border-radius: var(--radius); }
+</style>
+"""
+
+def inject_google_css():
+    st.markdown(GOOGLE_MATERIAL_CSS, unsafe_allow_html=True)
+
+def page_setup():
+    """Page config + CSS; call at the top of every page."""
+    st.set_page_config(**PAGE_CONFIG)
+    inject_google_css()
+
+# -----------------------------
+# ✅ Reusable UI helpers
+# -----------------------------
+def card_start(title: str, subtitle: str | None = None):
+    st.markdown(
+        f'<div class="g-card"><h3>{title}</h3>'
+        + (f'<p style="color:#5F6368;margin-top:-6px;">{subtitle}</p>' if subtitle else ''),
+        unsafe_allow_html=True,
+    )
+
+def card_end():
+    st.markdown("</div>", unsafe_allow_html=True)
+
+def kpi_chip(label: str, value: str, tone: str = "primary"):
+    color = {
+        "primary": "var(--g-primary)",
+        "green":   "var(--g-green)",
+        "red":     "var(--g-red)",
+        "yellow":  "var(--g-yellow)",
+    }.get(tone, "var(--g-primary)")
+    st.markdown(
+        f'<span class="kpi"><span class="dot" style="background:{color};"></span>{label}: {value}</span>',
+        unsafe_allow_html=True,
+    )
+
+def lazy_tabs(sections: dict, key: str):
+    """
+    `st.tabs` where only the open tab runs: `sections` maps tab label -> render function.
+    Switching tabs reruns the page, so closed tabs build and send nothing.
+    """
+    tabs = st.tabs(list(sections), key=key, on_change="rerun")
+    for tab, render in zip(tabs, sections.values()):
+        if tab.open:
+            with tab:
+                render()
+
+# -----------------------------
+# ✅ Cached charts
+# -----------------------------
+def altair_chart(build, *args, use_container_width: bool = True, **params):
+    """
+    `st.altair_chart(build(*args, **params))` with the compiled spec cached on the builder's code
+    and inputs (frames content-hashed, see gtm.chartdata.chart_key): an unchanged chart costs a
+    hash check instead of an Altair build. Hit / miss counts: `gtm.chartdata.SPECS.stats()`.
+    """
+    from gtm.chartdata import SPECS, chart_key   # pandas stays out of the home page's import
+    try:
+        # Streamlit's own Altair -> Vega-Lite conversion (theme, Arrow datasets); private, so
+        # without it every chart is built on every run, as with st.altair_chart
+        from streamlit.elements.vega_charts import _convert_altair_to_vega_lite_spec as vega_lite_spec
+    except ImportError:
+        st.altair_chart(build(*args, **params), use_container_width=use_container_width)
+        return
+    spec = SPECS.get(chart_key(build, args, params), lambda: vega_lite_spec(build(*args, **params)))
+    st.vega_lite_chart(spec=spec, use_container_width=use_container_width)
+
+# -----------------------------
+# ✅ Paged tables
+# -----------------------------
+def paged_table(df, key: str, page_rows: int | None = None, **kwargs):
+    """
+    `st.dataframe(df)` that sends one page at a time once `df` is longer than `page_rows`
+    (default gtm.tables.PAGE_ROWS): the frame stays on the server and filter, sort and paging
+    run there, as a fragment. `kwargs` go to `st.dataframe` (e.g. `hide_index=True`).
+    """
+    from gtm.tables import PAGE_ROWS   # pandas stays out of the home page's import
+    page_rows = page_rows or PAGE_ROWS
+    if len(df) <= page_rows:
+        st.dataframe(df, use_container_width=True, **kwargs)
+    else:
+        _table_window(df, key, page_rows, kwargs)
+
+@st.fragment
+def _table_window(df, key: str, page_rows: int, kwargs: dict):
+    from gtm.tables import table_index
+    f1, f2, f3, f4 = st.columns([2, 1.6, 0.5, 0.9], vertical_alignment="center")
+    query = f1.text_input("Filter", key=f"{key}_filter", placeholder="Filter rows…", label_visibility="collapsed")
+    sort = f2.selectbox("Sort by", [None, *df.columns], key=f"{key}_sort", label_visibility="collapsed",
+                        format_func=lambda c: "Sort: table order" if c is None else f"Sort: {c}")
+    descending = f3.toggle("↓", key=f"{key}_desc", help="Descending")
+    page = f4.number_input("Page", min_value=1, step=1, key=f"{key}_page", label_visibility="collapsed")
+    view = table_index(df).window(query, sort, not descending, int(page) - 1, page_rows)
+    st.dataframe(view.rows, use_container_width=True, **kwargs)
+    last = view.first + len(view.rows) - 1 if len(view.rows) else 0
+    st.caption(f"Rows {view.first:,}–{last:,} of {view.matched:,}"
+               + (f" (filtered from {view.total:,})" if view.matched < view.total else "")
+               + f" · page {view.page + 1} of {view.pages}")